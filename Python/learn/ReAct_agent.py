@@ -6,10 +6,11 @@ tools_by_name = {tool.name: tool for tool in tools}
 # print(tools_by_name)
 
 # 定义大模型
-from langchain.chat_models import init_chat_model
-model = init_chat_model(
+from models import PromptCacheMetrics, bind_tools_stable, get_chat_model
+# 从进程级注册表获取模型，相同配置共用同一个实例和HTTP连接池
+model = get_chat_model(
+    provider="deepseek",
     model="deepseek-chat",
-    model_provider="deepseek",
     temperature=0.7,
     max_tokens=None,
     timeout=None,
@@ -17,55 +18,58 @@ model = init_chat_model(
     max_retries=2,
 )
 
-# 绑定工具
-model_with_tools = model.bind_tools(tools)
+# 绑定工具，按名称排序保证工具定义顺序稳定，不破坏服务端提示词前缀缓存
+model_with_tools = bind_tools_stable(model, tools)
+# 服务端提示词缓存命中统计
+cache_metrics = PromptCacheMetrics()
 
 
 # 定义状态
 from langchain.messages import AnyMessage
 from typing_extensions import Annotated, TypedDict
-import operator
+from common import windowed_messages
 
 # 在 LangGraph 中，状态会在整个智能体的执行期间持续存在。
-# 使用 operator.add 声明的 Annotated 类型能确保新消息被追加到现有列表中，而不是将其替换。
+# 使用 windowed_messages 声明的 Annotated 类型能确保新消息被追加到现有列表中，而不是将其替换；
+# 已并入摘要的历史消息会被裁剪，状态与检查点不会随会话无限增长。
 class MessagesState(TypedDict):
     """消息状态"""
-    messages: Annotated[list[AnyMessage], operator.add]
+    messages: Annotated[list[AnyMessage], windowed_messages]
     llm_calls: int
     tools_calls: int
+    summary: str
+    summarized_count: int
 
 
 # 定义节点
 
 # 大模型调用节点
-from langchain.messages import SystemMessage
+from common import MessageWindow, PromptPrefix, instrument, tracer_from_env
+
+# 静态系统提示词只构建一次，并始终位于模型输入最前面，便于命中服务端前缀缓存
+prompt_prefix = PromptPrefix("You are a helpful assistant tasked with performing arithmetic on a set of inputs.")
+# 只把「系统提示词 + 滚动摘要 + 最近消息」送入模型，长会话的提示词长度保持有界
+history_window = MessageWindow(summarizer=model, max_tokens=6000, keep_last=12, prefix=prompt_prefix, trim_history=True)
 
 
 def llm_call(state: dict):
     """LLM decides whether to call a tool or not"""
-    messages = state["messages"]
-    response = model_with_tools.invoke(
-        [
-            SystemMessage(
-                content="You are a helpful assistant tasked with performing arithmetic on a set of inputs."
-            )
-        ]
-        + messages
-    )
+    window = history_window.prepare(state)
+    response = model_with_tools.invoke(window.messages)
     return {
-        "messages": [response],
-        "llm_calls": state.get('llm_calls', 0) + 1
+        "messages": [*window.trim, response],
+        "llm_calls": state.get('llm_calls', 0) + 1,
+        **window.updates
     }
 # 工具调用节点
-from langchain.messages import ToolMessage
+from tools.executor import ToolExecutor
+
+tool_executor = ToolExecutor(tools, per_tool_limits={"baidu_search": 3})
 
 def tool_node(state: dict):
     """Performs the tool call"""
-    result = []
-    for tool_call in state["messages"][-1].tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observation = tool.invoke(tool_call["args"])
-        result.append(ToolMessage(content=observation, tool_call_id=tool_call["id"]))
+    # 同一轮的多个工具调用并发执行，结果按原始调用顺序返回
+    result = tool_executor.run(state["messages"][-1].tool_calls)
     return {"messages": result}
 
 
@@ -95,11 +99,19 @@ graph.add_edge("tool_node", "llm_call")
 # 编译工作流
 agent = graph.compile()
 
+# 节点耗时、token与工具调用追踪，默认关闭，设置 GRAPH_TRACE=jsonl 或 prometheus 开启
+tracer = tracer_from_env(name="ReAct_agent")
+if tracer is not None:
+    agent = instrument(agent, tracer, name="ReAct_agent")
+
 
 
 # 调用工作流
 from langchain.messages import HumanMessage
 messages = [HumanMessage(content="今天深圳天气怎么样？出行如何穿搭？")]
-messages = agent.invoke({"messages": messages})
+messages = agent.invoke({"messages": messages}, config={"callbacks": [cache_metrics]})
 for m in messages["messages"]:
-    m.pretty_print()
\ No newline at end of file
+    m.pretty_print()
+print(f"提示词缓存命中统计: {cache_metrics.report()}")
+if tracer is not None:
+    print(f"节点追踪统计: {tracer.report()}")
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""
+高德地图MCP桩服务
+在本地以streamable HTTP提供与高德MCP同名的少量工具，用于离线测试工具目录缓存与会话池
+
+运行方式（在 learn 目录下）:
+    python -m benchmarks.amap_stub_server --port 8765
+    AMAP_MCP_URL=http://127.0.0.1:8765/mcp python -m tools.mcp_amap
+"""
+import argparse
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+
+def build_server(host: str, port: int, latency: float) -> FastMCP:
+    server = FastMCP("amap-stub", host=host, port=port, log_level="WARNING")
+
+    @server.tool()
+    async def maps_weather(city: str) -> str:
+        """查询指定城市的天气"""
+        await asyncio.sleep(latency)
+        return f"{city}: 晴，25℃"
+
+    @server.tool()
+    async def maps_geo(address: str) -> str:
+        """将地址转换为经纬度坐标"""
+        await asyncio.sleep(latency)
+        return f"{address}: 114.05,22.55"
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="高德地图MCP桩服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="每次工具调用的模拟延迟（秒）")
+    args = parser.parse_args()
+    build_server(args.host, args.port, args.latency).run(transport="streamable-http")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+SQLite 检查点基准
+模拟长会话写入后重启进程，测量恢复会话状态的延迟与数据库文件大小
+
+运行方式（在 learn 目录下）:
+    python -m benchmarks.checkpointer_bench --turns 200 --keep-last 20
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Annotated
+
+from typing_extensions import TypedDict
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from common import SQLiteCheckpointSaver
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _echo(state: ChatState) -> dict:
+    return {"messages": [AIMessage(content="回复: " + state["messages"][-1].content)]}
+
+
+def _build_graph():
+    graph = StateGraph(ChatState)
+    graph.add_node("echo", _echo)
+    graph.add_edge(START, "echo")
+    graph.add_edge("echo", END)
+    return graph
+
+
+def _db_size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def run(turns: int, keep_last, db_path: str) -> dict:
+    config = {"configurable": {"thread_id": "bench_thread"}}
+    graph = _build_graph()
+
+    saver = SQLiteCheckpointSaver(db_path, keep_last=keep_last)
+    agent = graph.compile(checkpointer=saver)
+    start = time.perf_counter()
+    for i in range(turns):
+        agent.invoke({"messages": [HumanMessage(content=f"问题 {i}")]}, config)
+    write_s = time.perf_counter() - start
+    saver.vacuum()
+    saver.close()
+
+    # 模拟重启：新建保存器与图实例后恢复会话
+    start = time.perf_counter()
+    saver = SQLiteCheckpointSaver(db_path, keep_last=keep_last)
+    agent = graph.compile(checkpointer=saver)
+    state = agent.get_state(config)
+    resume_s = time.perf_counter() - start
+    start = time.perf_counter()
+    agent.invoke({"messages": [HumanMessage(content="重启后的问题")]}, config)
+    first_turn_s = time.perf_counter() - start
+    checkpoints = len(list(saver.list(config)))
+    saver.close()
+    return {
+        "turns": turns,
+        "keep_last": keep_last,
+        "write_ms_per_turn": round(write_s / turns * 1000, 3),
+        "resume_ms": round(resume_s * 1000, 3),
+        "first_turn_after_restart_ms": round(first_turn_s * 1000, 3),
+        "messages_restored": len(state.values["messages"]),
+        "checkpoints_on_disk": checkpoints,
+        "db_bytes": _db_size(db_path),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 检查点恢复延迟基准")
+    parser.add_argument("--turns", type=int, default=200, help="重启前的会话轮数")
+    parser.add_argument("--keep-last", type=int, default=20, help="每个线程保留的检查点数量")
+    args = parser.parse_args()
+
+    for keep_last in (None, args.keep_last):
+        with tempfile.TemporaryDirectory() as tmp:
+            print(run(args.turns, keep_last, os.path.join(tmp, "checkpoints.db")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+离线基准使用的假模型与假工具后端
+ScriptedChatModel 按脚本逐轮回放工具调用，工具轮次结束后给出最终回答，可配置首token延迟与输出速率；
+FakeSearchServer 在本地线程中提供与百度AI搜索接口格式一致的HTTP服务，可配置响应延迟，
+配合 BaiduSearchTool(search_url=...) 使用，走真实的工具代码与HTTP连接池
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from common import approx_token_count
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    按脚本回放的确定性假聊天模型
+    回放哪一轮由当前用户消息之后已完成的工具调用轮数决定，与调用顺序和并发无关
+
+    参数:
+        tool_rounds: 每轮的工具调用列表，如 [[{"name": "baidu_search", "args": {"query": "..."}}]]
+        final_answer: 工具轮次结束后的最终回答
+        latency: 首token延迟（秒）
+        tokens_per_second: 输出速率（token/秒），None 表示输出不额外耗时
+        structured: with_structured_output 使用的构造函数 (schema, messages) -> schema实例
+    """
+    tool_rounds: List[List[dict]] = []
+    final_answer: str = "这是离线基准测试的最终回答。"
+    latency: float = 0.0
+    tokens_per_second: Optional[float] = None
+    structured: Optional[Callable[[type, List[BaseMessage]], Any]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools, **kwargs):
+        # 工具调用由脚本决定，绑定的工具定义不影响输出
+        return self
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        rounds = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, AIMessage) and message.tool_calls:
+                rounds += 1
+        if rounds < len(self.tool_rounds):
+            tool_calls = [
+                {"name": call["name"], "args": call.get("args", {}), "id": f"call_{rounds}_{i}", "type": "tool_call"}
+                for i, call in enumerate(self.tool_rounds[rounds])
+            ]
+            content = ""
+            output_tokens = sum(approx_token_count(json.dumps(call, ensure_ascii=False)) for call in tool_calls)
+        else:
+            tool_calls = []
+            content = self.final_answer
+            output_tokens = approx_token_count(content)
+        input_tokens = sum(approx_token_count(message.text) for message in messages)
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _duration(self, output_tokens: int) -> float:
+        if not self.tokens_per_second:
+            return self.latency
+        return self.latency + output_tokens / self.tokens_per_second
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._next_message(messages)
+        time.sleep(self._duration(message.usage_metadata["output_tokens"]))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._next_message(messages)
+        await asyncio.sleep(self._duration(message.usage_metadata["output_tokens"]))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(self, schema, **kwargs):
+        if self.structured is None:
+            raise ValueError("ScriptedChatModel 未配置 structured，无法生成结构化输出")
+
+        def invoke(messages):
+            time.sleep(self.latency)
+            return self.structured(schema, messages)
+
+        async def ainvoke(messages):
+            await asyncio.sleep(self.latency)
+            return self.structured(schema, messages)
+
+        return RunnableLambda(invoke, afunc=ainvoke, name="ScriptedStructuredOutput")
+
+
+class FakeSearchServer:
+    """
+    本地假搜索服务，请求与响应格式与百度AI搜索一致
+
+    参数:
+        latency: 每个请求的响应延迟（秒）
+        references: 每个请求返回的参考资料条数
+
+    用法:
+        with FakeSearchServer(latency=0.05) as server:
+            tool = BaiduSearchTool(api_key="offline", search_url=server.url, cache=None)
+    """
+
+    def __init__(self, latency: float = 0.0, references: int = 3):
+        self.latency = latency
+        self.references = references
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头与响应体分两次写出，不关闭Nagle时长连接上每个请求会多出约40ms的延迟确认等待
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                query = (body.get("messages") or [{}])[-1].get("content", "")
+                with server._lock:
+                    server.requests += 1
+                time.sleep(server.latency)
+                payload = json.dumps({
+                    "references": [{"content": f"关于「{query}」的参考资料{i + 1}"} for i in range(server.references)],
+                }, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v2/ai_search/chat/completions"
+
+    def start(self) -> "FakeSearchServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-search", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeSearchServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
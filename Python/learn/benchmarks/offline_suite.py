@@ -0,0 +1,332 @@
+"""
+离线基准套件
+不依赖DeepSeek、百度与高德的真实服务：模型使用按脚本回放的假模型，搜索使用本地假搜索服务，
+测量图调度开销、工具节点并发、PPT渲染耗时以及不同计划规模下的PlanAgent吞吐。
+结果写入JSON文件；传入 --baseline 时与之前的结果逐项对比，变化超过阈值的指标会被标出
+
+运行方式（在 learn 目录下）:
+    python -m benchmarks.offline_suite
+    python -m benchmarks.offline_suite --quick --baseline files/.cache/bench/offline-上次.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Literal
+
+os.environ.setdefault("DEEPSEEK_API_KEY", "offline")
+
+from langchain.messages import HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from benchmarks.fakes import FakeSearchServer, ScriptedChatModel
+from benchmarks.plan_agent_bench import run_load
+from benchmarks.ppt_render_bench import build_deck
+from plan_agent import PlanAgent, PlanModel, TaskStep
+from tools.baidu_search import BaiduSearchTool
+from tools.executor import ToolExecutor
+from tools.file_manage import current_time
+from tools.ppt_create import render_presentation
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "files", ".cache", "bench")
+# 与基准结果对比时视为显著变化的比例
+CHANGE_THRESHOLD = 0.10
+
+
+def _quiet():
+    # 节点与工具内的print会干扰计时与终端输出
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def build_react_graph(model, executor: ToolExecutor):
+    """
+    与 rag_agent/ReAct_agent 结构相同的图：模型节点 -> 工具节点 -> 模型节点，直到不再调用工具
+    """
+    model_with_tools = model.bind_tools(list(executor.tools_by_name.values()))
+
+    def llm_call(state: dict):
+        return {"messages": [model_with_tools.invoke(state["messages"])]}
+
+    def tool_node(state: dict):
+        return {"messages": executor.run(state["messages"][-1].tool_calls)}
+
+    def should_continue(state: dict) -> Literal["tool_node", END]:
+        return "tool_node" if state["messages"][-1].tool_calls else END
+
+    graph = StateGraph(MessagesState)
+    graph.add_node(llm_call)
+    graph.add_node(tool_node)
+    graph.add_edge(START, "llm_call")
+    graph.add_conditional_edges("llm_call", should_continue, ["tool_node", END])
+    graph.add_edge("tool_node", "llm_call")
+    return graph.compile()
+
+
+def bench_graph_overhead(iterations: int) -> dict:
+    """
+    图调度开销：同样的「模型 -> 工具 -> 模型」调用序列，经由图执行与直接调用的耗时差
+    模型与工具均无延迟，差值即为图在状态合并、通道读写与调度上的开销
+    """
+    model = ScriptedChatModel(tool_rounds=[[{"name": "current_time", "args": {}}]])
+    executor = ToolExecutor([current_time])
+    graph = build_react_graph(model, executor)
+    question = HumanMessage(content="现在几点？")
+
+    def direct():
+        messages = [question]
+        reply = model.invoke(messages)
+        messages += [reply, *executor.run(reply.tool_calls)]
+        messages.append(model.invoke(messages))
+        return messages
+
+    with _quiet():
+        graph.invoke({"messages": [question]})
+        direct()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            graph.invoke({"messages": [question]})
+        graph_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(iterations):
+            direct()
+        direct_s = time.perf_counter() - start
+    overhead_ms = (graph_s - direct_s) * 1000 / iterations
+    return {
+        "iterations": iterations,
+        "graph_ms_per_invoke": round(graph_s * 1000 / iterations, 3),
+        "direct_ms_per_invoke": round(direct_s * 1000 / iterations, 3),
+        "overhead_ms_per_invoke": round(overhead_ms, 3),
+        # 每次调用包含 llm_call、tool_node、llm_call 三个超步
+        "overhead_ms_per_step": round(overhead_ms / 3, 3),
+    }
+
+
+def bench_tool_concurrency(latency: float, widths: List[int], rounds: int) -> dict:
+    """
+    工具节点并发：同一轮中 k 个搜索调用分别串行执行、线程池并发执行与事件循环并发执行的耗时
+    搜索走真实的 BaiduSearchTool 代码与HTTP连接池，后端为本地假搜索服务
+    """
+    results = {}
+    with FakeSearchServer(latency=latency) as server:
+        tool = BaiduSearchTool(api_key="offline", search_url=server.url, cache=None)
+        executor = ToolExecutor([tool], max_workers=max(widths))
+
+        async def run_async() -> Dict[int, float]:
+            timings = {}
+            for k in widths:
+                calls = _search_calls(k)
+                await executor.arun(calls)
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    await executor.arun(calls)
+                timings[k] = (time.perf_counter() - start) / rounds
+            return timings
+
+        with _quiet():
+            for k in widths:
+                calls = _search_calls(k)
+                executor.run(calls)
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    for call in calls:
+                        executor.run([call])
+                serial_s = (time.perf_counter() - start) / rounds
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    executor.run(calls)
+                threads_s = (time.perf_counter() - start) / rounds
+                results[k] = {"serial_s": serial_s, "threads_s": threads_s}
+            async_timings = asyncio.run(run_async())
+        requests = server.requests
+
+    for k, timing in results.items():
+        timing["async_s"] = async_timings[k]
+        timing["threads_speedup"] = timing["serial_s"] / timing["threads_s"]
+        timing["async_speedup"] = timing["serial_s"] / timing["async_s"]
+    return {
+        "backend_latency_s": latency,
+        "rounds": rounds,
+        "requests": requests,
+        "by_calls": {str(k): {name: round(value, 4) for name, value in timing.items()} for k, timing in results.items()},
+    }
+
+
+def _search_calls(k: int) -> List[dict]:
+    return [{"name": "baidu_search", "args": {"query": f"离线基准查询{i}"}, "id": f"call_{i}"} for i in range(k)]
+
+
+def bench_ppt_render(slide_counts: List[int], rounds: int, workers: int) -> dict:
+    """
+    PPT渲染耗时：校验、渲染并保存到内存的完整耗时
+    """
+    results = {}
+    for num_slides in slide_counts:
+        data = build_deck(num_slides)
+        render_presentation(data, workers=workers).save(io.BytesIO())
+        start = time.perf_counter()
+        for _ in range(rounds):
+            render_presentation(data, workers=workers).save(io.BytesIO())
+        elapsed = (time.perf_counter() - start) / rounds
+        results[str(num_slides)] = {
+            "seconds_per_deck": round(elapsed, 4),
+            "ms_per_slide": round(elapsed * 1000 / num_slides, 3),
+        }
+    return {"workers": workers, "rounds": rounds, "by_slides": results}
+
+
+def _plan_of(num_tasks: int):
+    def build(schema, messages) -> PlanModel:
+        return PlanModel(
+            user_goal="离线基准",
+            tasks=[
+                TaskStep(task_id=f"task_{i}", task_name=f"任务{i}", desc="离线基准任务", result="")
+                for i in range(num_tasks)
+            ],
+        )
+    return build
+
+
+def bench_plan_agent(sizes: List[int], plans: int, concurrency: int, latency: float, tokens_per_second: float) -> dict:
+    """
+    PlanAgent吞吐：不同计划规模（任务数）下，串行与并行执行模式每秒完成的计划数与任务数
+    """
+    results = {}
+    for mode in ("serial", "parallel"):
+        results[mode] = {}
+        for num_tasks in sizes:
+            llm = ScriptedChatModel(latency=latency, tokens_per_second=tokens_per_second, structured=_plan_of(num_tasks))
+            agent = PlanAgent(execution_mode=mode, llm=llm)
+            with _quiet():
+                stats = asyncio.run(run_load(agent, plans, concurrency))
+            stats["tasks_per_s"] = round(plans * num_tasks / stats["elapsed_s"], 2)
+            results[mode][str(num_tasks)] = stats
+    return {
+        "llm_latency_s": latency,
+        "tokens_per_second": tokens_per_second,
+        "plans": plans,
+        "concurrency": concurrency,
+        **results,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _flatten(value, prefix: str = "") -> Dict[str, float]:
+    if isinstance(value, dict):
+        items = {}
+        for key, item in value.items():
+            items.update(_flatten(item, f"{prefix}.{key}" if prefix else key))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: float(value)}
+    return {}
+
+
+def compare(results: dict, baseline: dict, threshold: float = CHANGE_THRESHOLD) -> List[dict]:
+    """
+    逐项对比两次结果中的耗时与吞吐指标
+
+    参数:
+        results (dict): 本次结果
+        baseline (dict): 基准结果
+        threshold (float): 视为显著变化的比例
+
+    返回:
+        List[dict]: 变化超过阈值的指标，regression 为True表示变差（耗时增加或吞吐下降）
+    """
+    current, previous = _flatten(results["results"]), _flatten(baseline.get("results", {}))
+    changes = []
+    for key, value in current.items():
+        old = previous.get(key)
+        metric = key.rsplit(".", 1)[-1]
+        higher_is_better = metric.endswith("_per_s") or metric.endswith("_speedup")
+        lower_is_better = not higher_is_better and (
+            metric.endswith("_s") or "ms_per_" in metric or "seconds_per_" in metric
+        ) and not metric.endswith("latency_s")
+        if old is None or old == 0 or not (higher_is_better or lower_is_better):
+            continue
+        change = (value - old) / old
+        if abs(change) >= threshold:
+            changes.append({
+                "metric": key,
+                "baseline": old,
+                "current": value,
+                "change": round(change, 4),
+                "regression": change < 0 if higher_is_better else change > 0,
+            })
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线基准套件")
+    parser.add_argument("--output", help="结果JSON路径，默认 files/.cache/bench/offline-<时间>.json")
+    parser.add_argument("--baseline", help="用于对比的历史结果JSON")
+    parser.add_argument("--quick", action="store_true", help="缩小规模，快速验证")
+    parser.add_argument("--only", nargs="+", choices=["graph", "tools", "ppt", "plan"], help="只运行指定的基准")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="假模型的首token延迟（秒）")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="假模型的输出速率")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="假搜索服务的响应延迟（秒）")
+    parser.add_argument("--ppt-workers", type=int, default=1, help="PPT渲染进程数，1为串行")
+    args = parser.parse_args()
+
+    selected = set(args.only or ["graph", "tools", "ppt", "plan"])
+    sizes = [1, 5, 10] if args.quick else [1, 5, 10, 25, 50]
+    results = {}
+    if "graph" in selected:
+        results["graph_overhead"] = bench_graph_overhead(iterations=50 if args.quick else 300)
+        print(f"图调度开销: {results['graph_overhead']}")
+    if "tools" in selected:
+        results["tool_concurrency"] = bench_tool_concurrency(
+            args.search_latency, [1, 2, 4] if args.quick else [1, 2, 4, 8], rounds=2 if args.quick else 3)
+        print(f"工具节点并发: {results['tool_concurrency']['by_calls']}")
+    if "ppt" in selected:
+        results["ppt_render"] = bench_ppt_render([10, 50] if args.quick else [10, 50, 200],
+                                                 rounds=1 if args.quick else 3, workers=args.ppt_workers)
+        print(f"PPT渲染: {results['ppt_render']['by_slides']}")
+    if "plan" in selected:
+        results["plan_agent"] = bench_plan_agent(sizes, plans=5 if args.quick else 20, concurrency=10,
+                                                 latency=args.llm_latency, tokens_per_second=args.tokens_per_second)
+        for mode in ("serial", "parallel"):
+            print(f"PlanAgent({mode}): " + ", ".join(
+                f"{size}任务 {stats['plans_per_s']}计划/s" for size, stats in results["plan_agent"][mode].items()))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f))
+        regressions = [item for item in report["comparison"] if item["regression"]]
+        print(f"与基准对比: {len(report['comparison'])}项显著变化，其中{len(regressions)}项变差")
+        for item in regressions:
+            print(f"  变差 {item['metric']}: {item['baseline']} -> {item['current']} ({item['change']:+.1%})")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"offline-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+PlanAgent 并发吞吐基准
+使用模拟网络延迟的假模型，对比同步节点（异步执行时由线程池代跑）与原生异步节点
+在同一进程内每秒可完成的计划数
+
+运行方式（在 learn 目录下）:
+    python -m benchmarks.plan_agent_bench --plans 200 --concurrency 100 --tasks 3 --latency 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from langchain_core.messages import AIMessage
+
+from plan_agent import PlanAgent, PlanModel, TaskStep
+
+
+class _SleepyPlanner:
+    """结构化输出的假规划模型，返回固定数量的独立任务"""
+
+    def __init__(self, num_tasks: int, latency: float):
+        self.num_tasks = num_tasks
+        self.latency = latency
+
+    def _plan(self) -> PlanModel:
+        return PlanModel(
+            user_goal="benchmark",
+            tasks=[
+                TaskStep(task_id=f"task_{i}", task_name=f"任务{i}", desc="基准测试任务", result="")
+                for i in range(self.num_tasks)
+            ],
+        )
+
+    def invoke(self, messages, config=None, **kwargs):
+        time.sleep(self.latency)
+        return self._plan()
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._plan()
+
+
+class SleepyChatModel:
+    """
+    模拟网络延迟的假聊天模型
+    同步调用使用time.sleep阻塞线程，异步调用使用asyncio.sleep让出事件循环
+    """
+
+    def __init__(self, num_tasks: int = 3, latency: float = 0.2):
+        self.num_tasks = num_tasks
+        self.latency = latency
+
+    def with_structured_output(self, schema):
+        return _SleepyPlanner(self.num_tasks, self.latency)
+
+    def invoke(self, messages, config=None, **kwargs):
+        time.sleep(self.latency)
+        return AIMessage(content="ok")
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="ok")
+
+
+async def run_load(agent: PlanAgent, plans: int, concurrency: int) -> dict:
+    """
+    以固定并发度执行plans次计划，返回吞吐与延迟统计
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_plan(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await agent.ainvoke(f"基准计划 {i}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_plan(i) for i in range(plans)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "plans": plans,
+        "elapsed_s": round(elapsed, 3),
+        "plans_per_s": round(plans / elapsed, 2),
+        "p50_s": round(latencies[len(latencies) // 2], 3),
+        "p95_s": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PlanAgent 并发吞吐基准")
+    parser.add_argument("--plans", type=int, default=200, help="总计划数")
+    parser.add_argument("--concurrency", type=int, default=100, help="同时在途的计划数")
+    parser.add_argument("--tasks", type=int, default=3, help="每个计划的任务数")
+    parser.add_argument("--latency", type=float, default=0.2, help="每次模型调用的模拟延迟（秒）")
+    parser.add_argument("--verbose", action="store_true", help="保留节点内的print输出")
+    args = parser.parse_args()
+
+    for label, native_async in [("sync nodes (thread pool)", False), ("native async nodes", True)]:
+        agent = PlanAgent(native_async=native_async, llm=SleepyChatModel(args.tasks, args.latency))
+        # 节点内的print会严重干扰终端输出，默认屏蔽
+        sink = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with sink:
+            stats = asyncio.run(run_load(agent, args.plans, args.concurrency))
+        print(f"{label:<26} {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+PPT写出内存基准
+在独立子进程中分别用「整份渲染后保存」与「流式写出」生成不同页数的演示文稿，对比峰值RSS
+
+运行方式（在 learn 目录下）:
+    python -m benchmarks.ppt_memory_bench --sizes 10 100 500
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _peak_rss_mb() -> float:
+    # Linux下ru_maxrss单位为KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(mode: str, num_slides: int, output_path: str) -> None:
+    from benchmarks.ppt_render_bench import build_deck
+    from tools.ppt_create import render_presentation, stream_presentation
+
+    data = build_deck(num_slides)
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "stream":
+        stream_presentation(data, output_path, workers=1)
+    else:
+        render_presentation(data, workers=1).save(output_path)
+    print(json.dumps({
+        "mode": mode,
+        "slides": num_slides,
+        "seconds": round(time.perf_counter() - start, 3),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "file_kb": round(os.path.getsize(output_path) / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPT写出内存基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500], help="演示文稿页数")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "SLIDES", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, num_slides, output_path = args.child
+        _child(mode, int(num_slides), output_path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for num_slides in args.sizes:
+            for mode in ("save", "stream"):
+                output_path = os.path.join(tmp_dir, f"{mode}_{num_slides}.pptx")
+                # 每次测量使用新进程，峰值RSS互不影响
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.ppt_memory_bench", "--child", mode, str(num_slides), output_path],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                result["delta_rss_mb"] = round(result["peak_rss_mb"] - result["baseline_rss_mb"], 1)
+                print(result)
+
+
+if __name__ == "__main__":
+    main()
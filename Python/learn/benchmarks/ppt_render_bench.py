@@ -0,0 +1,76 @@
+"""
+PPT渲染基准
+生成包含全部幻灯片类型的大型演示文稿，对比串行与进程池并行渲染的吞吐（页/秒），
+以及装饰层模板缓存开启/关闭时的串行渲染耗时
+
+运行方式（在 learn 目录下）:
+    python -m benchmarks.ppt_render_bench --slides 80 --workers 4 --rounds 3
+"""
+import argparse
+import io
+import os
+import time
+
+import tools.ppt_create as ppt_create
+from tools.ppt_create import render_presentation, shutdown_render_pool
+
+SAMPLE_SLIDES = [
+    {"type": "title", "title": "智能PPT生成系统", "subtitle": "基于LangGraph的演示文稿创建工具"},
+    {"type": "catalog", "title": "目录", "items": ["系统介绍", "核心功能", "技术架构", "应用案例", "未来展望"]},
+    {"type": "section", "section_number": "01", "section_title": "系统介绍"},
+    {"type": "content", "title": "主要功能", "content": ["自动生成PPT结构", "支持多种幻灯片类型", "灵活的JSON配置", "智能内容填充"]},
+    {"type": "card_grid", "title": "核心特性", "cards": [{"title": f"特性{i}", "content": "特性描述"} for i in range(6)]},
+    {"type": "stats", "title": "性能数据", "stats": [{"value": "9+", "label": "页面类型"}, {"value": "3", "label": "配色方案"}, {"value": "100%", "label": "自动化"}]},
+    {"type": "timeline", "title": "发展历程", "events": [{"time": f"v{i}.0", "description": "版本说明"} for i in range(1, 5)]},
+    {"type": "two_column", "title": "优势对比", "left_content": ["传统方式", "手动创建"], "right_content": ["智能方式", "自动生成"]},
+    {"type": "image_text", "title": "应用场景", "content": ["工作汇报", "项目展示", "教学培训"], "image_description": "示意图"},
+]
+
+
+def build_deck(num_slides: int) -> dict:
+    slides = [dict(SAMPLE_SLIDES[i % len(SAMPLE_SLIDES)]) for i in range(num_slides)]
+    return {"title": "基准测试", "slides": slides}
+
+
+def run(data: dict, workers: int, rounds: int) -> dict:
+    num_slides = len(data["slides"])
+    # 预热：并行模式下首次调用会启动进程池
+    render_presentation(data, workers=workers)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        prs = render_presentation(data, workers=workers)
+        prs.save(io.BytesIO())
+    elapsed = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "seconds_per_deck": round(elapsed / rounds, 3),
+        "ms_per_slide": round(elapsed * 1000 / (num_slides * rounds), 2),
+        "slides_per_second": round(num_slides * rounds / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPT渲染基准")
+    parser.add_argument("--slides", type=int, default=80, help="每个演示文稿的页数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行渲染进程数")
+    parser.add_argument("--rounds", type=int, default=3, help="每种模式渲染的次数")
+    args = parser.parse_args()
+
+    data = build_deck(args.slides)
+    print(f"CPU核数: {os.cpu_count()}，每个演示文稿 {args.slides} 页")
+    try:
+        # 装饰层模板缓存对比（串行，开关只作用于当前进程）
+        for enabled in (False, True):
+            ppt_create.DECORATION_CACHE = enabled
+            result = run(data, 1, args.rounds)
+            print(f"装饰层缓存{'开启' if enabled else '关闭'}: {result}")
+        for workers in (1, args.workers):
+            result = run(data, workers, args.rounds)
+            mode = "串行" if workers <= 1 else "并行"
+            print(f"{mode}: {result}")
+    finally:
+        shutdown_render_pool()
+
+
+if __name__ == "__main__":
+    main()
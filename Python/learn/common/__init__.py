@@ -0,0 +1,24 @@
+from .answer_cache import AnswerCache, CachedAnswer, answer_cache_from_env, is_follow_up, normalize_question
+from .checkpointer import SQLiteCheckpointSaver
+from .history import HistoryWindow, MessageWindow, TrimMessages, approx_token_count, windowed_messages
+from .prompt import PromptPrefix
+from .tracing import GraphTracer, JSONLSpanExporter, instrument, tracer_from_env
+
+__all__ = [
+    "AnswerCache",
+    "CachedAnswer",
+    "GraphTracer",
+    "HistoryWindow",
+    "JSONLSpanExporter",
+    "MessageWindow",
+    "PromptPrefix",
+    "SQLiteCheckpointSaver",
+    "TrimMessages",
+    "answer_cache_from_env",
+    "approx_token_count",
+    "instrument",
+    "is_follow_up",
+    "normalize_question",
+    "tracer_from_env",
+    "windowed_messages",
+]
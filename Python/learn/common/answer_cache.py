@@ -0,0 +1,455 @@
+"""
+语义答案缓存
+在智能体之前按归一化后的用户问题查找已有的最终答案：先按哈希精确匹配，配置了嵌入模型时再在本地向量索引中
+按相似度阈值查找近似问题，命中时直接返回缓存答案，不再运行图。会话中指代前文的追问（如「那明天呢」「它有哪些缺点」）
+依赖上下文，不查也不写缓存。答案的有效期取默认TTL与本轮调用过的工具的新鲜度规则中的最小值，
+调用过 current_time、write_file 等工具的答案不缓存。可选地写入SQLite，进程重启后仍可命中
+"""
+import array
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from langchain.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages import convert_to_messages
+
+try:
+    import numpy as np
+except ImportError:  # 未安装NumPy时逐条计算相似度，缓存条数有上限，开销可接受
+    np = None
+
+# 工具 -> 调用过该工具的答案的最长有效期（秒），0 表示不缓存；未列出的工具使用默认TTL
+DEFAULT_TOOL_TTLS: Dict[str, float] = {
+    "current_time": 0,
+    "write_file": 0,
+    "read_file": 300,
+    "baidu_search": 6 * 3600,
+    "local_search": 24 * 3600,
+    "maps_weather": 1800,
+}
+_PUNCT_RE = re.compile(r"[\s\W_]+")
+# 近似命中时必须一致的词：数字、相对时间与否定词，向量相近但这些词不同的问题答案不同
+_GUARD_RE = re.compile(r"\d+(?:\.\d+)?|[今明昨前后][天日年晚]|[上下本]周|[上下本]月|[上下]午|不|没|未|非")
+# 指代前文的追问：以承接词开头、包含指代词或以「呢」结尾
+_FOLLOW_UP_RE = re.compile(
+    r"^(?:那|然后|还有|另外|再|继续|接着|所以)"
+    r"|它|他|她|这个|那个|这些|那些|这里|那里|这样|那样|上面|上述|以上|刚才|刚刚|之前|前面|其中|呢$"
+    r"|\b(?:it|its|they|them|this|that|these|those|above|previous)\b"
+)
+
+
+def is_follow_up(question: str) -> bool:
+    """
+    判断问题是否指代前文，这类问题的答案依赖会话上下文
+
+    参数:
+        question (str): 用户问题
+
+    返回:
+        bool: 是否为指代前文的追问
+    """
+    return _FOLLOW_UP_RE.search(normalize_question(question)) is not None
+
+
+def normalize_question(question: str) -> str:
+    """
+    归一化用户问题：全角转半角、英文小写、去除标点与空白
+
+    参数:
+        question (str): 原始问题
+
+    返回:
+        str: 归一化后的问题
+    """
+    question = unicodedata.normalize("NFKC", question).lower()
+    return _PUNCT_RE.sub(" ", question).strip()
+
+
+class CachedAnswer(NamedTuple):
+    """缓存命中结果"""
+    answer: str
+    question: str
+    kind: str  # exact 或 near
+    similarity: float
+
+
+class _Entry:
+    __slots__ = ("question", "answer", "created", "expires", "vector")
+
+    def __init__(self, question: str, answer: str, created: float, expires: Optional[float], vector):
+        self.question = question
+        self.answer = answer
+        self.created = created
+        self.expires = expires
+        self.vector = vector
+
+
+class AnswerCache:
+    """
+    语义答案缓存
+
+    参数:
+        path (str): SQLite文件路径，None 表示只缓存在内存中
+        ttl (float): 答案默认有效期（秒），None 表示永不过期
+        max_size (int): 最大缓存条数，超出后淘汰最久未使用的条目
+        threshold (float): 配置 embeddings 时近似命中所需的最低余弦相似度
+        tool_ttls (Dict[str, float]): 工具新鲜度规则，默认 DEFAULT_TOOL_TTLS
+        embeddings: 可选的LangChain Embeddings，提供时才启用近似命中；字符级相似度分不清
+            「今天/明天」「是/不是」「英尺/英寸」这类问题，未提供时只做精确匹配。
+            近似命中还要求数字、相对时间与否定词完全一致
+        min_length (int): 归一化后短于该长度的问题不查缓存也不写缓存
+        namespace (str): 缓存命名空间，不同智能体或系统提示词应使用不同的值
+
+    用法:
+        cache = AnswerCache()
+        result = cache.invoke(agent, {"messages": [{"role": "user", "content": "..."}]})
+        print(cache.stats())
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = 3600, max_size: int = 1024,
+                 threshold: float = 0.9, tool_ttls: Optional[Dict[str, float]] = None, embeddings=None,
+                 min_length: int = 4, namespace: str = ""):
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        self.threshold = threshold
+        self.tool_ttls = dict(DEFAULT_TOOL_TTLS if tool_ttls is None else tool_ttls)
+        self.embeddings = embeddings
+        self.min_length = min_length
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # 近似检索用的向量矩阵，条目变化后在下次检索时重建
+        self._matrix = None
+        self._matrix_keys: List[str] = []
+        self._counters = {
+            "exact_hits": 0, "near_hits": 0, "misses": 0, "bypassed": 0,
+            "stores": 0, "uncacheable": 0, "expired": 0, "evictions": 0,
+        }
+        self._conn = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answer_cache ("
+                "key TEXT PRIMARY KEY, question TEXT NOT NULL, answer TEXT NOT NULL, "
+                "created REAL NOT NULL, expires REAL, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+            self._load()
+
+    # 持久化
+    def _load(self) -> None:
+        now = time.time()
+        self._conn.execute("DELETE FROM answer_cache WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT key, question, answer, created, expires, vector FROM answer_cache ORDER BY created DESC LIMIT ?",
+            (self.max_size,),
+        ).fetchall()
+        for key, question, answer, created, expires, blob in reversed(rows):
+            vector = array.array("f")
+            vector.frombytes(blob)
+            self._entries[key] = _Entry(question, answer, created, expires, vector.tolist())
+
+    def _persist(self, key: str, entry: Optional[_Entry]) -> None:
+        if self._conn is None:
+            return
+        if entry is None:
+            self._conn.execute("DELETE FROM answer_cache WHERE key = ?", (key,))
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answer_cache (key, question, answer, created, expires, vector) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry.question, entry.answer, entry.created, entry.expires,
+                 array.array("f", entry.vector).tobytes()),
+            )
+        self._conn.commit()
+
+    # 键与向量
+    def _key(self, question: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{question}".encode("utf-8")).hexdigest()
+
+    def _vector(self, question: str) -> List[float]:
+        # 未配置嵌入模型时不做近似检索，也不保存向量
+        if self.embeddings is None:
+            return []
+        try:
+            vector = self.embeddings.embed_query(question)
+        except Exception as e:
+            # 嵌入服务不可用时退化为精确匹配，不影响智能体调用
+            print(f"答案缓存向量计算失败，只做精确匹配: {e}")
+            return []
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _remove(self, key: str) -> None:
+        del self._entries[key]
+        self._matrix = None
+        self._persist(key, None)
+
+    def _nearest(self, vector: List[float]) -> tuple:
+        """返回 (最相似条目的键, 相似度)，没有可比较的条目时键为None，调用方持有锁"""
+        # 只与维度相同的向量比较，未配置嵌入模型时写入的条目没有向量
+        if np is not None:
+            if self._matrix is None:
+                self._matrix_keys = [key for key, entry in self._entries.items() if len(entry.vector) == len(vector)]
+                self._matrix = np.asarray(
+                    [self._entries[key].vector for key in self._matrix_keys], dtype=np.float32
+                ).reshape(len(self._matrix_keys), len(vector))
+            if not self._matrix_keys:
+                return None, -1.0
+            sims = self._matrix @ np.asarray(vector, dtype=np.float32)
+            best = int(np.argmax(sims))
+            return self._matrix_keys[best], float(sims[best])
+        best_key, best_sim = None, -1.0
+        for key, entry in self._entries.items():
+            if len(entry.vector) != len(vector):
+                continue
+            sim = sum(a * b for a, b in zip(entry.vector, vector))
+            if sim > best_sim:
+                best_key, best_sim = key, sim
+        return best_key, best_sim
+
+    # 查找与写入
+    def lookup(self, question: str) -> Optional[CachedAnswer]:
+        """
+        查找问题的缓存答案
+
+        参数:
+            question (str): 用户问题
+
+        返回:
+            Optional[CachedAnswer]: 命中时返回缓存答案，未命中返回None
+        """
+        normalized = normalize_question(question)
+        if len(normalized) < self.min_length:
+            with self._lock:
+                self._counters["bypassed"] += 1
+            return None
+        key = self._key(normalized)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= now:
+                self._remove(key)
+                self._counters["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["exact_hits"] += 1
+                return CachedAnswer(entry.answer, entry.question, "exact", 1.0)
+            if self.embeddings is None or not self._entries:
+                self._counters["misses"] += 1
+                return None
+
+        vector = self._vector(normalized)
+        guards = _GUARD_RE.findall(normalized)
+        with self._lock:
+            while vector:
+                best_key, similarity = self._nearest(vector)
+                if best_key is None:
+                    self._counters["misses"] += 1
+                    return None
+                entry = self._entries[best_key]
+                if entry.expires is None or entry.expires > now:
+                    break
+                self._remove(best_key)
+                self._counters["expired"] += 1
+            else:
+                self._counters["misses"] += 1
+                return None
+            # 数字、日期或肯定否定不同的问题即使向量相近也不视为同一问题
+            if similarity >= self.threshold and _GUARD_RE.findall(entry.question) == guards:
+                self._entries.move_to_end(best_key)
+                self._counters["near_hits"] += 1
+                return CachedAnswer(entry.answer, entry.question, "near", round(similarity, 4))
+            self._counters["misses"] += 1
+            return None
+
+    def ttl_for(self, tools_used: Iterable[str]) -> Optional[float]:
+        """
+        根据本轮调用过的工具计算答案的有效期
+
+        参数:
+            tools_used (Iterable[str]): 工具名称
+
+        返回:
+            Optional[float]: 有效期（秒），0 表示不可缓存，None 表示永不过期
+        """
+        ttl = self.ttl
+        for name in tools_used:
+            rule = self.tool_ttls.get(name)
+            if rule is not None:
+                ttl = rule if ttl is None else min(ttl, rule)
+        return ttl
+
+    def store(self, question: str, answer: str, tools_used: Iterable[str] = ()) -> bool:
+        """
+        写入问题的最终答案，按工具新鲜度规则确定有效期
+
+        参数:
+            question (str): 用户问题
+            answer (str): 最终答案
+            tools_used (Iterable[str]): 生成答案过程中调用过的工具名称
+
+        返回:
+            bool: 是否写入了缓存
+        """
+        normalized = normalize_question(question)
+        ttl = self.ttl_for(tools_used)
+        if len(normalized) < self.min_length or not answer or ttl == 0:
+            with self._lock:
+                self._counters["uncacheable"] += 1
+            return False
+        key = self._key(normalized)
+        vector = self._vector(normalized)
+        now = time.time()
+        entry = _Entry(normalized, answer, now, None if ttl is None else now + ttl, vector)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._matrix = None
+            self._persist(key, entry)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+            self._counters["stores"] += 1
+        return True
+
+    # 包装智能体调用
+    def invoke(self, agent, inputs: Dict[str, Any], config: Optional[dict] = None, as_node: Optional[str] = None) -> Dict[str, Any]:
+        """
+        带答案缓存地调用智能体：命中时不运行图，直接返回缓存答案；未命中时运行图并按规则缓存最终答案。
+        问题指代前文（见 is_follow_up）且本轮之前已有对话（输入中的历史消息，或检查点中该会话的消息与摘要）时，
+        答案依赖上下文，直接运行图，不查也不写缓存；同一会话中的其他独立问题照常查找与写入
+
+        参数:
+            agent: 编译后的图（如 create_agent 或 StateGraph.compile() 的返回值）
+            inputs (Dict[str, Any]): 图的输入，最后一条 messages 为用户问题
+            config (dict): 图的运行配置
+            as_node (str): 图带检查点时，命中后以该节点的身份把问答写入会话状态（如 create_agent 的 "model"）
+
+        返回:
+            Dict[str, Any]: 与 agent.invoke 相同结构的结果，命中时最后一条消息为缓存答案
+        """
+        messages = convert_to_messages(inputs.get("messages") or [])
+        question = messages[-1].text if messages and isinstance(messages[-1], HumanMessage) else None
+        if question and is_follow_up(question) and self._has_context(agent, messages, config):
+            with self._lock:
+                self._counters["bypassed"] += 1
+            question = None
+        hit = self.lookup(question) if question else None
+        if hit is not None:
+            print(f"答案缓存命中({hit.kind}, 相似度{hit.similarity}): {hit.question}")
+            answer = AIMessage(content=hit.answer, response_metadata={"answer_cache": hit.kind})
+            if _checkpointed(agent, config):
+                # 把问答追加到会话中，后续追问仍能看到这一轮
+                agent.update_state(config, {"messages": [messages[-1], answer]}, as_node=as_node)
+                return agent.get_state(config).values
+            return {**inputs, "messages": [*messages, answer]}
+
+        result = agent.invoke(inputs, config)
+        if question:
+            final = result["messages"][-1]
+            if isinstance(final, AIMessage) and not final.tool_calls:
+                self.store(question, final.text, _tools_in_turn(result["messages"]))
+        return result
+
+    def _has_context(self, agent, messages: list, config: Optional[dict]) -> bool:
+        """本轮问题之前是否已有对话"""
+        if any(not isinstance(message, SystemMessage) for message in messages[:-1]):
+            return True
+        if _checkpointed(agent, config):
+            values = agent.get_state(config).values
+            return bool(values.get("messages") or values.get("summary"))
+        return False
+
+    # 统计
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回缓存统计信息
+
+        返回:
+            Dict[str, Any]: 精确/近似命中、未命中、跳过、写入、过期与淘汰次数，当前条数与命中率
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters["exact_hits"] + counters["near_hits"] + counters["misses"]
+        return {
+            **counters,
+            "size": size,
+            "hit_rate": round((counters["exact_hits"] + counters["near_hits"]) / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM answer_cache")
+                self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _checkpointed(agent, config: Optional[dict]) -> bool:
+    """图带检查点且本次调用指定了会话"""
+    return bool(getattr(agent, "checkpointer", None) and (config or {}).get("configurable", {}).get("thread_id"))
+
+
+def _tools_in_turn(messages: list) -> List[str]:
+    """收集最后一条用户消息之后调用过的工具名称"""
+    names = []
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage):
+            names.extend(call["name"] for call in message.tool_calls)
+    return names
+
+
+def answer_cache_from_env(prefix: str = "ANSWER_CACHE", namespace: str = "", embeddings=None) -> Optional[AnswerCache]:
+    """
+    根据环境变量创建答案缓存，默认关闭
+
+    环境变量:
+        {prefix}: off（默认）、memory 或 sqlite
+        {prefix}_TTL: 默认有效期秒数，默认 3600
+        {prefix}_SIZE: 最大条数，默认 1024
+        {prefix}_THRESHOLD: 近似命中的相似度阈值，默认 0.9，仅传入 embeddings 时生效
+        {prefix}_PATH: SQLite文件路径，默认 learn/files/.cache/answer_cache.db
+
+    参数:
+        prefix (str): 环境变量前缀
+        namespace (str): 缓存命名空间
+        embeddings: 可选的LangChain Embeddings，提供时启用近似命中
+
+    返回:
+        Optional[AnswerCache]: 缓存实例，off 时返回 None
+    """
+    backend = os.getenv(prefix, "off").lower()
+    if backend not in ("memory", "sqlite"):
+        return None
+    path = None
+    if backend == "sqlite":
+        default_path = Path(__file__).resolve().parent.parent / "files" / ".cache" / "answer_cache.db"
+        path = os.getenv(f"{prefix}_PATH", str(default_path))
+    return AnswerCache(
+        path=path,
+        ttl=float(os.getenv(f"{prefix}_TTL", "3600")),
+        max_size=int(os.getenv(f"{prefix}_SIZE", "1024")),
+        threshold=float(os.getenv(f"{prefix}_THRESHOLD", "0.9")),
+        embeddings=embeddings,
+        namespace=namespace,
+    )
@@ -0,0 +1,146 @@
+"""
+SQLite 持久化检查点
+替代 InMemorySaver，基于 langgraph-checkpoint-sqlite 的 SqliteSaver，会话状态保存在本地
+SQLite（WAL 模式）中，进程重启后可恢复；每个线程只保留最近 N 个检查点，后台线程定期回收磁盘空间
+"""
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+class SQLiteCheckpointSaver(SqliteSaver):
+    """
+    在 SqliteSaver 之上增加检查点保留数量、定期回收与异步接口，
+    可直接传给 create_agent(checkpointer=...) 或 graph.compile(checkpointer=...)
+
+    参数:
+        path (str): 数据库文件路径
+        keep_last (int): 每个线程（及命名空间）保留的最近检查点数量，None 表示全部保留
+        vacuum_interval (float): 后台截断 WAL 与回收空闲页的间隔（秒），None 表示不回收
+
+    注意:
+        使用完毕请调用 close() 或使用 with 语句，停止后台线程并关闭连接
+    """
+
+    def __init__(
+        self,
+        path: str,
+        keep_last: Optional[int] = 20,
+        vacuum_interval: Optional[float] = 600.0,
+        serde=None,
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        # auto_vacuum 需在建表前设置，仅对新建的数据库生效
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL 模式下 NORMAL 只在检查点时同步磁盘，每次提交不再等待 fsync
+        conn.execute("PRAGMA synchronous=NORMAL")
+        super().__init__(conn, serde=serde)
+        self.path = path
+        self.keep_last = keep_last
+        self.vacuum_interval = vacuum_interval
+        self._closed = threading.Event()
+        self._maintainer = None
+        if vacuum_interval is not None:
+            self._maintainer = threading.Thread(target=self._maintain, name="sqlite-checkpointer", daemon=True)
+            self._maintainer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ---------- 保留与回收 ----------
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """只保留最近 keep_last 个检查点，并删除对应的 writes"""
+        with self.cursor() as cur:
+            cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ("
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT ?)",
+                (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.keep_last),
+            )
+            cur.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ("
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?)",
+                (thread_id, checkpoint_ns, thread_id, checkpoint_ns),
+            )
+
+    def vacuum(self) -> None:
+        """截断 WAL 并回收空闲页"""
+        with self.cursor() as cur:
+            cur.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            cur.execute("PRAGMA incremental_vacuum").fetchall()
+
+    def _maintain(self) -> None:
+        while not self._closed.wait(self.vacuum_interval):
+            self.vacuum()
+
+    def close(self) -> None:
+        """停止后台回收线程并关闭连接"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._maintainer is not None:
+            self._maintainer.join()
+        with self.lock:
+            self.conn.close()
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        if self.keep_last is not None:
+            self._prune(next_config["configurable"]["thread_id"], next_config["configurable"]["checkpoint_ns"])
+        return next_config
+
+    # ---------- 异步接口：SqliteSaver 只有同步实现，放到线程中执行，避免阻塞事件循环 ----------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
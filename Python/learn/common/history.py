@@ -0,0 +1,215 @@
+"""
+消息历史窗口
+在调用模型前把完整历史压缩为「滚动摘要 + 最近 K 条原文消息」，使提示词长度在长会话中保持有界；
+摘要增量计算，只对新滑出窗口的消息调用一次摘要模型，每条消息的 token 数只计算一次；
+配合 windowed_messages reducer，已并入摘要的消息同时从状态中删除，检查点大小也保持有界
+"""
+import re
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from langchain.messages import AnyMessage, HumanMessage, SystemMessage, ToolMessage
+
+from .prompt import PromptPrefix
+
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+
+def approx_token_count(text: str) -> int:
+    """
+    近似估算 token 数：中日韩字符按 1 个 token，其余字符约 4 个字符 1 个 token
+
+    参数:
+        text (str): 文本
+
+    返回:
+        int: 估算的 token 数
+    """
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class TrimMessages(NamedTuple):
+    """写入 messages 通道的裁剪指令：删除历史开头 count 条已并入摘要的消息"""
+    count: int
+
+
+def windowed_messages(left: list, right: list) -> list:
+    """
+    messages 通道的 reducer：与 operator.add 一样追加新消息，遇到 TrimMessages 时
+    先删除开头已并入摘要的消息，状态与检查点中只保留摘要之后的消息
+
+    参数:
+        left (list): 当前消息列表
+        right (list): 本次写入的消息，可包含 TrimMessages
+
+    返回:
+        list: 合并后的消息列表
+    """
+    merged = list(left)
+    for item in right:
+        if isinstance(item, TrimMessages):
+            del merged[:item.count]
+        else:
+            merged.append(item)
+    return merged
+
+
+class HistoryWindow(NamedTuple):
+    """
+    pre-model hook 的结果：送入模型的消息、需要写回状态的摘要字段，
+    以及开启 trim_history 时需要写在新消息之前的裁剪指令
+    """
+    messages: List[AnyMessage]
+    updates: dict
+    trim: Tuple[TrimMessages, ...] = ()
+
+
+class MessageWindow:
+    """
+    基于 token 预算的消息窗口
+
+    参数:
+        summarizer: 用于生成滚动摘要的聊天模型，None 时直接丢弃滑出窗口的消息
+        max_tokens (int): 原文窗口的 token 预算
+        keep_last (int): 原文窗口最多保留的消息条数
+        summarize_batch (int): 滑出窗口且未摘要的消息累计到该条数后才更新一次摘要，
+            未达到前这些消息仍以原文保留，避免每轮都调用摘要模型
+        token_counter: 文本 token 计数函数，默认 approx_token_count
+        cache_size (int): 单条消息 token 数缓存的最大条数
+        prefix (PromptPrefix): 静态系统提示词前缀，设置后返回的消息即为完整的模型输入
+        trim_history (bool): 为True时已并入摘要的消息通过 TrimMessages 从状态中删除，
+            messages 通道需使用 windowed_messages reducer
+
+    状态字段:
+        summary (str): 已滑出窗口消息的滚动摘要
+        summarized_count (int): 已并入摘要的消息数量（从历史开头计），
+            开启 trim_history 时裁剪后归零
+
+    用法:
+        window = history_window.prepare(state)
+        return {"messages": [*window.trim, response], **window.updates}
+    """
+
+    def __init__(
+        self,
+        summarizer=None,
+        max_tokens: int = 6000,
+        keep_last: int = 12,
+        summarize_batch: int = 6,
+        token_counter: Optional[Callable[[str], int]] = None,
+        cache_size: int = 4096,
+        prefix: Optional[PromptPrefix] = None,
+        trim_history: bool = False,
+    ):
+        self.summarizer = summarizer
+        self.max_tokens = max_tokens
+        self.keep_last = max(1, keep_last)
+        self.summarize_batch = max(1, summarize_batch)
+        self.token_counter = token_counter or approx_token_count
+        self.cache_size = cache_size
+        self.prefix = prefix
+        self.trim_history = trim_history
+        self._token_cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ---------- token 计数 ----------
+
+    def _message_key(self, message: AnyMessage) -> str:
+        if message.id:
+            return message.id
+        return f"{message.type}:{hash(str(message.content))}:{len(getattr(message, 'tool_calls', None) or [])}"
+
+    def count_tokens(self, message: AnyMessage) -> int:
+        """
+        计算单条消息的 token 数，结果按消息缓存
+
+        参数:
+            message (AnyMessage): 消息
+
+        返回:
+            int: token 数
+        """
+        key = self._message_key(message)
+        with self._lock:
+            if key in self._token_cache:
+                self._token_cache.move_to_end(key)
+                return self._token_cache[key]
+        text = str(message.content)
+        if getattr(message, "tool_calls", None):
+            text += str(message.tool_calls)
+        tokens = self.token_counter(text) + 4  # 角色与格式开销
+        with self._lock:
+            self._token_cache[key] = tokens
+            if len(self._token_cache) > self.cache_size:
+                self._token_cache.popitem(last=False)
+        return tokens
+
+    # ---------- 窗口计算 ----------
+
+    def _window_start(self, messages: List[AnyMessage]) -> int:
+        """从末尾向前累计，返回满足条数与 token 预算的窗口起点"""
+        start = len(messages)
+        budget = self.max_tokens
+        while start > 0 and len(messages) - start < self.keep_last:
+            tokens = self.count_tokens(messages[start - 1])
+            if tokens > budget and start < len(messages):
+                break
+            budget -= tokens
+            start -= 1
+        # 窗口不能以工具结果开头，否则会与发起调用的 AI 消息分离
+        while start > 0 and isinstance(messages[start], ToolMessage):
+            start -= 1
+        return start
+
+    def _summary_messages(self, summary: str, folded: List[AnyMessage]) -> list:
+        transcript = "\n".join(f"{message.type}: {message.content}" for message in folded)
+        return [
+            SystemMessage(content="你负责维护对话摘要。请把新增对话并入已有摘要，保留事实、结论、用户偏好与未完成事项，输出简洁的中文摘要，不要添加额外说明。"),
+            HumanMessage(content=f"已有摘要：\n{summary or '（无）'}\n\n新增对话：\n{transcript}"),
+        ]
+
+    def _plan(self, state: dict):
+        messages = state["messages"]
+        summary = state.get("summary", "") or ""
+        summarized = min(state.get("summarized_count", 0) or 0, len(messages))
+        start = max(self._window_start(messages), summarized)
+        folded = messages[summarized:start]
+        if len(folded) < self.summarize_batch:
+            # 未达到批量阈值，先以原文保留
+            start, folded = summarized, []
+        return messages, summary, start, folded
+
+    def _result(self, messages, summary: str, start: int) -> HistoryWindow:
+        # 顺序为：静态前缀 -> 摘要 -> 最近消息，变化的摘要放在静态前缀之后，不影响前缀缓存
+        window = list(self.prefix.messages) if self.prefix is not None else []
+        if summary:
+            window.append(SystemMessage(content=f"此前对话摘要：\n{summary}"))
+        window.extend(islice(messages, start, None))
+        if self.trim_history and start > 0:
+            return HistoryWindow(window, {"summary": summary, "summarized_count": 0}, (TrimMessages(start),))
+        return HistoryWindow(window, {"summary": summary, "summarized_count": start})
+
+    def prepare(self, state: dict) -> HistoryWindow:
+        """
+        pre-model hook：计算本次送入模型的消息窗口，必要时增量更新摘要
+
+        参数:
+            state (dict): 包含 messages、summary、summarized_count 的图状态
+
+        返回:
+            HistoryWindow: 窗口消息与需要写回状态的字段
+        """
+        messages, summary, start, folded = self._plan(state)
+        if folded and self.summarizer is not None:
+            summary = self.summarizer.invoke(self._summary_messages(summary, folded)).content
+        return self._result(messages, summary, start)
+
+    async def aprepare(self, state: dict) -> HistoryWindow:
+        """prepare 的异步版本"""
+        messages, summary, start, folded = self._plan(state)
+        if folded and self.summarizer is not None:
+            summary = (await self.summarizer.ainvoke(self._summary_messages(summary, folded))).content
+        return self._result(messages, summary, start)
@@ -0,0 +1,21 @@
+"""
+提示词前缀
+静态系统提示词在每个编译图中只构建一次，由 MessageWindow 放在模型输入的最前面，
+内容逐字节不变，便于服务端按前缀命中提示词缓存
+"""
+from typing import Tuple
+
+from langchain.messages import SystemMessage
+
+
+class PromptPrefix:
+    """
+    静态提示词前缀
+
+    参数:
+        system_prompt (str): 静态系统提示词，不要在其中插入随请求变化的内容
+    """
+
+    def __init__(self, system_prompt: str):
+        self.system_prompt = system_prompt
+        self.messages: Tuple[SystemMessage, ...] = (SystemMessage(content=system_prompt),)
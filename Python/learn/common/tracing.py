@@ -0,0 +1,413 @@
+"""
+图执行追踪
+基于回调记录任意编译后图的运行情况：每个节点一次执行为一个span，模型调用记录耗时、输入/输出token数与首token时间，
+工具调用记录耗时与失败；耗时按直方图汇总，span可逐行写入本地JSONL，汇总指标可导出为Prometheus文本格式，
+无需外部服务即可定位耗时热点
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# 耗时直方图的桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """累积直方图，与Prometheus的histogram语义一致"""
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """按桶上界估算分位数，落在最后一个桶之外时返回最大值"""
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target and n:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_s": round(self.sum, 4),
+            "mean_s": round(self.sum / self.count, 4) if self.count else 0.0,
+            "p50_s": round(self.quantile(0.5), 4),
+            "p95_s": round(self.quantile(0.95), 4),
+            "max_s": round(self.max, 4),
+        }
+
+
+class JSONLSpanExporter:
+    """
+    把span逐行追加写入JSONL文件
+
+    参数:
+        path (str): 文件路径
+        flush_every (int): 累计多少条span写入一次磁盘
+    """
+
+    def __init__(self, path: str, flush_every: int = 32):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self._buffer.append(json.dumps(span, ensure_ascii=False))
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+class GraphTracer(BaseCallbackHandler):
+    """
+    图执行追踪回调，可挂载到任意编译后的图上
+
+    参数:
+        exporters (Iterable): span导出器，每个span结束时调用其 export(span)
+        prometheus_path (str): close() 时写入Prometheus文本格式指标的文件路径，None 表示不写入
+        buckets (Sequence[float]): 耗时直方图的桶上界（秒）
+
+    用法:
+        tracer = GraphTracer([JSONLSpanExporter("spans.jsonl")])
+        agent = instrument(agent, tracer)
+        agent.invoke(inputs)
+        print(tracer.report())
+
+    注意:
+        首token时间只在流式调用（stream/astream 或 streaming=True）时可以获得
+    """
+    # 在回调触发的线程中同步执行，保证计时准确、span顺序与执行顺序一致
+    run_inline = True
+
+    def __init__(self, exporters: Iterable = (), prometheus_path: Optional[str] = None,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.exporters = list(exporters)
+        self.prometheus_path = prometheus_path
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # 运行ID -> 所属的最外层运行ID，用于把同一次图调用的span串起来
+        self._traces: Dict[UUID, UUID] = {}
+        self._open: Dict[UUID, Dict[str, Any]] = {}
+        self._graph_latency: Dict[str, Histogram] = {}
+        self._node_latency: Dict[str, Histogram] = {}
+        self._llm_latency: Dict[str, Histogram] = {}
+        self._llm_ttft: Dict[str, Histogram] = {}
+        self._llm_tokens: Dict[str, Dict[str, int]] = {}
+        self._tool_latency: Dict[str, Histogram] = {}
+        self._errors: Counter = Counter()
+
+    # span生命周期
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], kind: Optional[str] = None,
+               name: str = "", node: Optional[str] = None) -> None:
+        with self._lock:
+            trace = self._traces.get(parent_run_id, parent_run_id) if parent_run_id else run_id
+            self._traces[run_id] = trace
+            if kind is not None:
+                self._open[run_id] = {
+                    "kind": kind,
+                    "name": name,
+                    "node": node,
+                    "trace_id": str(trace),
+                    "run_id": str(run_id),
+                    "parent_run_id": str(parent_run_id) if parent_run_id else None,
+                    "start": time.time(),
+                    "_t0": time.perf_counter(),
+                }
+
+    def _finish(self, run_id: UUID, error: Optional[BaseException] = None, **extra: Any) -> None:
+        end = time.perf_counter()
+        with self._lock:
+            self._traces.pop(run_id, None)
+            span = self._open.pop(run_id, None)
+            if span is None:
+                return
+            duration = end - span.pop("_t0")
+            span["duration_s"] = round(duration, 6)
+            span["error"] = repr(error) if error is not None else None
+            span.update(extra)
+            kind, name = span["kind"], span["name"]
+            if kind == "graph":
+                self._histogram(self._graph_latency, name).observe(duration)
+            elif kind == "node":
+                self._histogram(self._node_latency, name).observe(duration)
+            elif kind == "llm":
+                node = span["node"] or "unknown"
+                self._histogram(self._llm_latency, node).observe(duration)
+                if span.get("ttft_s") is not None:
+                    self._histogram(self._llm_ttft, node).observe(span["ttft_s"])
+                tokens = self._llm_tokens.setdefault(node, {"input": 0, "output": 0})
+                tokens["input"] += span.get("input_tokens") or 0
+                tokens["output"] += span.get("output_tokens") or 0
+            elif kind == "tool":
+                self._histogram(self._tool_latency, name).observe(duration)
+            if error is not None:
+                self._errors[(kind, name)] += 1
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    def _histogram(self, table: Dict[str, Histogram], key: str) -> Histogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets)
+        return histogram
+
+    # 图与节点
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       tags: Optional[List[str]] = None, metadata: Optional[dict] = None, **kwargs: Any) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "graph"
+        node = (metadata or {}).get("langgraph_node")
+        if parent_run_id is None:
+            self._start(run_id, None, "graph", name)
+        elif node is not None and name == node and any(tag.startswith("graph:step:") for tag in tags or ()):
+            # 节点本身的运行；节点内部的条件边、子链等只用于关联，不单独成span
+            self._start(run_id, parent_run_id, "node", name, node)
+        else:
+            self._start(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        # 图中断（interrupt）等控制流异常同样会经过这里，按失败记录
+        self._finish(run_id, error)
+
+    # 模型
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                            metadata: Optional[dict] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        name = metadata.get("ls_model_name") or kwargs.get("name") or (serialized or {}).get("name") or "chat_model"
+        self._start(run_id, parent_run_id, "llm", name, metadata.get("langgraph_node"))
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                     metadata: Optional[dict] = None, **kwargs: Any) -> None:
+        self.on_chat_model_start(serialized, prompts, run_id=run_id, parent_run_id=parent_run_id, metadata=metadata, **kwargs)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            span = self._open.get(run_id)
+            if span is not None and "ttft_s" not in span:
+                span["ttft_s"] = round(time.perf_counter() - span["_t0"], 6)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0) or 0
+                output_tokens += usage.get("output_tokens", 0) or 0
+        if not input_tokens and not output_tokens:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens = token_usage.get("prompt_tokens", 0) or 0
+            output_tokens = token_usage.get("completion_tokens", 0) or 0
+        self._finish(run_id, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error)
+
+    # 工具
+    def on_tool_start(self, serialized, input_str: str, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                      metadata: Optional[dict] = None, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._start(run_id, parent_run_id, "tool", name, (metadata or {}).get("langgraph_node"))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error)
+
+    # 汇总与导出
+    def report(self) -> Dict[str, Any]:
+        """
+        返回汇总统计
+
+        返回:
+            Dict[str, Any]: graphs/nodes/llm/tools 四类耗时统计（次数、总耗时、均值、P50、P95、最大值），
+                llm中附带输入/输出token数与首token时间，errors为按「类型:名称」统计的失败次数
+        """
+        with self._lock:
+            llm = {}
+            for node, histogram in self._llm_latency.items():
+                llm[node] = {**histogram.summary(), **{f"{k}_tokens": v for k, v in self._llm_tokens.get(node, {}).items()}}
+                if node in self._llm_ttft:
+                    llm[node]["ttft_p50_s"] = round(self._llm_ttft[node].quantile(0.5), 4)
+            return {
+                "graphs": {name: h.summary() for name, h in self._graph_latency.items()},
+                "nodes": {name: h.summary() for name, h in self._node_latency.items()},
+                "llm": llm,
+                "tools": {name: h.summary() for name, h in self._tool_latency.items()},
+                "errors": {f"{kind}:{name}": n for (kind, name), n in self._errors.items()},
+            }
+
+    def prometheus_text(self, prefix: str = "langgraph") -> str:
+        """
+        把汇总指标导出为Prometheus文本格式
+
+        参数:
+            prefix (str): 指标名前缀
+
+        返回:
+            str: 可被 node_exporter textfile collector 或 promtool 读取的文本
+        """
+        lines: List[str] = []
+
+        def histograms(name: str, help_text: str, label: str, table: Dict[str, Histogram]) -> None:
+            if not table:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, histogram in sorted(table.items()):
+                cumulative = 0
+                for bound, n in zip(histogram.buckets, histogram.counts):
+                    cumulative += n
+                    lines.append(f"{prefix}_{name}_bucket{{{_labels({label: key, 'le': repr(float(bound))})}}} {cumulative}")
+                lines.append(f"{prefix}_{name}_bucket{{{_labels({label: key, 'le': '+Inf'})}}} {histogram.count}")
+                lines.append(f"{prefix}_{name}_sum{{{_labels({label: key})}}} {histogram.sum:.6f}")
+                lines.append(f"{prefix}_{name}_count{{{_labels({label: key})}}} {histogram.count}")
+
+        with self._lock:
+            histograms("graph_duration_seconds", "Graph invocation latency", "graph", self._graph_latency)
+            histograms("node_duration_seconds", "Graph node latency", "node", self._node_latency)
+            histograms("llm_duration_seconds", "Chat model call latency by node", "node", self._llm_latency)
+            histograms("llm_ttft_seconds", "Chat model time to first token by node", "node", self._llm_ttft)
+            histograms("tool_duration_seconds", "Tool call latency", "tool", self._tool_latency)
+            if self._llm_tokens:
+                lines.append(f"# HELP {prefix}_llm_tokens_total Chat model tokens by node")
+                lines.append(f"# TYPE {prefix}_llm_tokens_total counter")
+                for node, tokens in sorted(self._llm_tokens.items()):
+                    for kind, n in tokens.items():
+                        lines.append(f"{prefix}_llm_tokens_total{{{_labels({'node': node, 'type': kind})}}} {n}")
+            if self._errors:
+                lines.append(f"# HELP {prefix}_errors_total Failed runs by kind and name")
+                lines.append(f"# TYPE {prefix}_errors_total counter")
+                for (kind, name), n in sorted(self._errors.items()):
+                    lines.append(f"{prefix}_errors_total{{{_labels({'kind': kind, 'name': name})}}} {n}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Optional[str] = None) -> None:
+        """
+        原子地写入Prometheus文本格式指标文件
+
+        参数:
+            path (str): 文件路径，默认使用构造时的 prometheus_path
+        """
+        path = path or self.prometheus_path
+        if path is None:
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def close(self) -> None:
+        """
+        写出缓冲中的span，并在配置了 prometheus_path 时写入指标文件
+        """
+        for exporter in self.exporters:
+            exporter.close()
+        self.write_prometheus()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._traces.clear()
+            self._open.clear()
+            for table in (self._graph_latency, self._node_latency, self._llm_latency,
+                          self._llm_ttft, self._llm_tokens, self._tool_latency):
+                table.clear()
+            self._errors.clear()
+
+
+def instrument(graph, tracer: GraphTracer, name: Optional[str] = None):
+    """
+    把追踪回调挂载到编译后的图上，返回的仍是同类型的图，调用时传入的callbacks会与之合并
+
+    参数:
+        graph: 编译后的图（StateGraph.compile() 或 create_agent 的返回值）
+        tracer (GraphTracer): 追踪回调
+        name (str): 图的运行名称，作为graph类span的名称，默认为 LangGraph
+
+    返回:
+        挂载了追踪回调的图
+    """
+    config = {"callbacks": [tracer]}
+    if name:
+        config["run_name"] = name
+    return graph.with_config(config)
+
+
+def tracer_from_env(prefix: str = "GRAPH_TRACE", name: str = "graph") -> Optional[GraphTracer]:
+    """
+    根据环境变量创建追踪回调，默认关闭
+
+    环境变量:
+        {prefix}: off（默认）、jsonl、prometheus，或逗号分隔的组合如 jsonl,prometheus
+        {prefix}_DIR: 输出目录，默认 learn/files/.cache/traces；
+            span写入 {name}.spans.jsonl，指标写入 {name}.prom
+
+    参数:
+        prefix (str): 环境变量前缀
+        name (str): 输出文件名前缀，通常为智能体名称
+
+    返回:
+        Optional[GraphTracer]: 追踪回调，off 时返回 None；进程退出时自动写出span与指标
+    """
+    outputs = {item.strip() for item in os.getenv(prefix, "off").lower().split(",")}
+    if not outputs & {"jsonl", "prometheus"}:
+        return None
+    default_dir = Path(__file__).resolve().parent.parent / "files" / ".cache" / "traces"
+    out_dir = os.getenv(f"{prefix}_DIR", str(default_dir))
+    exporters = [JSONLSpanExporter(os.path.join(out_dir, f"{name}.spans.jsonl"))] if "jsonl" in outputs else []
+    prometheus_path = os.path.join(out_dir, f"{name}.prom") if "prometheus" in outputs else None
+    tracer = GraphTracer(exporters, prometheus_path=prometheus_path)
+    atexit.register(tracer.close)
+    return tracer
@@ -0,0 +1,21 @@
+from .cache_metrics import PromptCacheMetrics
+from .registry import (
+    bind_tools_stable,
+    clear_registry,
+    configure_http_pool,
+    get_chat_model,
+    get_embeddings,
+    get_http_clients,
+    registry_stats,
+)
+
+__all__ = [
+    "PromptCacheMetrics",
+    "bind_tools_stable",
+    "clear_registry",
+    "configure_http_pool",
+    "get_chat_model",
+    "get_embeddings",
+    "get_http_clients",
+    "registry_stats",
+]
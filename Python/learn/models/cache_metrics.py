@@ -0,0 +1,89 @@
+"""
+提示词缓存命中统计
+通过回调收集每次模型调用返回的缓存命中/未命中 token 数，按图节点汇总；
+DeepSeek 对逐字节相同的请求前缀自动缓存，命中部分计费更低、首 token 更快
+"""
+import threading
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+def _cache_usage(message) -> Optional[Dict[str, int]]:
+    """从模型回复中读取缓存命中与未命中的输入 token 数"""
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        input_tokens = usage.get("input_tokens", 0) or 0
+        hit = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        return {"hit": hit, "miss": max(input_tokens - hit, 0)}
+    # 兼容未生成 usage_metadata 的情况，直接读取 DeepSeek 原始字段
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    if "prompt_cache_hit_tokens" in token_usage:
+        return {
+            "hit": token_usage.get("prompt_cache_hit_tokens", 0) or 0,
+            "miss": token_usage.get("prompt_cache_miss_tokens", 0) or 0,
+        }
+    return None
+
+
+class PromptCacheMetrics(BaseCallbackHandler):
+    """
+    按节点统计提示词缓存命中情况的回调
+
+    用法:
+        metrics = PromptCacheMetrics()
+        agent.invoke(inputs, config={"callbacks": [metrics]})
+        print(metrics.report())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._run_nodes: Dict[UUID, str] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[dict] = None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        with self._lock:
+            self._run_nodes[run_id] = node
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            node = self._run_nodes.pop(run_id, "unknown")
+        for generations in response.generations:
+            for generation in generations:
+                usage = _cache_usage(getattr(generation, "message", None))
+                if usage is None:
+                    continue
+                with self._lock:
+                    stats = self._stats.setdefault(node, {"calls": 0, "cache_hit_tokens": 0, "cache_miss_tokens": 0})
+                    stats["calls"] += 1
+                    stats["cache_hit_tokens"] += usage["hit"]
+                    stats["cache_miss_tokens"] += usage["miss"]
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._run_nodes.pop(run_id, None)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        返回按节点汇总的缓存命中统计
+
+        返回:
+            Dict[str, Dict[str, Any]]: 节点名 -> 调用次数、命中/未命中 token 数与命中率
+        """
+        with self._lock:
+            result = {}
+            for node, stats in self._stats.items():
+                total = stats["cache_hit_tokens"] + stats["cache_miss_tokens"]
+                result[node] = {
+                    **stats,
+                    "cache_hit_rate": round(stats["cache_hit_tokens"] / total, 4) if total else 0.0,
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._run_nodes.clear()
+            self._stats.clear()
@@ -0,0 +1,246 @@
+"""
+进程级模型注册表
+按 (provider, model, params) 懒加载并缓存聊天模型与嵌入模型实例，所有实例共用同一组
+httpx 连接池（可用时启用HTTP/2），减少TLS握手次数与每个进程的内存占用；
+异步连接池按事件循环分别维护，同一模型可在多个事件循环中使用
+"""
+import asyncio
+import json
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from langchain.chat_models import init_chat_model
+from langchain.embeddings import init_embeddings
+
+# 连接池默认配置，可通过环境变量或 configure_http_pool 调整
+_POOL_LIMITS: Dict[str, Any] = {
+    "max_connections": int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+    "keepalive_expiry": float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60")),
+}
+
+_lock = threading.RLock()
+_models: Dict[Tuple[str, str, str], Any] = {}
+_embeddings: Dict[Tuple[str, str, str], Any] = {}
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+_http_async_transport: Optional["_PerLoopAsyncTransport"] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 依赖可选的 h2 包，未安装时回退为 HTTP/1.1 keep-alive"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(**_POOL_LIMITS)
+
+
+class _PerLoopAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    按事件循环分别维护连接池的异步传输层
+    httpx 异步连接池绑定首次使用它的事件循环，换一个事件循环（再次 asyncio.run、测试、多循环服务）
+    复用同一个池会抛出 "Event loop is closed"；模型实例只能持有一个异步客户端，
+    因此客户端在进程内共享，连接池按事件循环隔离
+    """
+
+    def __init__(self, http2: bool, limits: httpx.Limits):
+        self._http2 = http2
+        self._limits = limits
+        self._lock = threading.Lock()
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(http2=self._http2, limits=self._limits)
+                self._transports[loop] = transport
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # 只能在当前事件循环内关闭属于它的连接池
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+    def close(self) -> None:
+        """
+        关闭所有事件循环上的连接池：循环运行中时提交关闭任务，循环已停止时直接执行关闭，
+        循环已关闭时其连接无法再使用，直接丢弃
+        """
+        with self._lock:
+            transports = list(self._transports.items())
+            self._transports.clear()
+        for loop, transport in transports:
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(transport.aclose(), loop)
+            else:
+                loop.run_until_complete(transport.aclose())
+
+
+def configure_http_pool(
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None,
+) -> None:
+    """
+    配置共享连接池大小，需在第一次获取模型之前调用
+
+    参数:
+        max_connections: 最大并发连接数
+        max_keepalive_connections: 最大保持活跃的空闲连接数
+        keepalive_expiry: 空闲连接保持时间（秒）
+
+    异常:
+        RuntimeError: 连接池已创建后再修改配置
+    """
+    with _lock:
+        if _http_client is not None or _http_async_client is not None:
+            raise RuntimeError("连接池已创建，请在获取模型之前配置")
+        if max_connections is not None:
+            _POOL_LIMITS["max_connections"] = max_connections
+        if max_keepalive_connections is not None:
+            _POOL_LIMITS["max_keepalive_connections"] = max_keepalive_connections
+        if keepalive_expiry is not None:
+            _POOL_LIMITS["keepalive_expiry"] = keepalive_expiry
+
+
+def get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    获取进程共享的同步/异步 httpx 客户端，异步客户端在每个事件循环中使用各自的连接池
+
+    返回:
+        Tuple[httpx.Client, httpx.AsyncClient]: 同步客户端与异步客户端
+    """
+    global _http_client, _http_async_client, _http_async_transport
+    with _lock:
+        if _http_client is None:
+            http2 = _http2_available()
+            _http_client = httpx.Client(http2=http2, limits=_limits())
+            _http_async_transport = _PerLoopAsyncTransport(http2, _limits())
+            _http_async_client = httpx.AsyncClient(transport=_http_async_transport)
+        return _http_client, _http_async_client
+
+
+def _cache_key(provider: str, model: str, params: Dict[str, Any]) -> Tuple[str, str, str]:
+    return provider, model, json.dumps(params, sort_keys=True, default=str)
+
+
+def get_chat_model(provider: str = "deepseek", model: str = "deepseek-chat", **params):
+    """
+    获取缓存的聊天模型，相同 (provider, model, params) 在进程内只创建一次
+
+    参数:
+        provider (str): 模型供应商，与 init_chat_model 的 model_provider 一致
+        model (str): 模型名称
+        **params: 其余模型参数，如 temperature、max_retries、api_key、base_url
+
+    返回:
+        BaseChatModel: 共享连接池的聊天模型实例
+    """
+    key = _cache_key(provider, model, params)
+    with _lock:
+        chat_model = _models.get(key)
+        if chat_model is None:
+            http_client, http_async_client = get_http_clients()
+            chat_model = init_chat_model(
+                model=model,
+                model_provider=provider,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                **params,
+            )
+            _models[key] = chat_model
+        return chat_model
+
+
+def get_embeddings(provider: str = "openai", model: str = "text-embedding-v3", **params):
+    """
+    获取缓存的嵌入模型，相同 (provider, model, params) 在进程内只创建一次，与聊天模型共用连接池
+
+    参数:
+        provider (str): 模型供应商，与 init_embeddings 的 provider 一致
+        model (str): 模型名称
+        **params: 其余模型参数，如 api_key、base_url、check_embedding_ctx_length
+
+    返回:
+        Embeddings: 共享连接池的嵌入模型实例
+    """
+    key = _cache_key(provider, model, params)
+    with _lock:
+        embeddings = _embeddings.get(key)
+        if embeddings is None:
+            http_client, http_async_client = get_http_clients()
+            embeddings = init_embeddings(
+                model,
+                provider=provider,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                **params,
+            )
+            _embeddings[key] = embeddings
+        return embeddings
+
+
+def bind_tools_stable(chat_model, tools: list, **kwargs):
+    """
+    按工具名称排序后绑定工具，保证请求中的工具定义顺序与内容在每次调用、每次启动间都一致，
+    不会因工具列表的构建或发现顺序不同而破坏提示词前缀缓存
+
+    参数:
+        chat_model: 聊天模型
+        tools (list): 工具列表
+        **kwargs: 透传给 bind_tools 的参数
+
+    返回:
+        Runnable: 绑定工具后的模型
+    """
+    return chat_model.bind_tools(sorted(tools, key=lambda tool: tool.name), **kwargs)
+
+
+def registry_stats() -> Dict[str, Any]:
+    """
+    返回注册表状态，便于观察进程内实际创建的模型与连接池配置
+
+    返回:
+        Dict[str, Any]: 已缓存模型列表与连接池配置
+    """
+    with _lock:
+        return {
+            "models": [f"{provider}:{model}" for provider, model, _ in _models],
+            "embeddings": [f"{provider}:{model}" for provider, model, _ in _embeddings],
+            "http2": _http2_available(),
+            "pool_limits": dict(_POOL_LIMITS),
+        }
+
+
+def clear_registry() -> None:
+    """
+    清空模型与嵌入模型缓存并关闭共享的同步客户端与各事件循环上的异步连接池
+    """
+    global _http_client, _http_async_client, _http_async_transport
+    with _lock:
+        _models.clear()
+        _embeddings.clear()
+        if _http_client is not None:
+            _http_client.close()
+        if _http_async_transport is not None:
+            _http_async_transport.close()
+        _http_client = None
+        _http_async_client = None
+        _http_async_transport = None
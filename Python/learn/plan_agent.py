@@ -7,16 +7,70 @@
 import os
 import json
 import asyncio
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Annotated, List, Literal, Optional, AsyncGenerator
 from typing_extensions import TypedDict
+from langgraph.config import get_stream_writer
 from langgraph.graph import START, StateGraph, END
-from langchain_openai import ChatOpenAI
-from langchain_deepseek import ChatDeepSeek
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+from models import PromptCacheMetrics, get_chat_model
 from pydantic import BaseModel, Field
 import operator
 
 
+# 静态系统提示词在模块加载时构建一次，每次调用逐字节相同，
+# 动态内容（用户目标、任务信息、依赖结果）统一放在其后的用户消息中，便于命中服务端前缀缓存
+PLAN_SYSTEM_PROMPT = """
+# 角色
+你是世界级规划专家，及其擅长将复杂的任务目标转化成可执行计划。
+# 任务拆分原则
+1. 原子性：每个任务必须是不可再分的最小执行单元
+2. 覆盖率：所有任务组合必须能100%达成原始目标
+3. 依赖性：任务只有在必须使用其他任务结果时才在depends_on中声明前置任务ID，相互独立的任务depends_on为空列表，以便并行执行
+# 返回数据示例
+{
+    "user_goal": "原始用户目标描述",
+    "tasks": [
+        {
+            "task_id": "任务唯一标识符, 格式要求：task_{index}",
+            "task_name": "执行任务名称",
+            "desc": "具体可执行的任务描述",
+            "depends_on": ["前置依赖任务ID，无依赖时为空列表"]
+        }
+    ]
+}
+"""
+
+WORKER_SYSTEM_PROMPT = """
+# 角色
+你是专注精准执行的AI助手，严格按指令完成当前任务
+# 要求
+1. 严格按照当前任务描述执行当前任务，不能偏离任务目标，也不得执行其他步骤任务。
+"""
+
+FINAL_SYSTEM_PROMPT = """
+# 角色
+你是一个计划完成评估器，对已完成的任务列表进行总结。
+# 示例输入
+{
+    "completed_tasks": [
+        {
+            "task_id": "task_1",
+            "task_name": "任务1",
+            "result": "任务1执行结果",
+        },
+        {
+            "task_id": "task_2",
+            "task_name": "任务2",
+            "result": "任务2执行结果",
+        }
+    ]
+}
+"""
+
+
 # 结构化输出模型
 class TaskStep(BaseModel):
     """计划步骤输出结构化模型"""
@@ -24,6 +78,7 @@ class TaskStep(BaseModel):
     task_name: str = Field(description="执行任务名称")
     desc: str = Field(description="具体可执行的任务描述")
     result: str = Field(description="任务执行结果")
+    depends_on: List[str] = Field(default_factory=list, description="前置依赖任务ID列表，无依赖时为空列表，示例：[\"task_0\"]")
     # status: Literal['pending', 'executing', 'completed', 'failed'] = Field("pending")
 
 class PlanModel(BaseModel):
@@ -39,61 +94,110 @@ class PlanState(TypedDict):
     completed_tasks: Annotated[
         list, operator.add
     ]
+    # 已完成任务结果，key为task_id，并行执行时多个工作节点的结果会被合并
+    task_results: Annotated[
+        dict, operator.or_
+    ]
     final_res: str
 
-    
+
 # 监控智能体    
 class PlanAgent:
-    def __init__(self):
-        self.ds_worker_llm = self._get_ds_llm()
-        self.ds_plan_llm = self._get_ds_llm().with_structured_output(PlanModel)
-        self.ds_llm = self._get_ds_llm()
-        self.qwen_llm = self._get_qwen_llm()
+    """
+    规划智能体
+
+    参数:
+        execution_mode: 执行模式，"serial" 按顺序逐个执行任务；
+            "parallel" 按依赖关系调度，任一任务完成后立即启动依赖已满足的任务
+        max_concurrency: 并行模式下同时执行的最大任务数
+        native_async: 为True时节点同时提供异步实现，ainvoke/astream不会阻塞事件循环；
+            为False时仅注册同步节点，异步执行时由线程池代为运行（用于基准对比）
+        llm: 可注入的聊天模型，默认使用DeepSeek
+        tracer: 可选的GraphTracer，挂载后记录每个节点与模型调用的耗时和token数
+
+    每次运行的服务端提示词缓存命中情况按节点累计在 cache_metrics 中
+    """
+    def __init__(
+        self,
+        execution_mode: Literal['serial', 'parallel'] = 'serial',
+        max_concurrency: int = 4,
+        native_async: bool = True,
+        llm=None,
+        tracer=None,
+    ):
+        if execution_mode not in ('serial', 'parallel'):
+            raise ValueError(f"不支持的执行模式: {execution_mode}")
+        self.execution_mode = execution_mode
+        self.max_concurrency = max(1, max_concurrency)
+        self.native_async = native_async
+        # 所有节点共用注册表中的同一个模型实例，多个PlanAgent之间也共享HTTP连接池
+        self.ds_llm = llm if llm is not None else self._get_ds_llm()
+        self.ds_worker_llm = self.ds_llm
+        self.ds_plan_llm = self.ds_llm.with_structured_output(PlanModel)
+        self.cache_metrics = PromptCacheMetrics()
+        self.tracer = tracer
         self.graph = self._build_graph()
     
     # 执行
     async def ainvoke(self, content: str):
         res = await self.graph.ainvoke({
             'user_content': content,
-        })
+        }, config=self._run_config())
         return res
     
     # 流式执行
-    async def astream(self, content: str) -> AsyncGenerator[str, None]:
+    async def astream(self, content: str, stream_tokens: bool = False) -> AsyncGenerator[str, None]:
         """
         流式执行智能体，每个节点的输出都会实时返回
+
+        参数:
+            content: 用户输入内容
+            stream_tokens: 为True时额外推送工作节点与总结节点的逐token增量帧
+                （status为"streaming"，带task_id），节点完成帧的格式保持不变
         """
-        async for event in self.graph.astream({
+        tasks_order = []
+        stream_mode = ['updates']
+        if stream_tokens:
+            stream_mode.append('messages')
+        if self.execution_mode == 'parallel':
+            # 并行模式下所有任务在同一个工作节点内调度，每个任务完成时通过custom流单独推送
+            stream_mode.append('custom')
+        async for mode, event in self.graph.astream({
             'user_content': content,
-        }):
+        }, config=self._run_config(), stream_mode=stream_mode):
+            if mode == 'messages':
+                token_frame = self._token_frame(*event)
+                if token_frame:
+                    yield token_frame
+                continue
+            if mode == 'custom':
+                yield self._worker_frame(event['step'], event['task_id'], event['result'])
+                continue
             # 处理每个节点的输出
             for node_name, node_output in event.items():
                 if node_name == 'plan_llm_call':
                     # 规划节点输出
                     if 'tasks' in node_output:
+                        tasks_order = [task.task_id for task in node_output['tasks']]
                         tasks_info = {
                             "node": "plan_llm_call",
                             "status": "completed",
                             "data": {
                                 "tasks_count": len(node_output['tasks']),
-                                "tasks": [{"task_id": task.task_id, "task_name": task.task_name, "desc": task.desc} for task in node_output['tasks']]
+                                "tasks": [{"task_id": task.task_id, "task_name": task.task_name, "desc": task.desc, "depends_on": task.depends_on} for task in node_output['tasks']]
                             }
                         }
                         yield f"data: {json.dumps(tasks_info, ensure_ascii=False)}\n\n"
                 
-                elif node_name == 'worker_llm_call':
+                elif node_name == 'worker_llm_call' and self.execution_mode == 'serial':
                     # 工作节点输出
                     if 'completed_tasks' in node_output and node_output['completed_tasks']:
-                        current_step = node_output.get('current_step', 1) - 1
-                        worker_info = {
-                            "node": "worker_llm_call",
-                            "status": "completed",
-                            "data": {
-                                "step": current_step,
-                                "result": node_output['completed_tasks'][-1] if node_output['completed_tasks'] else ""
-                            }
-                        }
-                        yield f"data: {json.dumps(worker_info, ensure_ascii=False)}\n\n"
+                        task_id = next(iter(node_output.get('task_results') or {}), None)
+                        if task_id in tasks_order:
+                            current_step = tasks_order.index(task_id)
+                        else:
+                            current_step = node_output.get('current_step', 1) - 1
+                        yield self._worker_frame(current_step, task_id, node_output['completed_tasks'][-1])
                 
                 elif node_name == 'final_llm_cll':
                     # 最终总结节点输出
@@ -110,90 +214,254 @@ class PlanAgent:
         # 发送结束信号
         yield f"data: {json.dumps({'status': 'finished'}, ensure_ascii=False)}\n\n"
 
+    # 工作节点完成帧
+    def _worker_frame(self, step: int, task_id: Optional[str], result: str) -> str:
+        worker_info = {
+            "node": "worker_llm_call",
+            "status": "completed",
+            "data": {
+                "step": step,
+                "task_id": task_id,
+                "result": result
+            }
+        }
+        return f"data: {json.dumps(worker_info, ensure_ascii=False)}\n\n"
+
+    # token增量帧
+    def _token_frame(self, chunk, metadata: dict) -> Optional[str]:
+        """
+        将messages流模式下的消息块转换为SSE帧，仅推送工作节点和总结节点的文本增量
+        """
+        node_name = metadata.get('langgraph_node')
+        if node_name not in ('worker_llm_call', 'final_llm_cll'):
+            return None
+        delta = chunk.content if isinstance(chunk.content, str) else ''
+        if not delta:
+            return None
+        token_info = {
+            "node": node_name,
+            "status": "streaming",
+            "data": {
+                "task_id": metadata.get('task_id'),
+                "delta": delta
+            }
+        }
+        return f"data: {json.dumps(token_info, ensure_ascii=False)}\n\n"
+
 
     # 协调器节点
+    def _plan_messages(self, state: PlanState) -> list:
+        """
+        构建规划节点的输入消息
+        """
+        print(f"plan_llm_call: {state['user_content']}")
+        return [
+            SystemMessage(content=PLAN_SYSTEM_PROMPT),
+            HumanMessage(content=f"请根据用户输入{state['user_content']}，进行任务规划。")
+            ]
+
     def _plan_llm_call(self, state: PlanState) -> PlanState:
         """
         规划大模型节点，根据用户输入生成计划
         """
-        plan_prompt = f"""
-            # 角色
-            你是世界级规划专家，及其擅长将复杂的任务目标转化成可执行计划。
-            # 任务拆分原则
-            1. 原子性：每个任务必须是不可再分的最小执行单元
-            2. 覆盖率：所有任务组合必须能100%达成原始目标
-            # 返回数据示例
-            {{
-                "user_goal": "原始用户目标描述",
-                "tasks": [
-                    {{
-                        "task_id": "任务唯一标识符, 格式要求：task_{{index}}",
-                        "task_name": "执行任务名称",
-                        "desc": "具体可执行的任务描述"
-                    }}
-                ]
-            }}
+        plan = self.ds_plan_llm.invoke(self._plan_messages(state))
+        return {'tasks': plan.tasks, "current_step": 0}
+
+    async def _aplan_llm_call(self, state: PlanState) -> PlanState:
         """
-        print(f"plan_llm_call: {state['user_content']}")
-        plan = self.ds_plan_llm.invoke([
-            SystemMessage(content=plan_prompt),
-            HumanMessage(content=f"请根据用户输入{state['user_content']}，进行任务规划。")
-            ])
+        规划大模型节点的异步实现
+        """
+        plan = await self.ds_plan_llm.ainvoke(self._plan_messages(state))
         return {'tasks': plan.tasks, "current_step": 0}
 
     # 工作节点
-    def _worker_llm_call(self, state: PlanState) -> PlanState:
+    def _worker_messages(self, state: PlanState) -> list:
         """
-        工作节点，根据当前任务执行计划，调用大模型执行任务
+        构建串行工作节点的输入消息
         """
         currentStep = state['current_step']
         currentTask = state['tasks'][currentStep]
-        next_step = currentStep + 1
+        worker_promt = self._build_worker_prompt(state['user_content'], currentTask)
+        print('current_step: ', currentStep)
+        print(f"worker_llm_call: {currentTask.task_name}")
+        return [SystemMessage(content=WORKER_SYSTEM_PROMPT), HumanMessage(content=worker_promt)]
+
+    def _worker_update(self, state: PlanState, task_res) -> PlanState:
+        currentStep = state['current_step']
+        currentTask = state['tasks'][currentStep]
+        return {
+            'completed_tasks': [task_res.content],
+            'task_results': {currentTask.task_id: task_res.content},
+            'current_step': currentStep + 1
+        }
+
+    def _worker_llm_call(self, state: PlanState) -> PlanState:
+        """
+        工作节点，根据当前任务执行计划，调用大模型执行任务
+        """
+        task_res = self.ds_worker_llm.invoke(self._worker_messages(state), config=self._task_config(state['tasks'][state['current_step']]))
+        return self._worker_update(state, task_res)
+
+    async def _aworker_llm_call(self, state: PlanState) -> PlanState:
+        """
+        工作节点的异步实现
+        """
+        task_res = await self.ds_worker_llm.ainvoke(self._worker_messages(state), config=self._task_config(state['tasks'][state['current_step']]))
+        return self._worker_update(state, task_res)
+
+    # 模型调用配置，把task_id写入运行元数据，供token流区分并行任务
+    def _task_config(self, task: TaskStep) -> dict:
+        return {'metadata': {'task_id': task.task_id}}
+
+    # 并行工作节点
+    def _parallel_worker_messages(self, user_content: str, task: TaskStep, dep_results: dict) -> list:
+        """
+        构建并行任务的输入消息
+        """
+        worker_promt = self._build_worker_prompt(user_content, task, dep_results)
+        print(f"worker_llm_call: {task.task_id} {task.task_name}")
+        return [SystemMessage(content=WORKER_SYSTEM_PROMPT), HumanMessage(content=worker_promt)]
+
+    def _ready_tasks(self, tasks: List[TaskStep], done: dict, running: set) -> List[TaskStep]:
+        """
+        找出依赖已全部完成、尚未开始的任务，数量不超过剩余的并发名额
+        """
+        known_ids = {task.task_id for task in tasks}
+        pending = [task for task in tasks if task.task_id not in done and task.task_id not in running]
+        # 未知的依赖ID视为已满足，避免因规划错误导致任务永远无法执行
+        ready = [
+            task for task in pending
+            if all(dep in done or dep not in known_ids for dep in task.depends_on)
+        ]
+        if not ready and not running and pending:
+            # 依赖成环时按顺序执行第一个未完成任务以打破死锁
+            ready = pending[:1]
+        ready = ready[:self.max_concurrency - len(running)]
+        if ready:
+            print(f"dispatch tasks: {[task.task_id for task in ready]}")
+        return ready
+
+    def _dep_results(self, task: TaskStep, done: dict) -> dict:
+        return {dep: done[dep] for dep in task.depends_on if dep in done}
+
+    def _run_task(self, user_content: str, task: TaskStep, dep_results: dict) -> str:
+        messages = self._parallel_worker_messages(user_content, task, dep_results)
+        return self.ds_worker_llm.invoke(messages, config=self._task_config(task)).content
+
+    async def _arun_task(self, user_content: str, task: TaskStep, dep_results: dict) -> str:
+        messages = self._parallel_worker_messages(user_content, task, dep_results)
+        return (await self.ds_worker_llm.ainvoke(messages, config=self._task_config(task))).content
+
+    def _task_done(self, writer, tasks: List[TaskStep], task: TaskStep, result: str) -> None:
+        # 每个任务完成即推送一帧，astream据此逐个返回任务结果
+        writer({'step': tasks.index(task), 'task_id': task.task_id, 'result': result})
+
+    def _parallel_worker_update(self, state: PlanState, done: dict) -> PlanState:
+        previous = state.get('task_results') or {}
+        finished = [task.task_id for task in state.get('tasks') or [] if task.task_id in done and task.task_id not in previous]
+        return {
+            'completed_tasks': [done[task_id] for task_id in finished],
+            'task_results': {task_id: done[task_id] for task_id in finished}
+        }
+
+    def _parallel_worker_llm_call(self, state: PlanState) -> PlanState:
+        """
+        并行工作节点，按依赖关系调度全部任务：任一任务完成后立即启动新就绪的任务，
+        批次之间没有等待，总耗时取决于依赖链上的关键路径而非每层最慢任务之和
+        """
+        tasks = state.get('tasks') or []
+        done = dict(state.get('task_results') or {})
+        writer = get_stream_writer()
+        running = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='plan-worker')
+        try:
+            while True:
+                for task in self._ready_tasks(tasks, done, {task.task_id for task in running.values()}):
+                    # 复制当前上下文，模型调用仍挂在本节点的回调之下（token流、缓存统计、追踪）
+                    future = pool.submit(contextvars.copy_context().run, self._run_task,
+                                         state['user_content'], task, self._dep_results(task, done))
+                    running[future] = task
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    done[task.task_id] = future.result()
+                    self._task_done(writer, tasks, task, done[task.task_id])
+        finally:
+            # 与异步实现一致：某个任务失败时不等待其余仍在执行的模型调用，立即上抛异常
+            pool.shutdown(wait=False, cancel_futures=True)
+        return self._parallel_worker_update(state, done)
+
+    async def _aparallel_worker_llm_call(self, state: PlanState) -> PlanState:
+        """
+        并行工作节点的异步实现
+        """
+        tasks = state.get('tasks') or []
+        done = dict(state.get('task_results') or {})
+        writer = get_stream_writer()
+        running = {}
+        try:
+            while True:
+                for task in self._ready_tasks(tasks, done, {task.task_id for task in running.values()}):
+                    future = asyncio.ensure_future(self._arun_task(state['user_content'], task, self._dep_results(task, done)))
+                    running[future] = task
+                if not running:
+                    break
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    done[task.task_id] = future.result()
+                    self._task_done(writer, tasks, task, done[task.task_id])
+        finally:
+            # 某个任务失败时取消其余仍在执行的任务
+            for future in running:
+                future.cancel()
+        return self._parallel_worker_update(state, done)
+
+    def _build_worker_prompt(self, user_content: str, task: TaskStep, dep_results: Optional[dict] = None) -> str:
+        """
+        构建工作节点的动态提示词（用户消息），有前置依赖时附带依赖任务的执行结果
+        """
         worker_promt = f"""
-            # 角色
-            你是专注精准执行的AI助手，严格按指令完成当前任务
             # 全局目标上下文
-            总体目标： {state['user_content']}
-            当前任务ID: {currentTask.task_id}
+            总体目标： {user_content}
+            当前任务ID: {task.task_id}
             # 当前任务信息
-            当前任务名称： {currentTask.task_name}
-            当前任务描述： {currentTask.desc}
-            # 要求
-            1. 严格按照当前任务描述执行当前任务，不能偏离任务目标，也不得执行其他步骤任务。
+            当前任务名称： {task.task_name}
+            当前任务描述： {task.desc}
         """
-        print('current_step: ', currentStep)
-        print(f"worker_llm_call: {currentTask.task_name}")
-        task_res = self.ds_worker_llm.invoke([
-            HumanMessage(content=worker_promt)
-            ])
-        return {'completed_tasks': [task_res.content], 'current_step': next_step}
+        if dep_results:
+            dep_text = "\n".join(f"{task_id}: {res}" for task_id, res in dep_results.items())
+            worker_promt += f"""
+            # 前置任务结果
+            {dep_text}
+        """
+        return worker_promt
 
     # 总结
+    def _final_messages(self, state: PlanState) -> list:
+        """
+        构建总结节点的输入消息
+        """
+        # 按计划中的任务顺序组织结果，并行模式下完成顺序不确定，不能直接使用completed_tasks
+        task_results = state.get('task_results') or {}
+        completed_tasks = [task_results[task.task_id] for task in state.get('tasks') or [] if task.task_id in task_results]
+        print(f"final_llm_cll: 对已完成任务进行评估，已完成任务数：{len(completed_tasks)}")
+        return [
+            SystemMessage(content=FINAL_SYSTEM_PROMPT),
+            HumanMessage(content=f"请根据已完成的任务列表，进行总结。已完成的任务列表：{completed_tasks}")
+        ]
+
     def _final_llm_cll(self, state: PlanState) -> PlanState:
-        final_prompt = f"""
-            # 角色
-            你是一个计划完成评估器，对已完成的任务列表进行总结。
-            # 示例输入
-            {{
-                "completed_tasks": [
-                    {{
-                        "task_id": "task_1",
-                        "task_name": "任务1",
-                        "result": "任务1执行结果",
-                    }},
-                    {{
-                        "task_id": "task_2",
-                        "task_name": "任务2",
-                        "result": "任务2执行结果",
-                    }}
-                ]
-            }}
-        """
-        print(f"final_llm_cll: 对已完成任务进行评估，已完成任务数：{len(state['completed_tasks'])}")
-        final_res = self.ds_llm.invoke([
-            SystemMessage(content=final_prompt),
-            HumanMessage(content=f"请根据已完成的任务列表，进行总结。已完成的任务列表：{state['completed_tasks']}")
-        ])
+        final_res = self.ds_llm.invoke(self._final_messages(state))
+        return {'final_res': final_res.content}
+
+    async def _afinal_llm_cll(self, state: PlanState) -> PlanState:
+        """
+        总结节点的异步实现
+        """
+        final_res = await self.ds_llm.ainvoke(self._final_messages(state))
         return {'final_res': final_res.content}
 
     # 条件边
@@ -209,13 +477,28 @@ class PlanAgent:
             return 'worker_llm_call'
         return 'final_llm_cll'
 
+    # 运行配置，挂载缓存命中统计与追踪回调；并行任务数由工作节点内的调度按max_concurrency限制
+    def _run_config(self) -> dict:
+        config = {'callbacks': [self.cache_metrics]}
+        if self.tracer is not None:
+            config['callbacks'].append(self.tracer)
+        return config
+
+    # 同步/异步双实现节点：invoke时走同步实现，ainvoke/astream时直接await异步实现，不占用线程池
+    def _node(self, func, afunc):
+        if not self.native_async:
+            return func
+        return RunnableLambda(func, afunc=afunc, name=func.__name__.lstrip('_'))
+
     # 组装
     def _build_graph(self):
+        if self.execution_mode == 'parallel':
+            return self._build_parallel_graph()
         workflow = StateGraph(PlanState)
         # 添加节点
-        workflow.add_node('plan_llm_call', self._plan_llm_call)
-        workflow.add_node('worker_llm_call', self._worker_llm_call)
-        workflow.add_node('final_llm_cll', self._final_llm_cll)
+        workflow.add_node('plan_llm_call', self._node(self._plan_llm_call, self._aplan_llm_call))
+        workflow.add_node('worker_llm_call', self._node(self._worker_llm_call, self._aworker_llm_call))
+        workflow.add_node('final_llm_cll', self._node(self._final_llm_cll, self._afinal_llm_cll))
         # 添加条件边
         workflow.add_edge(START, "plan_llm_call")
         workflow.add_edge("plan_llm_call", "worker_llm_call")
@@ -227,16 +510,31 @@ class PlanAgent:
         workflow.add_edge("final_llm_cll", END)
         return workflow.compile()
 
+    # 并行组装：plan -> 按依赖调度全部任务的worker -> 总结
+    def _build_parallel_graph(self):
+        workflow = StateGraph(PlanState)
+        workflow.add_node('plan_llm_call', self._node(self._plan_llm_call, self._aplan_llm_call))
+        workflow.add_node('worker_llm_call', self._node(self._parallel_worker_llm_call, self._aparallel_worker_llm_call))
+        workflow.add_node('final_llm_cll', self._node(self._final_llm_cll, self._afinal_llm_cll))
+
+        workflow.add_edge(START, "plan_llm_call")
+        workflow.add_edge("plan_llm_call", "worker_llm_call")
+        workflow.add_edge("worker_llm_call", "final_llm_cll")
+        workflow.add_edge("final_llm_cll", END)
+        return workflow.compile()
+
     # 获取deepseek大模型
     def _get_ds_llm(self):
-        return ChatDeepSeek(
+        return get_chat_model(
+            provider="deepseek",
             model="deepseek-chat",
             api_key=os.environ["DEEPSEEK_API_KEY"],
             base_url="https://api.deepseek.com",
         )
-    # 多模态大模型
+    # 多模态大模型，按需从注册表获取
     def _get_qwen_llm(self):
-        return ChatOpenAI(
+        return get_chat_model(
+            provider="openai",
             model="qwen-plus",
             api_key=os.getenv("DASHSCOPE_API_KEY"),
             base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
@@ -16,25 +16,28 @@ tools = [create_ppt_from_json, current_time]
 tools_by_name = {tool.name: tool for tool in tools}
 
 # 定义大模型
-from langchain.chat_models import init_chat_model
+from models import PromptCacheMetrics, bind_tools_stable, get_chat_model
 
-model = init_chat_model(
+# 从进程级注册表获取模型，相同配置共用同一个实例和HTTP连接池
+model = get_chat_model(
+    provider="deepseek",
     model="deepseek-chat",
-    model_provider="deepseek",
     temperature=0.7,
     max_tokens=None,
     timeout=None,
     max_retries=2,
 )
 
-# 绑定工具
-model_with_tools = model.bind_tools(tools)
+# 绑定工具，按名称排序保证工具定义顺序稳定，不破坏服务端提示词前缀缓存
+model_with_tools = bind_tools_stable(model, tools)
+# 服务端提示词缓存命中统计
+cache_metrics = PromptCacheMetrics()
 
 
 # 定义状态
 from langchain.messages import AnyMessage
 from typing_extensions import Annotated, TypedDict
-import operator
+from common import windowed_messages
 
 
 class MessagesState(TypedDict):
@@ -42,43 +45,32 @@ class MessagesState(TypedDict):
     消息状态
     
     属性:
-        messages (list[AnyMessage]): 消息列表,使用operator.add追加新消息
+        messages (list[AnyMessage]): 消息列表,使用windowed_messages追加新消息并裁剪已并入摘要的消息
         llm_calls (int): LLM调用次数统计
         tools_calls (int): 工具调用次数统计
+        summary (str): 滑出消息窗口的历史消息摘要
+        summarized_count (int): 已并入摘要的消息数量
     """
-    messages: Annotated[list[AnyMessage], operator.add]
+    messages: Annotated[list[AnyMessage], windowed_messages]
     llm_calls: int
     tools_calls: int
+    summary: str
+    summarized_count: int
 
 
 # 定义节点
 
 # 大模型调用节点
-from langchain.messages import SystemMessage
+from common import MessageWindow, PromptPrefix, instrument, tracer_from_env
 
-
-def llm_call(state: dict) -> dict:
-    """
-    LLM调用节点,决定是否调用工具
-    
-    参数:
-        state (dict): 当前状态,包含messages等信息
-    
-    返回:
-        dict: 更新后的状态,包含新消息和调用次数
-    
-    异常:
-        Exception: LLM调用失败时抛出异常
-    """
-    messages = state["messages"]
-    
-    system_prompt = """你是一个专业的PPT制作助手。你的任务是根据用户提供的主题和页面数创建美观、专业的PPT。
+# PPT设计系统提示词，静态内容不做任何插值，保证每次请求的前缀逐字节一致
+SYSTEM_PROMPT = """你是一个专业的PPT制作助手。你的任务是根据用户提供的主题和页面数创建美观、专业的PPT。
 
 工作流程:
 1. 理解用户的PPT主题和需求
 2. 根据主题和页面数,设计合理的PPT结构
 3. 为每一页生成合适的标题和内容
-4. 使用create_ppt_from_json工具创建PPT
+4. 使用create_ppt_from_json工具创建PPT,json_data可直接传入JSON对象;若工具返回校验错误,只需按列出的位置修正对应字段后重新调用
 
 PPT设计原则:
 - 第一页必须是标题页(type: "title"),包含吸引人的主标题和副标题
@@ -117,19 +109,41 @@ PPT设计原则:
    {"type": "image_text", "title": "标题", "content": ["文字内容"], "image_description": "图片说明", "color_scheme": "blue_green"}
 
 请根据用户需求创建专业、美观的PPT内容,合理搭配不同的页面类型。"""
+
+# 系统提示词只构建一次，并始终位于模型输入最前面，便于命中服务端前缀缓存
+prompt_prefix = PromptPrefix(SYSTEM_PROMPT)
+# 只把「系统提示词 + 滚动摘要 + 最近消息」送入模型，长会话的提示词长度保持有界
+history_window = MessageWindow(summarizer=model, max_tokens=8000, keep_last=12, prefix=prompt_prefix, trim_history=True)
+
+
+def llm_call(state: dict) -> dict:
+    """
+    LLM调用节点,决定是否调用工具
     
-    response = model_with_tools.invoke(
-        [SystemMessage(content=system_prompt)] + messages
-    )
+    参数:
+        state (dict): 当前状态,包含messages等信息
+    
+    返回:
+        dict: 更新后的状态,包含新消息和调用次数
+    
+    异常:
+        Exception: LLM调用失败时抛出异常
+    """
+    window = history_window.prepare(state)
+    
+    response = model_with_tools.invoke(window.messages)
     
     return {
-        "messages": [response],
-        "llm_calls": state.get('llm_calls', 0) + 1
+        "messages": [*window.trim, response],
+        "llm_calls": state.get('llm_calls', 0) + 1,
+        **window.updates
     }
 
 
 # 工具调用节点
-from langchain.messages import ToolMessage
+from tools.executor import ToolExecutor
+
+tool_executor = ToolExecutor(tools, per_tool_limits={"create_ppt_from_json": 2})
 
 
 def tool_node(state: dict) -> dict:
@@ -146,11 +160,8 @@ def tool_node(state: dict) -> dict:
         KeyError: 工具不存在时抛出异常
         Exception: 工具执行失败时抛出异常
     """
-    result = []
-    for tool_call in state["messages"][-1].tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observation = tool.invoke(tool_call["args"])
-        result.append(ToolMessage(content=observation, tool_call_id=tool_call["id"]))
+    # 同一轮的多个工具调用并发执行，结果按原始调用顺序返回
+    result = tool_executor.run(state["messages"][-1].tool_calls)
     
     return {
         "messages": result,
@@ -193,6 +204,11 @@ graph.add_edge("tool_node", "llm_call")
 # 编译工作流
 ppt_agent = graph.compile()
 
+# 节点耗时、token与工具调用追踪，默认关闭，设置 GRAPH_TRACE=jsonl 或 prometheus 开启
+tracer = tracer_from_env(name="ppt_agent")
+if tracer is not None:
+    ppt_agent = instrument(ppt_agent, tracer, name="ppt_agent")
+
 
 def create_ppt(topic: str, num_slides: int = 5, output_path: str = "output.pptx") -> dict:
     """
@@ -218,13 +234,168 @@ def create_ppt(topic: str, num_slides: int = 5, output_path: str = "output.pptx"
         "messages": messages,
         "llm_calls": 0,
         "tools_calls": 0
-    })
+    }, config={"callbacks": [cache_metrics]})
     
     return result
 
 
+# 批量生成
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+FILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "files")
+
+
+def load_batch_jobs(jobs_path: str) -> list:
+    """
+    读取批量任务文件，每行一个JSON对象:
+    {"topic": "主题", "num_slides": 6, "output_path": "deck.pptx"}
+    
+    参数:
+        jobs_path (str): JSONL任务文件路径
+    
+    返回:
+        list: 任务列表，每项包含line、topic、num_slides和output_path
+    
+    异常:
+        ValueError: 某行不是合法JSON、缺少topic、num_slides不是正整数或output_path与其他行重复时抛出，
+            错误信息包含行号
+    """
+    jobs = []
+    # 解析后的输出路径 -> 行号，多个任务写同一个文件会互相覆盖
+    output_lines = {}
+    with open(jobs_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"第{line_no}行不是合法的JSON: {e}") from e
+            if not isinstance(row, dict) or not row.get("topic"):
+                raise ValueError(f"第{line_no}行缺少topic字段")
+            try:
+                num_slides = int(row.get("num_slides", 5))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"第{line_no}行的num_slides不是整数: {row.get('num_slides')!r}") from e
+            if num_slides < 1:
+                raise ValueError(f"第{line_no}行的num_slides必须大于0: {num_slides}")
+            output_path = row.get("output_path") or f"deck_{line_no}.pptx"
+            if not isinstance(output_path, str):
+                raise ValueError(f"第{line_no}行的output_path不是字符串: {output_path!r}")
+            if not output_path.endswith(".pptx"):
+                output_path += ".pptx"
+            resolved = os.path.normcase(os.path.abspath(_resolve_output_path(output_path)))
+            if resolved in output_lines:
+                raise ValueError(f"第{line_no}行的output_path与第{output_lines[resolved]}行重复: {output_path}")
+            output_lines[resolved] = line_no
+            jobs.append({
+                "line": line_no,
+                "topic": row["topic"],
+                "num_slides": num_slides,
+                "output_path": output_path,
+            })
+    return jobs
+
+
+def _resolve_output_path(output_path: str) -> str:
+    # 与create_ppt_from_json一致：相对路径保存在files目录下
+    if os.path.isabs(output_path):
+        return output_path
+    return os.path.join(FILES_DIR, output_path)
+
+
+def _file_mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _run_batch_job(job: dict) -> dict:
+    start = time.perf_counter()
+    record = {**job, "status": "ok", "llm_calls": 0, "tools_calls": 0, "error": None}
+    output_path = _resolve_output_path(job["output_path"])
+    previous_mtime = _file_mtime(output_path)
+    try:
+        result = create_ppt(job["topic"], job["num_slides"], job["output_path"])
+        record["llm_calls"] = result.get("llm_calls", 0)
+        record["tools_calls"] = result.get("tools_calls", 0)
+        # 文件不存在或仍是上次运行留下的旧文件，都视为未生成
+        mtime = _file_mtime(output_path)
+        if mtime is None or mtime == previous_mtime:
+            record["status"] = "error"
+            record["error"] = "智能体运行结束但未生成PPT文件"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e) or type(e).__name__
+    record["latency_s"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def create_ppt_batch(jobs: list, max_workers: int = 4, summary_path: str = None) -> list:
+    """
+    并发执行多个PPT生成任务，每个任务完成时立即写入一行汇总记录
+    
+    参数:
+        jobs (list): load_batch_jobs返回的任务列表
+        max_workers (int): 同时运行的智能体数量上限
+        summary_path (str): 汇总文件路径(JSONL)，为None时只返回结果不写文件
+    
+    返回:
+        list: 按任务文件行号排序的汇总记录，包含耗时、LLM调用次数、工具调用次数与错误信息
+    """
+    records = []
+    summary_file = open(summary_path, "w", encoding="utf-8") if summary_path else None
+    write_lock = threading.Lock()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ppt-batch") as executor:
+            futures = [executor.submit(_run_batch_job, job) for job in jobs]
+            for future in as_completed(futures):
+                record = future.result()
+                records.append(record)
+                print(f"[{len(records)}/{len(jobs)}] {record['status']} {record['output_path']} ({record['latency_s']}s)")
+                if summary_file is not None:
+                    with write_lock:
+                        summary_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        summary_file.flush()
+    finally:
+        if summary_file is not None:
+            summary_file.close()
+    return sorted(records, key=lambda record: record["line"])
+
+
+def _run_batch_cli(args) -> None:
+    jobs = load_batch_jobs(args.batch)
+    summary_path = args.summary or os.path.splitext(args.batch)[0] + ".summary.jsonl"
+    print(f"批量生成PPT: {len(jobs)}个任务，并发数 {args.workers}")
+    start = time.perf_counter()
+    records = create_ppt_batch(jobs, max_workers=args.workers, summary_path=summary_path)
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for record in records if record["status"] == "ok")
+    print(f"\n完成: 成功{ok}个，失败{len(records) - ok}个，总耗时{elapsed:.1f}s")
+    print(f"- LLM调用: {sum(record['llm_calls'] for record in records)}次")
+    print(f"- 工具调用: {sum(record['tools_calls'] for record in records)}次")
+    print(f"- 汇总文件: {summary_path}")
+
+
 # 主程序入口
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PPT智能体")
+    parser.add_argument("--batch", help="批量任务文件(JSONL)，每行包含topic、num_slides、output_path")
+    parser.add_argument("--workers", type=int, default=4, help="批量模式下同时运行的智能体数量")
+    parser.add_argument("--summary", help="批量模式的汇总文件路径，默认与任务文件同名的.summary.jsonl")
+    cli_args = parser.parse_args()
+    if cli_args.batch:
+        _run_batch_cli(cli_args)
+        raise SystemExit(0)
+
     print("=" * 60)
     print("PPT智能体启动")
     print("=" * 60)
@@ -271,6 +442,9 @@ if __name__ == "__main__":
         print(f"- 文件路径: files/{output_path}")
         print(f"- LLM调用: {result.get('llm_calls', 0)}次")
         print(f"- 工具调用: {result.get('tools_calls', 0)}次")
+        print(f"- 提示词缓存: {cache_metrics.report()}")
+        if tracer is not None:
+            print(f"- 节点追踪: {tracer.report()}")
         
     except KeyboardInterrupt:
         print("\n\n程序已退出")
@@ -1,48 +1,145 @@
 import os
 import pathlib
+import threading
 
 # 获取当前文件所在目录
 current_dir = pathlib.Path(__file__).parent.absolute()
 
-def load_prompt_from_markdown(file_name=None, file_path=None):
-    """
-    从Markdown文件中加载提示词
-    
-    Args:
-        file_name: Markdown文件的名称（不含路径，将从prompts目录下查找）
-        file_path: Markdown文件的完整路径（优先级高于file_name）
-        
-    Returns:
-        str: Markdown文件的内容作为提示词
-    """
+# 提示词缓存：文件路径 -> (mtime_ns, 内容)
+_prompt_cache = {}
+# 可用提示词列表缓存
+_available_prompts = None
+_lock = threading.RLock()
+# 热更新监视线程
+_watcher = None
+_watcher_stop = threading.Event()
+
+
+def _resolve_path(file_name=None, file_path=None):
     if file_path is None and file_name is None:
         raise ValueError("必须提供file_name或file_path参数")
-    
+
     # 如果只提供了文件名，则在prompts目录下查找
     if file_path is None:
         # 如果文件名不包含.md后缀，则添加
         if not file_name.endswith('.md'):
             file_name = f"{file_name}.md"
         file_path = os.path.join(current_dir, file_name)
-    
-    # 读取文件内容
+    return os.path.abspath(file_path)
+
+
+def _read_prompt(file_path):
+    mtime_ns = os.stat(file_path).st_mtime_ns
     with open(file_path, 'r', encoding='utf-8') as file:
         content = file.read()
+    _prompt_cache[file_path] = (mtime_ns, content)
     return content
 
-# 预加载默认RAG提示词
-default_rag = load_prompt_from_markdown(file_name="default_rag")
+
+def load_prompt_from_markdown(file_name=None, file_path=None):
+    """
+    从Markdown文件中加载提示词
+    首次访问时读取文件并按路径缓存，之后直接返回缓存内容，不再访问磁盘；
+    开启热更新后，文件修改时间变化会使缓存自动失效
+
+    Args:
+        file_name: Markdown文件的名称（不含路径，将从prompts目录下查找）
+        file_path: Markdown文件的完整路径（优先级高于file_name）
+
+    Returns:
+        str: Markdown文件的内容作为提示词
+    """
+    file_path = _resolve_path(file_name, file_path)
+    cached = _prompt_cache.get(file_path)
+    if cached is not None:
+        return cached[1]
+    with _lock:
+        cached = _prompt_cache.get(file_path)
+        if cached is not None:
+            return cached[1]
+        return _read_prompt(file_path)
+
 
 # 提供一个函数来获取所有可用的提示词文件
 def list_available_prompts():
     """
     列出prompts目录下所有可用的Markdown提示词文件
-    
+
     Returns:
         list: 可用提示词文件名列表（不含.md后缀）
     """
-    prompts_list = []
-    for file in os.listdir(current_dir):
-        if file.endswith('.md'):
-            prompts_list.append(file[:-3])  # 去掉.md后缀
-    return prompts_list
\ No newline at end of file
+    global _available_prompts
+    if _available_prompts is None:
+        with _lock:
+            if _available_prompts is None:
+                _available_prompts = sorted(
+                    file[:-3]  # 去掉.md后缀
+                    for file in os.listdir(current_dir)
+                    if file.endswith('.md')
+                )
+    return list(_available_prompts)
+
+
+def refresh_prompts():
+    """
+    清空提示词缓存与可用列表缓存，下次访问时重新读取
+    """
+    global _available_prompts
+    with _lock:
+        _prompt_cache.clear()
+        _available_prompts = None
+
+
+def _check_for_changes():
+    """比较已缓存提示词的修改时间，重新加载发生变化的文件"""
+    global _available_prompts
+    with _lock:
+        for file_path, (mtime_ns, _) in list(_prompt_cache.items()):
+            try:
+                if os.stat(file_path).st_mtime_ns != mtime_ns:
+                    _read_prompt(file_path)
+                    print(f"提示词已重新加载: {os.path.basename(file_path)}")
+            except FileNotFoundError:
+                _prompt_cache.pop(file_path, None)
+        _available_prompts = None
+
+
+def _watch(interval):
+    while not _watcher_stop.wait(interval):
+        _check_for_changes()
+
+
+def start_hot_reload(interval=2.0):
+    """
+    开启提示词热更新，后台线程按间隔检查文件修改时间，适用于长时间运行的服务
+
+    Args:
+        interval: 检查间隔（秒）
+    """
+    global _watcher
+    with _lock:
+        if _watcher is not None and _watcher.is_alive():
+            return
+        _watcher_stop.clear()
+        _watcher = threading.Thread(target=_watch, args=(interval,), name="prompts-hot-reload", daemon=True)
+        _watcher.start()
+
+
+def stop_hot_reload():
+    """
+    停止提示词热更新
+    """
+    global _watcher
+    _watcher_stop.set()
+    if _watcher is not None:
+        _watcher.join()
+    _watcher = None
+
+
+def __getattr__(name):
+    """
+    按需加载提示词，如 prompts.default_rag 在首次访问时才读取 default_rag.md
+    """
+    if name in list_available_prompts():
+        return load_prompt_from_markdown(file_name=name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
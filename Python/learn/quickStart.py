@@ -2,8 +2,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from langchain.agents import create_agent
-from langchain.chat_models import init_chat_model
-from langgraph.checkpoint.memory import InMemorySaver
+from models import PromptCacheMetrics, get_chat_model, get_embeddings
+from common import SQLiteCheckpointSaver, answer_cache_from_env, instrument, tracer_from_env
+import os
 from langchain.tools import tool
 from tools.baidu_search import BaiduSearchTool
 import prompts
@@ -39,24 +40,50 @@ def current_time(fmt: str = "%Y-%m-%d %H:%M:%S", tz: str = "local") -> str:
 # base_url：自定义 API 端点 URL。
 # rate_limiter：BaseRateLimiter控制请求率的实例。
 
-model = init_chat_model(
+# 从进程级注册表获取模型，相同配置共用同一个实例和HTTP连接池
+model = get_chat_model(
+    provider="deepseek",
     model="deepseek-chat",
-    model_provider="deepseek",
     temperature=0.7,
     max_tokens=None,
     timeout=None,
     max_retries=2,
 )
 
+# 服务端提示词缓存命中统计，多轮对话中系统提示词与历史消息前缀保持不变即可命中
+cache_metrics = PromptCacheMetrics()
+
+# 重复问题的答案缓存，默认关闭，设置 ANSWER_CACHE=memory 或 sqlite 开启
+# 配置了阿里百炼的 DASHSCOPE_API_KEY 时用文本向量模型做近似命中，否则只做精确匹配
+embeddings = get_embeddings(
+    provider="openai",
+    model="text-embedding-v3",
+    api_key=os.getenv("DASHSCOPE_API_KEY"),
+    base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
+    # 百炼兼容接口只接受文本输入，不按 OpenAI 分词器切分
+    check_embedding_ctx_length=False,
+) if os.getenv("DASHSCOPE_API_KEY") else None
+answer_cache = answer_cache_from_env(namespace="quickStart", embeddings=embeddings)
+
+checkpointer = SQLiteCheckpointSaver(
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "files", ".cache", "checkpoints.sqlite"),
+    keep_last=20,
+)
+
 agent = create_agent(
     tools=[baiduTool, current_time],
     model=model,
     system_prompt=prompts.default_rag,
-    checkpointer=InMemorySaver(),
+    # 会话状态持久化到本地SQLite，每个线程只保留最近20个检查点，重启后可继续对话
+    checkpointer=checkpointer,
 )
 
+# 节点耗时、token与工具调用追踪，默认关闭，设置 GRAPH_TRACE=jsonl 或 prometheus 开启
+tracer = tracer_from_env(name="quickStart")
+if tracer is not None:
+    agent = instrument(agent, tracer, name="quickStart")
+
 # 保存工作流图表
-import os
 try:
     # 构建图片保存路径
     file_name = "create_agent.png"
@@ -75,17 +102,28 @@ except Exception as e:
 
 # result = agent.invoke({"messages": [{"role": "user", "content": "深圳今天天气怎么样？适合什么穿搭？"}]})
 # print(result["messages"][-1].content)
-thread_id = 'default_thread_123'
+thread_id = os.getenv("CHAT_THREAD_ID", 'default_thread_123')
 while True:
     try:
         user_input = input("User: ")
         if (user_input.lower() in ['quit', 'exit', 'bye']):
             print("Goodbye!")
             break
-        result = agent.invoke(
-            {"messages": [{"role": "user", "content": user_input}]}, 
-            {"configurable": {"thread_id": thread_id}}
-            )
+        inputs = {"messages": [{"role": "user", "content": user_input}]}
+        config = {"configurable": {"thread_id": thread_id}, "callbacks": [cache_metrics]}
+        if answer_cache is not None:
+            # 命中时不运行图，问答以 model 节点的身份写入会话
+            result = answer_cache.invoke(agent, inputs, config, as_node="model")
+        else:
+            result = agent.invoke(inputs, config)
         print(result["messages"][-1].content)
     except :
-        break
\ No newline at end of file
+        break
+
+print(f"提示词缓存命中统计: {cache_metrics.report()}")
+if answer_cache is not None:
+    print(f"答案缓存统计: {answer_cache.stats()}")
+if tracer is not None:
+    print(f"节点追踪统计: {tracer.report()}")
+# 停止后台回收线程并关闭数据库连接
+checkpointer.close()
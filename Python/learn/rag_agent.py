@@ -1,15 +1,18 @@
 # 定义工具
 from tools.baidu_search import BaiduSearchTool
-from tools.file_manage import current_time, read_file, write_file
-tools = [current_time, BaiduSearchTool(), read_file, write_file]
+from tools.file_manage import current_time, read_file, write_file, buffered_writes
+from tools.local_search import LocalSearchTool
+# 本地知识库检索优先，未命中时再走网络搜索
+tools = [current_time, LocalSearchTool(), BaiduSearchTool(), read_file, write_file]
 tools_by_name = {tool.name: tool for tool in tools}
 # print(tools_by_name)
 
 # 定义大模型
-from langchain.chat_models import init_chat_model
-model = init_chat_model(
+from models import PromptCacheMetrics, bind_tools_stable, get_chat_model, get_embeddings
+# 从进程级注册表获取模型，相同配置共用同一个实例和HTTP连接池
+model = get_chat_model(
+    provider="deepseek",
     model="deepseek-chat",
-    model_provider="deepseek",
     temperature=0.7,
     max_tokens=None,
     timeout=None,
@@ -17,55 +20,62 @@ model = init_chat_model(
     max_retries=2,
 )
 
-# 绑定工具
-model_with_tools = model.bind_tools(tools)
+# 绑定工具，按名称排序保证工具定义顺序稳定，不破坏服务端提示词前缀缓存
+model_with_tools = bind_tools_stable(model, tools)
+# 服务端提示词缓存命中统计
+cache_metrics = PromptCacheMetrics()
 
 
 # 定义状态
 from langchain.messages import AnyMessage
 from typing_extensions import Annotated, TypedDict
-import operator
+from common import windowed_messages
 
 # 在 LangGraph 中，状态会在整个智能体的执行期间持续存在。
-# 使用 operator.add 声明的 Annotated 类型能确保新消息被追加到现有列表中，而不是将其替换。
+# 使用 windowed_messages 声明的 Annotated 类型能确保新消息被追加到现有列表中，而不是将其替换；
+# 已并入摘要的历史消息会被裁剪，状态与检查点不会随会话无限增长。
 class MessagesState(TypedDict):
     """消息状态"""
-    messages: Annotated[list[AnyMessage], operator.add]
+    messages: Annotated[list[AnyMessage], windowed_messages]
     llm_calls: int
     tools_calls: int
+    summary: str
+    summarized_count: int
 
 
 # 定义节点
 
 # 大模型调用节点
-from langchain.messages import SystemMessage
+from common import MessageWindow, PromptPrefix, answer_cache_from_env, instrument, tracer_from_env
+
+# 静态系统提示词只构建一次，并始终位于模型输入最前面，便于命中服务端前缀缓存
+prompt_prefix = PromptPrefix(
+    "You are a helpful assistant tasked with performing arithmetic on a set of inputs. "
+    "For factual questions, search the local knowledge base with local_search first, "
+    "and only use baidu_search when local_search reports no results."
+)
+# 只把「系统提示词 + 滚动摘要 + 最近消息」送入模型，长会话的提示词长度保持有界
+history_window = MessageWindow(summarizer=model, max_tokens=6000, keep_last=12, prefix=prompt_prefix, trim_history=True)
 
 
 def llm_call(state: dict):
     """LLM decides whether to call a tool or not"""
-    messages = state["messages"]
-    response = model_with_tools.invoke(
-        [
-            SystemMessage(
-                content="You are a helpful assistant tasked with performing arithmetic on a set of inputs."
-            )
-        ]
-        + messages
-    )
+    window = history_window.prepare(state)
+    response = model_with_tools.invoke(window.messages)
     return {
-        "messages": [response],
-        "llm_calls": state.get('llm_calls', 0) + 1
+        "messages": [*window.trim, response],
+        "llm_calls": state.get('llm_calls', 0) + 1,
+        **window.updates
     }
 # 工具调用节点
-from langchain.messages import ToolMessage
+from tools.executor import ToolExecutor
+
+tool_executor = ToolExecutor(tools, per_tool_limits={"baidu_search": 3})
 
 def tool_node(state: dict):
     """Performs the tool call"""
-    result = []
-    for tool_call in state["messages"][-1].tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observation = tool.invoke(tool_call["args"])
-        result.append(ToolMessage(content=observation, tool_call_id=tool_call["id"]))
+    # 同一轮的多个工具调用并发执行，结果按原始调用顺序返回
+    result = tool_executor.run(state["messages"][-1].tool_calls)
     return {"messages": result}
 
 
@@ -95,7 +105,26 @@ graph.add_edge("tool_node", "llm_call")
 # 编译工作流
 agent = graph.compile()
 
+# 节点耗时、token与工具调用追踪，默认关闭，设置 GRAPH_TRACE=jsonl 或 prometheus 开启
+tracer = tracer_from_env(name="rag_agent")
+if tracer is not None:
+    agent = instrument(agent, tracer, name="rag_agent")
+
+
+
+import os
 
+# 重复问题的答案缓存，默认关闭，设置 ANSWER_CACHE=memory 或 sqlite 开启
+# 配置了阿里百炼的 DASHSCOPE_API_KEY 时用文本向量模型做近似命中，否则只做精确匹配
+embeddings = get_embeddings(
+    provider="openai",
+    model="text-embedding-v3",
+    api_key=os.getenv("DASHSCOPE_API_KEY"),
+    base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
+    # 百炼兼容接口只接受文本输入，不按 OpenAI 分词器切分
+    check_embedding_ctx_length=False,
+) if os.getenv("DASHSCOPE_API_KEY") else None
+answer_cache = answer_cache_from_env(namespace="rag_agent", embeddings=embeddings)
 
 # 调用工作流
 from langchain.messages import HumanMessage
@@ -103,6 +132,16 @@ from langchain.messages import HumanMessage
 messages = [HumanMessage(content="珠穆朗玛峰的高度是多少米？转换成英尺是多少？")]
 # messages = [HumanMessage(content="帮我看下本地文件files/test.txt的内容,并进行总结")]
 # messages = [HumanMessage(content="帮我查询大模型思考框架ReAct的详细内容，进行总结并保存在files/react.txt")]
-messages = agent.invoke({"messages": messages})
+# 本次运行内的追加写入会被缓冲，运行结束时一次性写入文件
+with buffered_writes():
+    if answer_cache is not None:
+        messages = answer_cache.invoke(agent, {"messages": messages}, config={"callbacks": [cache_metrics]})
+    else:
+        messages = agent.invoke({"messages": messages}, config={"callbacks": [cache_metrics]})
 for m in messages["messages"]:
-    m.pretty_print()
\ No newline at end of file
+    m.pretty_print()
+print(f"提示词缓存命中统计: {cache_metrics.report()}")
+if answer_cache is not None:
+    print(f"答案缓存统计: {answer_cache.stats()}")
+if tracer is not None:
+    print(f"节点追踪统计: {tracer.report()}")
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 测试从 learn 目录导入模块，与脚本的运行方式一致
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 模块导入时会读取模型密钥，测试不发起真实请求
+os.environ.setdefault("DEEPSEEK_API_KEY", "test")
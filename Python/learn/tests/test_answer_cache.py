@@ -0,0 +1,150 @@
+import math
+from typing import Annotated
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from common.answer_cache import AnswerCache, is_follow_up
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+class FakeEmbeddings:
+    """按字符计数的玩具嵌入，只用于验证配置嵌入模型后的近似命中"""
+
+    def embed_query(self, text):
+        vector = [0.0] * 64
+        for char in text:
+            vector[ord(char) % 64] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector]
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("1英尺转换成厘米是多少", "1英寸转换成厘米是多少"),
+    ("今天深圳天气怎么样，出行如何穿搭", "明天深圳天气怎么样，出行如何穿搭"),
+    ("什么是react框架", "什么不是ReAct框架"),
+])
+def test_similar_questions_miss_without_embeddings(cached, asked):
+    cache = AnswerCache()
+    assert cache.store(cached, "缓存的答案")
+
+    assert cache.lookup(asked) is None
+
+
+def test_exact_match_after_normalization():
+    cache = AnswerCache()
+    cache.store("什么是react框架", "ReAct是推理与行动交替的框架")
+
+    hit = cache.lookup("什么是ReAct框架？")
+
+    assert hit.kind == "exact"
+    assert hit.answer == "ReAct是推理与行动交替的框架"
+
+
+def test_near_match_requires_embeddings():
+    cache = AnswerCache(embeddings=FakeEmbeddings(), threshold=0.9)
+    cache.store("珠穆朗玛峰有多高", "8848.86米")
+
+    hit = cache.lookup("珠穆朗玛峰到底有多高")
+
+    assert hit.kind == "near"
+    assert hit.answer == "8848.86米"
+
+
+def test_near_match_keeps_dates_and_negation_apart():
+    cache = AnswerCache(embeddings=FakeEmbeddings(), threshold=0.5)
+    cache.store("今天深圳天气怎么样", "晴")
+    cache.store("什么是react框架", "推理与行动")
+
+    assert cache.lookup("明天深圳天气怎么样") is None
+    assert cache.lookup("什么不是react框架") is None
+    assert cache.lookup("深圳今天天气怎么样").answer == "晴"
+
+
+def test_embedding_failure_falls_back_to_exact_match():
+    class BrokenEmbeddings:
+        def embed_query(self, text):
+            raise ConnectionError("offline")
+
+    cache = AnswerCache(embeddings=BrokenEmbeddings())
+    assert cache.store("珠穆朗玛峰有多高", "8848.86米")
+
+    assert cache.lookup("珠穆朗玛峰有多高").kind == "exact"
+    assert cache.lookup("珠穆朗玛峰到底有多高") is None
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("那明天呢", True),
+    ("它有哪些缺点", True),
+    ("上面的结果保存到文件", True),
+    ("what about this one", True),
+    ("今天深圳天气怎么样", False),
+    ("珠穆朗玛峰的高度转换成英尺是多少", False),
+])
+def test_is_follow_up(question, expected):
+    assert is_follow_up(question) is expected
+
+
+def _counting_agent(checkpointer=None):
+    calls = []
+
+    def model(state: ChatState):
+        calls.append(state["messages"][-1].content)
+        return {"messages": [AIMessage(content=f"第{len(calls)}次回答")]}
+
+    graph = StateGraph(ChatState)
+    graph.add_node("model", model)
+    graph.add_edge(START, "model")
+    return graph.compile(checkpointer=checkpointer), calls
+
+
+def test_follow_up_in_thread_is_not_cached_or_served():
+    cache = AnswerCache()
+    cache.store("那明天深圳天气呢", "别的会话里的答案")
+    agent, calls = _counting_agent(InMemorySaver())
+    config = {"configurable": {"thread_id": "t1"}}
+
+    cache.invoke(agent, {"messages": [HumanMessage(content="今天深圳天气怎么样")]}, config, as_node="model")
+    result = cache.invoke(agent, {"messages": [HumanMessage(content="那明天深圳天气呢")]}, config, as_node="model")
+
+    assert calls == ["今天深圳天气怎么样", "那明天深圳天气呢"]
+    assert result["messages"][-1].content == "第2次回答"
+    assert cache.lookup("那明天深圳天气呢").answer == "别的会话里的答案"
+    assert cache.stats()["bypassed"] >= 1
+
+
+def test_standalone_questions_hit_in_long_running_thread():
+    cache = AnswerCache()
+    agent, calls = _counting_agent(InMemorySaver())
+    config = {"configurable": {"thread_id": "default_thread_123"}}
+
+    for question in ["今天深圳天气怎么样", "珠穆朗玛峰有多高", "今天深圳天气怎么样", "今天深圳天气怎么样"]:
+        result = cache.invoke(agent, {"messages": [HumanMessage(content=question)]}, config, as_node="model")
+
+    stats = cache.stats()
+    assert calls == ["今天深圳天气怎么样", "珠穆朗玛峰有多高"]
+    assert stats["exact_hits"] == 2
+    assert stats["bypassed"] == 0
+    assert result["messages"][-1].content == "第1次回答"
+    assert len(result["messages"]) == 8
+
+
+def test_history_in_inputs_bypasses_cache():
+    cache = AnswerCache()
+    agent, calls = _counting_agent()
+    history = [HumanMessage(content="介绍一下ReAct框架"), AIMessage(content="ReAct是...")]
+
+    cache.invoke(agent, {"messages": [*history, HumanMessage(content="它有哪些缺点呢")]})
+    cache.invoke(agent, {"messages": [HumanMessage(content="介绍一下ReAct框架")]})
+    result = cache.invoke(agent, {"messages": [HumanMessage(content="介绍一下ReAct框架")]})
+
+    assert len(calls) == 2
+    assert cache.lookup("它有哪些缺点呢") is None
+    assert result["messages"][-1].content == "第2次回答"
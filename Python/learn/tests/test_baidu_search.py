@@ -0,0 +1,43 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools.baidu_search import BaiduSearchTool
+
+
+class HtmlHandler(BaseHTTPRequestHandler):
+    """网关错误页：状态码200但响应体不是JSON"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"<html>gateway error</html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def html_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HtmlHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/search"
+    server.shutdown()
+    server.server_close()
+
+
+def test_non_json_response_returns_the_same_error_in_sync_and_async(html_url):
+    tool = BaiduSearchTool(api_key="test", cache=None, search_url=html_url)
+
+    sync_result = tool.invoke("深圳天气")
+    async_result = asyncio.run(tool.ainvoke("深圳天气"))
+
+    assert sync_result.startswith("搜索请求失败: ")
+    assert async_result.startswith("搜索请求失败: ")
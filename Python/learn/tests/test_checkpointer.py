@@ -0,0 +1,63 @@
+import asyncio
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from common import SQLiteCheckpointSaver
+
+CONFIG = {"configurable": {"thread_id": "t1"}}
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _echo(state: ChatState) -> dict:
+    return {"messages": [AIMessage(content="回复: " + state["messages"][-1].content)]}
+
+
+def _graph():
+    graph = StateGraph(ChatState)
+    graph.add_node("echo", _echo)
+    graph.add_edge(START, "echo")
+    graph.add_edge("echo", END)
+    return graph
+
+
+def test_state_survives_restart(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    with SQLiteCheckpointSaver(path) as saver:
+        agent = _graph().compile(checkpointer=saver)
+        agent.invoke({"messages": [HumanMessage(content="你好")]}, CONFIG)
+
+    with SQLiteCheckpointSaver(path) as saver:
+        agent = _graph().compile(checkpointer=saver)
+        result = agent.invoke({"messages": [HumanMessage(content="还记得吗")]}, CONFIG)
+
+    assert [message.content for message in result["messages"]] == ["你好", "回复: 你好", "还记得吗", "回复: 还记得吗"]
+
+
+def test_keeps_only_recent_checkpoints(tmp_path):
+    with SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), keep_last=3) as saver:
+        agent = _graph().compile(checkpointer=saver)
+        for i in range(10):
+            agent.invoke({"messages": [HumanMessage(content=f"问题{i}")]}, CONFIG)
+
+        assert len(list(saver.list(CONFIG))) == 3
+        assert len(agent.get_state(CONFIG).values["messages"]) == 20
+        saver.vacuum()
+
+
+def test_async_interface(tmp_path):
+    async def run(saver):
+        agent = _graph().compile(checkpointer=saver)
+        await agent.ainvoke({"messages": [HumanMessage(content="异步")]}, CONFIG)
+        return [item async for item in saver.alist(CONFIG)]
+
+    with SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), keep_last=None) as saver:
+        checkpoints = asyncio.run(run(saver))
+
+    assert len(checkpoints) == 3
@@ -0,0 +1,47 @@
+import asyncio
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+
+from tools.executor import ToolExecutor
+
+
+@tool
+def echo(text: str) -> str:
+    """原样返回输入"""
+    return text
+
+
+class _ToolStarts(BaseCallbackHandler):
+    def __init__(self):
+        self.names = []
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.names.append(serialized["name"])
+
+
+CALLS = [{"name": "echo", "args": {"text": f"第{i}次"}, "id": f"call_{i}"} for i in range(3)]
+
+
+def test_run_keeps_callbacks_for_concurrent_calls():
+    executor = ToolExecutor([echo])
+    handler = _ToolStarts()
+
+    messages = RunnableLambda(lambda calls: executor.run(calls)).invoke(CALLS, config={"callbacks": [handler]})
+
+    assert [message.content for message in messages] == ["第0次", "第1次", "第2次"]
+    assert handler.names == ["echo"] * 3
+
+
+def test_arun_keeps_callbacks_for_concurrent_calls():
+    executor = ToolExecutor([echo])
+    handler = _ToolStarts()
+
+    async def run(calls):
+        return await executor.arun(calls)
+
+    messages = asyncio.run(RunnableLambda(run).ainvoke(CALLS, config={"callbacks": [handler]}))
+
+    assert [message.tool_call_id for message in messages] == ["call_0", "call_1", "call_2"]
+    assert handler.names == ["echo"] * 3
@@ -0,0 +1,72 @@
+import re
+
+import pytest
+
+from tools import file_manage
+from tools.file_manage import read_file
+
+TEXT = "珠穆朗玛峰是世界最高峰，海拔8848.86米。\nMount Everest 位于中国与尼泊尔边境。\n" * 3
+
+
+def _read_all_pages(filename: str, max_bytes: int, encoding: str = "utf-8") -> str:
+    pages, offset = [], 0
+    while True:
+        output = read_file.invoke({"filename": filename, "offset": offset, "max_bytes": max_bytes, "encoding": encoding})
+        header, body = output.split("\n", 1)
+        pages.append(body)
+        match = re.search(r"offset=(\d+)", header)
+        if match is None:
+            return "".join(pages)
+        assert int(match.group(1)) > offset
+        offset = int(match.group(1))
+
+
+@pytest.mark.parametrize("max_bytes", [1, 2, 7, 10, 64])
+@pytest.mark.parametrize("encoding", ["utf-8", "gbk"])
+def test_paged_read_round_trips_cjk_text(tmp_path, monkeypatch, encoding, max_bytes):
+    monkeypatch.setattr(file_manage, "BASE_DIR", tmp_path)
+    (tmp_path / "cjk.txt").write_bytes(TEXT.encode(encoding))
+
+    assert _read_all_pages("cjk.txt", max_bytes, encoding) == TEXT
+
+
+def test_page_end_moves_back_to_character_boundary(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_manage, "BASE_DIR", tmp_path)
+    (tmp_path / "cjk.txt").write_text("珠穆朗玛峰", encoding="utf-8")
+
+    output = read_file.invoke({"filename": "cjk.txt", "max_bytes": 10})
+
+    assert "本次读取字节: 0-9" in output
+    assert "offset=9" in output
+    assert output.endswith("珠穆朗")
+
+
+def test_overwrite_keeps_file_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_manage, "BASE_DIR", tmp_path)
+    target = tmp_path / "notes.txt"
+    target.write_text("旧内容", encoding="utf-8")
+    target.chmod(0o644)
+
+    file_manage.write_file.invoke({"filename": "notes.txt", "content": "新内容"})
+
+    assert target.read_text(encoding="utf-8") == "新内容"
+    assert target.stat().st_mode & 0o777 == 0o644
+
+
+def test_failed_flush_keeps_buffered_appends(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_manage, "BASE_DIR", tmp_path)
+    blocked = tmp_path / "blocked.txt"
+    ok = tmp_path / "ok.txt"
+    buffer = file_manage._AppendBuffer()
+    buffer.enter()
+    buffer.append(blocked, "第一段", "utf-8")
+    buffer.append(ok, "第二段", "utf-8")
+    blocked.mkdir()
+
+    with pytest.raises(OSError):
+        buffer.flush_all()
+
+    assert ok.read_text(encoding="utf-8") == "第二段"
+    blocked.rmdir()
+    buffer.flush_all()
+    assert blocked.read_text(encoding="utf-8") == "第一段"
@@ -0,0 +1,68 @@
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from common import MessageWindow, TrimMessages, windowed_messages
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list, windowed_messages]
+    summary: str
+    summarized_count: int
+
+
+def test_reducer_trims_before_appending():
+    left = [HumanMessage(content=str(i)) for i in range(5)]
+
+    merged = windowed_messages(left, [TrimMessages(3), AIMessage(content="新")])
+
+    assert [message.content for message in merged] == ["3", "4", "新"]
+    assert len(left) == 5
+
+
+def test_trimmed_state_stays_bounded_and_keeps_summary():
+    summarizer = RunnableLambda(lambda messages: AIMessage(content="摘要" + str(len(messages[1].content))))
+    window = MessageWindow(summarizer=summarizer, keep_last=4, summarize_batch=2, trim_history=True)
+    seen_by_model = []
+
+    def llm_call(state: dict) -> dict:
+        prepared = window.prepare(state)
+        seen_by_model.append(prepared.messages)
+        response = AIMessage(content="回复" + state["messages"][-1].content)
+        return {"messages": [*prepared.trim, response], **prepared.updates}
+
+    graph = StateGraph(ChatState)
+    graph.add_node("llm_call", llm_call)
+    graph.add_edge(START, "llm_call")
+    graph.add_edge("llm_call", END)
+    agent = graph.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "t"}}
+
+    for i in range(30):
+        agent.invoke({"messages": [HumanMessage(content=f"问题{i}")]}, config)
+
+    state = agent.get_state(config).values
+    assert len(state["messages"]) <= 4 + 2 + 1
+    assert state["messages"][-1].content == "回复问题29"
+    assert state["summary"].startswith("摘要")
+    assert state["summarized_count"] == 0
+    assert seen_by_model[-1][0].content.startswith("此前对话摘要")
+
+
+def test_window_never_starts_on_tool_result():
+    messages = [
+        HumanMessage(content="查天气"),
+        AIMessage(content="", tool_calls=[{"name": "weather", "args": {}, "id": "c1"}]),
+        ToolMessage(content="晴", tool_call_id="c1"),
+        AIMessage(content="今天晴"),
+    ]
+    window = MessageWindow(keep_last=2, summarize_batch=1, trim_history=True)
+
+    prepared = window.prepare({"messages": messages})
+
+    assert prepared.trim == (TrimMessages(1),)
+    assert isinstance(windowed_messages(messages, list(prepared.trim))[0], AIMessage)
@@ -0,0 +1,105 @@
+import os
+
+from tools import local_index
+from tools.local_index import LocalIndex
+
+
+def _paragraph(word):
+    # 单段不超过500字符且两段之和超过500，相邻两段无法合并，每段恰好成为一个分块
+    return " ".join([word] * 60)
+
+
+def _write(path, words, mtime_ns=None):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(_paragraph(word) for word in words))
+    if mtime_ns is not None:
+        # 显式推进修改时间，不依赖文件系统的时间戳精度
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _sources(index, query):
+    return [hit.source for hit in index.search(query)]
+
+
+def test_refresh_with_empty_docs_creates_index_dir(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    index = LocalIndex(str(docs), str(tmp_path / "index"))
+
+    assert index.refresh() is True
+    assert (tmp_path / "index" / "manifest.json").exists()
+    assert index.search("alpha") == []
+    assert index.refresh() is False
+
+
+def test_restart_loads_manifest_without_rebuild(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    _write(docs / "a.txt", ["alpha", "beta"])
+    _write(docs / "b.md", ["gamma"])
+    index = LocalIndex(str(docs), str(tmp_path / "index"))
+    assert index.refresh() is True
+
+    restarted = LocalIndex(str(docs), str(tmp_path / "index"))
+
+    assert restarted.refresh() is False
+    assert restarted.snapshot().num_chunks == 3
+    assert _sources(restarted, "gamma") == ["b.md"]
+
+
+def test_edit_appends_only_the_new_chunk(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    _write(docs / "a.txt", ["alpha", "beta", "gamma", "delta", "epsilon"], mtime_ns=1_000_000_000)
+    index = LocalIndex(str(docs), str(tmp_path / "index"))
+    index.refresh()
+
+    _write(docs / "a.txt", ["alpha", "beta", "gamma", "delta", "zeta"], mtime_ns=2_000_000_000)
+
+    assert index.refresh() is True
+    state = index.snapshot()
+    assert len(state.segments) == 2
+    assert state.segments[-1].num_chunks == 1
+    assert [len(rows) for rows in state.dead] == [1, 0]
+    assert _sources(index, "zeta") == ["a.txt"]
+    assert index.search("epsilon") == []
+    assert _sources(index, "alpha") == ["a.txt"]
+
+
+def test_deleted_file_is_no_longer_searchable(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name, word in [("a.txt", "alpha"), ("b.txt", "beta"), ("c.txt", "gamma"), ("d.txt", "delta")]:
+        _write(docs / name, [word])
+    index = LocalIndex(str(docs), str(tmp_path / "index"))
+    index.refresh()
+
+    os.remove(docs / "d.txt")
+
+    assert index.refresh() is True
+    assert index.search("delta") == []
+    assert "d.txt" not in index.snapshot().manifest["files"]
+    assert _sources(LocalIndex(str(docs), str(tmp_path / "index")), "delta") == []
+
+
+def test_segments_are_compacted_after_max_segments(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    _write(docs / "base.txt", ["base"])
+    index = LocalIndex(str(docs), str(tmp_path / "index"))
+    index.refresh()
+
+    for n in range(local_index.MAX_SEGMENTS - 1):
+        _write(docs / f"doc{n}.txt", [f"word{n}"])
+        index.refresh()
+    assert len(index.snapshot().segments) == local_index.MAX_SEGMENTS
+
+    _write(docs / "last.txt", ["last"])
+    index.refresh()
+
+    state = index.snapshot()
+    assert len(state.segments) == 1
+    assert state.num_chunks == local_index.MAX_SEGMENTS + 1
+    assert _sources(index, "word3") == ["doc3.txt"]
+    assert sorted(os.listdir(tmp_path / "index")) == sorted(["manifest.json", *state.manifest["segments"]])
+    assert LocalIndex(str(docs), str(tmp_path / "index")).refresh() is False
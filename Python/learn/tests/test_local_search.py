@@ -0,0 +1,80 @@
+import re
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from tools import local_index
+from tools.local_index import LocalIndex
+from tools.local_search import LocalSearchTool
+
+
+class ConceptEmbeddings(Embeddings):
+    """确定性的玩具嵌入：第0维统计猫科词，第1维统计dog，近义词只在稠密检索中相近"""
+
+    def _embed(self, text):
+        words = re.findall(r"[a-z]+", text.lower())
+        return [float(sum(w in ("cat", "kitten", "feline") for w in words)),
+                float(words.count("dog")), 1e-3]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def _index(tmp_path, docs, embeddings=None):
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    for name, text in docs.items():
+        (docs_dir / name).write_text(text, encoding="utf-8")
+    index = LocalIndex(str(docs_dir), str(tmp_path / "index"), embeddings=embeddings)
+    index.refresh()
+    return index
+
+
+def test_bm25_ranks_by_term_frequency(tmp_path):
+    index = _index(tmp_path, {
+        "a.txt": "react agent react loop react tools",
+        "b.txt": "react framework overview for web pages",
+        "c.txt": "langgraph state machines",
+    })
+
+    hits = index.search("react agent")
+
+    assert [hit.source for hit in hits] == ["a.txt", "b.txt"]
+    assert hits[0].score > hits[1].score
+
+
+def test_low_query_coverage_is_a_miss(tmp_path):
+    index = _index(tmp_path, {"a.txt": "react agent loop"})
+
+    # 三个查询词只命中一个，低于 min_coverage=0.5
+    assert index.search("react quantum physics") == []
+    assert [hit.source for hit in index.search("react quantum")] == ["a.txt"]
+
+
+def test_tool_formats_hits_and_falls_back_to_web_search(tmp_path):
+    tool = LocalSearchTool(index=_index(tmp_path, {"a.txt": "react agent loop"}))
+
+    assert tool.invoke("react agent") == "[来源: a.txt]\nreact agent loop"
+    assert tool.invoke("quantum physics") == '本地知识库中未找到与"quantum physics"相关的内容，请使用网络搜索。'
+
+
+@pytest.mark.parametrize("ivf_min_vectors", [local_index.IVF_MIN_VECTORS, 1])
+def test_dense_results_are_fused_by_reciprocal_rank(tmp_path, monkeypatch, ivf_min_vectors):
+    monkeypatch.setattr(local_index, "IVF_MIN_VECTORS", ivf_min_vectors)
+    index = _index(tmp_path, {
+        "a.txt": "cat and dog",
+        "b.txt": "kitten",
+        "c.txt": "dog",
+    }, embeddings=ConceptEmbeddings())
+    assert (index.snapshot().segments[0].ivf is not None) == (ivf_min_vectors == 1)
+
+    hits = index.search("cat", k=3)
+
+    # a.txt 同时出现在BM25与稠密结果中，b.txt 只被稠密检索召回，c.txt 两路都未命中
+    assert [hit.source for hit in hits] == ["a.txt", "b.txt"]
+    assert hits[0].score == round(1 / 60 + 1 / 61, 4)
+    assert hits[1].score == round(1 / 60, 4)
+    assert [hit.source for hit in index.search("feline")] == ["b.txt", "a.txt"]
@@ -0,0 +1,136 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from benchmarks.fakes import ScriptedChatModel
+from plan_agent import PlanAgent, PlanModel, TaskStep
+
+_TASK_ID_RE = re.compile(r"当前任务ID: (\S+)")
+
+
+class Recorder:
+    """记录任务的开始顺序、完成顺序与同时执行的最大任务数"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = []
+        self.finished = []
+        self.active = 0
+        self.max_active = 0
+
+    def start(self, task_id):
+        with self.lock:
+            self.started.append(task_id)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def finish(self, task_id):
+        with self.lock:
+            self.active -= 1
+            self.finished.append(task_id)
+
+
+class TaskChatModel(ScriptedChatModel):
+    """按任务ID设置耗时的脚本模型，总结等非任务调用回放 final_answer"""
+    delays: Dict[str, float] = {}
+    fail: Optional[str] = None
+    recorder: Any = None
+
+    def _task_result(self, task_id):
+        if task_id == self.fail:
+            raise RuntimeError(f"{task_id}执行失败")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"{task_id}结果"))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        match = _TASK_ID_RE.search(messages[-1].text)
+        if match is None:
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        task_id = match.group(1)
+        self.recorder.start(task_id)
+        try:
+            time.sleep(self.delays.get(task_id, 0.0))
+            return self._task_result(task_id)
+        finally:
+            self.recorder.finish(task_id)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        match = _TASK_ID_RE.search(messages[-1].text)
+        if match is None:
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+        task_id = match.group(1)
+        self.recorder.start(task_id)
+        try:
+            await asyncio.sleep(self.delays.get(task_id, 0.0))
+            return self._task_result(task_id)
+        finally:
+            self.recorder.finish(task_id)
+
+
+def _task(task_id, *depends_on):
+    return TaskStep(task_id=task_id, task_name=task_id, desc=task_id, result="", depends_on=list(depends_on))
+
+
+# task_c 依赖 task_a，task_d 依赖 task_c，task_b 耗时最长
+TASKS = [_task("task_a"), _task("task_b"), _task("task_c", "task_a"), _task("task_d", "task_c"), _task("task_e")]
+DELAYS = {"task_a": 0.05, "task_b": 0.6, "task_c": 0.05, "task_d": 0.05, "task_e": 0.05}
+
+
+def _agent(max_concurrency=2, fail=None, delays=DELAYS):
+    llm = TaskChatModel(
+        delays=delays,
+        fail=fail,
+        recorder=Recorder(),
+        structured=lambda schema, messages: PlanModel(user_goal="目标", tasks=TASKS),
+    )
+    return PlanAgent(execution_mode="parallel", max_concurrency=max_concurrency, llm=llm), llm.recorder
+
+
+def _run(agent, mode):
+    if mode == "sync":
+        return agent.graph.invoke({"user_content": "目标"}, config=agent._run_config())
+    return asyncio.run(agent.ainvoke("目标"))
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_ready_tasks_start_as_soon_as_dependencies_finish(mode):
+    agent, recorder = _agent(max_concurrency=2)
+
+    result = _run(agent, mode)
+
+    # task_b 一直占着一个名额，其余任务在另一个名额中按依赖依次执行，不等待 task_b
+    assert recorder.started == ["task_a", "task_b", "task_c", "task_d", "task_e"]
+    assert recorder.finished == ["task_a", "task_c", "task_d", "task_e", "task_b"]
+    assert recorder.max_active == 2
+    assert result["task_results"] == {task.task_id: f"{task.task_id}结果" for task in TASKS}
+    assert result["completed_tasks"] == [f"{task.task_id}结果" for task in TASKS]
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_failed_task_does_not_wait_for_running_tasks(mode):
+    agent, recorder = _agent(max_concurrency=3, fail="task_a", delays={**DELAYS, "task_b": 2.0})
+
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="task_a执行失败"):
+        _run(agent, mode)
+
+    assert time.perf_counter() - start < 1.0
+    assert "task_c" not in recorder.started
+
+
+def test_ready_tasks_falls_back_on_cycles_and_unknown_dependencies():
+    agent, _ = _agent(max_concurrency=2)
+    cycle = [_task("task_x", "task_y"), _task("task_y", "task_x")]
+
+    assert [task.task_id for task in agent._ready_tasks(cycle, {}, set())] == ["task_x"]
+    assert agent._ready_tasks(cycle, {}, {"task_x"}) == []
+    assert [task.task_id for task in agent._ready_tasks(cycle, {"task_x": "结果"}, set())] == ["task_y"]
+
+    unknown = [_task("task_x", "task_99"), _task("task_y"), _task("task_z")]
+    assert [task.task_id for task in agent._ready_tasks(unknown, {}, set())] == ["task_x", "task_y"]
+    assert [task.task_id for task in agent._ready_tasks(unknown, {}, {"task_x"})] == ["task_y"]
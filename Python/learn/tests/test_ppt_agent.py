@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from ppt_agent import FILES_DIR, load_batch_jobs
+
+
+def _jobs_file(tmp_path, rows):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("\n".join(row if isinstance(row, str) else json.dumps(row, ensure_ascii=False) for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def test_loads_jobs_with_defaults(tmp_path):
+    jobs = load_batch_jobs(_jobs_file(tmp_path, [{"topic": "人工智能", "num_slides": "6", "output_path": "ai"}, "", {"topic": "量子计算"}]))
+
+    assert jobs == [
+        {"line": 1, "topic": "人工智能", "num_slides": 6, "output_path": "ai.pptx"},
+        {"line": 3, "topic": "量子计算", "num_slides": 5, "output_path": "deck_3.pptx"},
+    ]
+
+
+@pytest.mark.parametrize("num_slides", ["六", None, [6], 0])
+def test_bad_num_slides_reports_line(tmp_path, num_slides):
+    path = _jobs_file(tmp_path, [{"topic": "人工智能"}, {"topic": "量子计算", "num_slides": num_slides}])
+
+    with pytest.raises(ValueError, match="第2行的num_slides"):
+        load_batch_jobs(path)
+
+
+def test_duplicate_output_path_is_rejected(tmp_path):
+    path = _jobs_file(tmp_path, [
+        {"topic": "人工智能", "output_path": "deck.pptx"},
+        {"topic": "量子计算"},
+        {"topic": "区块链", "output_path": f"{FILES_DIR}/deck"},
+    ])
+
+    with pytest.raises(ValueError, match="第3行的output_path与第1行重复"):
+        load_batch_jobs(path)
@@ -0,0 +1,112 @@
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from pptx import Presentation
+
+from tools import ppt_create
+from tools.ppt_create import stream_presentation
+from tools.ppt_schema import SLIDE_SPECS, SlideSpecError, parse_deck
+
+DECK = {
+    "title": "流式写出",
+    "slides": [{"type": "content", "title": f"第{i}页", "content": ["要点1", "要点2"]} for i in range(6)],
+}
+
+
+def test_stream_to_path_writes_complete_deck(tmp_path):
+    output = tmp_path / "deck.pptx"
+
+    assert stream_presentation(DECK, str(output), workers=1) == 6
+
+    assert len(Presentation(str(output)).slides) == 6
+    assert os.listdir(tmp_path) == ["deck.pptx"]
+
+
+def test_failed_stream_leaves_previous_file_untouched(tmp_path, monkeypatch):
+    output = tmp_path / "deck.pptx"
+    output.write_bytes(b"previous")
+
+    def failing_slides(slides, workers):
+        for index, xml in enumerate(ppt_create._iter_slide_xml(slides, workers)):
+            if index == 3:
+                raise RuntimeError("渲染失败")
+            yield xml
+
+    monkeypatch.setattr(ppt_create, "_iter_slide_xml", failing_slides)
+
+    with pytest.raises(RuntimeError):
+        stream_presentation(DECK, str(output), workers=1)
+
+    assert output.read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["deck.pptx"]
+
+
+def test_stream_to_file_object(tmp_path):
+    with open(tmp_path / "deck.pptx", "wb") as f:
+        stream_presentation(DECK, f, workers=1)
+
+    with zipfile.ZipFile(tmp_path / "deck.pptx") as package:
+        assert "ppt/slides/slide6.xml" in package.namelist()
+
+
+LARGE_DECK = {
+    "title": "并行渲染",
+    "slides": [{"type": "content", "title": f"第{i}页", "content": ["要点"]} for i in range(ppt_create.PARALLEL_MIN_SLIDES)],
+}
+
+
+class FailingPool:
+    def __init__(self, error):
+        self.error = error
+
+    def map(self, fn, chunks):
+        raise self.error
+
+
+def test_renderer_error_is_not_retried_serially(monkeypatch):
+    discarded = []
+    monkeypatch.setattr(ppt_create, "_get_render_pool", lambda: FailingPool(RuntimeError("渲染函数出错")))
+    monkeypatch.setattr(ppt_create, "_discard_render_pool", discarded.append)
+    monkeypatch.setattr(ppt_create, "_render_slide", lambda prs, slide: pytest.fail("不应回退到串行渲染"))
+
+    with pytest.raises(RuntimeError, match="渲染函数出错"):
+        ppt_create.render_presentation(LARGE_DECK, workers=2)
+    with pytest.raises(RuntimeError, match="渲染函数出错"):
+        list(ppt_create._iter_slide_xml(ppt_create.parse_deck(LARGE_DECK).slides, workers=2))
+    assert discarded == []
+
+
+def test_shut_down_pool_falls_back_to_serial(monkeypatch):
+    pool = ProcessPoolExecutor(max_workers=2)
+    pool.shutdown()
+    discarded = []
+    monkeypatch.setattr(ppt_create, "_get_render_pool", lambda: pool)
+    monkeypatch.setattr(ppt_create, "_discard_render_pool", discarded.append)
+
+    prs = ppt_create.render_presentation(LARGE_DECK, workers=2)
+    parts = list(ppt_create._iter_slide_xml(ppt_create.parse_deck(LARGE_DECK).slides, workers=2))
+
+    assert len(prs.slides) == len(LARGE_DECK["slides"])
+    assert len(parts) == len(LARGE_DECK["slides"])
+    assert discarded == [pool, pool]
+
+
+@pytest.mark.parametrize("data, expected", [
+    (
+        {"title": "t", "slides": [{"type": "content"}, {"type": "chart"}]},
+        [f"slides[1].type: 不支持的类型 'chart'，可选值: {', '.join(SLIDE_SPECS)}"],
+    ),
+    (
+        {"title": "t", "slides": [{"type": "content", "content": ["要点", {"text": "要点"}]}]},
+        ["slides[0].content[1]: 应为字符串，实际为对象"],
+    ),
+    ('[{"type": "content"}]', ["$: 应为对象，实际为数组"]),
+    ({"title": "t", "slides": {"type": "content"}}, ["slides: 应为非空数组，实际为对象"]),
+])
+def test_parse_deck_reports_error_paths(data, expected):
+    with pytest.raises(SlideSpecError) as exc_info:
+        parse_deck(data)
+
+    assert exc_info.value.errors == expected
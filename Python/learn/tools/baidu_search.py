@@ -1,10 +1,53 @@
 from langchain_core.tools import BaseTool
+from typing import Optional
+import asyncio
 import os
+import threading
+import weakref
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+
+from tools.search_cache import SearchCache, cache_from_env, make_cache_key
 
 from dotenv import load_dotenv
 load_dotenv()
 
+# BAIDU_SEARCH_URL 可指向本地桩服务，便于离线测试与基准
+SEARCH_URL = os.getenv("BAIDU_SEARCH_URL", "https://qianfan.baidubce.com/v2/ai_search/chat/completions")
+
+# 连接池大小
+POOL_MAXSIZE = int(os.getenv("BAIDU_SEARCH_POOL_SIZE", "10"))
+
+# 进程共享的keep-alive会话，避免每次搜索都重新建立TCP+TLS连接
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+# httpx.AsyncClient 绑定创建它的事件循环，因此每个事件循环各持有一个
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=POOL_MAXSIZE, max_keepalive_connections=POOL_MAXSIZE)
+        )
+        _async_clients[loop] = client
+    return client
+
+
 class  BaiduSearchTool(BaseTool):
     """
     百度AI搜索工具
@@ -12,13 +55,72 @@ class  BaiduSearchTool(BaseTool):
     """
     name: str = "baidu_search"
     description: str = "使用百度AI搜索获取网络信息，适用于获取最新新闻、事实性信息、当前事件、技术资讯等。输入应为搜索关键词。"
-    def __init__(self, **kwargs):
+    resource_type_filter: list = [
+        { "type": "web", "top_k": 5 },
+        { "type": "video", "top_k": 5 },
+    ]
+    # 搜索结果缓存，默认按环境变量 BAIDU_SEARCH_CACHE 创建；传入 cache=None 关闭缓存，传入 SearchCache 实例自定义后端
+    cache: Optional[SearchCache] = None
+    # 连接超时与读取超时（秒），避免搜索挂起导致整个图运行卡住
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    # 搜索接口地址，默认取 BAIDU_SEARCH_URL
+    search_url: str = SEARCH_URL
+    def __init__(self, api_key: Optional[str] = None, **kwargs):
+        if "cache" not in kwargs:
+            kwargs["cache"] = cache_from_env()
         super().__init__(**kwargs)
-        self._api_key = os.getenv("BAIDU_API_KEY", "")
+        # 未显式传入时读取 BAIDU_API_KEY
+        self._api_key = api_key or os.getenv("BAIDU_API_KEY", "")
 
         if not self._api_key:
             raise ValueError("BAIDU_API_KEY environment variable not set")
-    
+
+    def _request_body(self, query: str) -> dict:
+        return {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": query
+                }
+            ],
+            "search_source": "baidu_search_v2",
+            "resource_type_filter": self.resource_type_filter,
+        }
+
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _cached(self, query: str, cache_key: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print(f"百度AI搜索命中缓存: {query}")
+        return cached
+
+    def _parse_results(self, query: str, results: dict, cache_key: str) -> str:
+        """
+        处理搜索结果，提取引用内容并写入缓存
+        """
+        if not results or "references" not in results or not results["references"]:
+            return f'未找到与"{query}"相关的结果。'
+
+        # 提取搜索结果内容
+        content_list = []
+        for ref in results["references"]:
+            if "content" in ref:
+                content_list.append(ref["content"])
+
+        content = "\n".join(content_list)
+        print('搜索完成')
+        if self.cache is not None:
+            self.cache.set(cache_key, content)
+        return content
+
     def _run(self, query: str) -> str:
         """
         执行搜索操作
@@ -28,50 +130,51 @@ class  BaiduSearchTool(BaseTool):
         if not self._api_key:
             return "错误: 百度AI搜索API密钥未配置，请设置BAIDU_API_KEY环境变量。"
 
+        cache_key = make_cache_key(query, self.resource_type_filter)
+        cached = self._cached(query, cache_key)
+        if cached is not None:
+            return cached
+
         print(f"启动百度AI搜索工具: {query}")
 
         try:
-            search_url = "https://qianfan.baidubce.com/v2/ai_search/chat/completions"
-            body = {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": query
-                    }
-                ],
-                "search_source": "baidu_search_v2",
-				"resource_type_filter": [
-					{ "type": "web", "top_k": 5 },
-					{ "type": "video", "top_k": 5 },
-				],
-            }
-            headers = {
-                "Authorization": f"Bearer {self._api_key}",
-                "Content-Type": "application/json"
-            }
-            response = requests.post(
-                search_url,
-                json=body,
-                headers=headers
+            response = _get_session().post(
+                self.search_url,
+                json=self._request_body(query),
+                headers=self._headers(),
+                timeout=(self.connect_timeout, self.read_timeout)
             )
             response.raise_for_status()
-
-             # 处理搜索结果
-            results = response.json()
-
-            if not results or "references" not in results or not results["references"]:
-                return f'未找到与"{query}"相关的结果。'
-            
-            # # 提取搜索结果内容
-            content_list = []
-            for ref in results["references"]:
-                if "content" in ref:
-                    content_list.append(ref["content"])
-
-            content = "\n".join(content_list)
-            # print(f"搜索结果: {content}")
-            print('搜索完成')
-            return content
+            return self._parse_results(query, response.json(), cache_key)
         except requests.RequestException as e:
             return f"搜索请求失败: {str(e)}"
-        
\ No newline at end of file
+
+    async def _arun(self, query: str) -> str:
+        """
+        异步执行搜索操作，使用连接池受限的 httpx.AsyncClient，不占用线程
+        :param query: 搜索关键词
+        :return: 搜索结果
+        """
+        if not self._api_key:
+            return "错误: 百度AI搜索API密钥未配置，请设置BAIDU_API_KEY环境变量。"
+
+        cache_key = make_cache_key(query, self.resource_type_filter)
+        cached = self._cached(query, cache_key)
+        if cached is not None:
+            return cached
+
+        print(f"启动百度AI搜索工具: {query}")
+
+        try:
+            response = await _get_async_client().post(
+                self.search_url,
+                json=self._request_body(query),
+                headers=self._headers(),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+            )
+            response.raise_for_status()
+            return self._parse_results(query, response.json(), cache_key)
+        except (httpx.HTTPError, ValueError) as e:
+            # 响应不是JSON时 response.json() 抛出 JSONDecodeError（ValueError子类），与同步实现返回相同的错误文本；
+            # httpx 的超时异常没有消息文本，补充异常类型便于模型理解失败原因
+            return f"搜索请求失败: {str(e) or type(e).__name__}"
@@ -0,0 +1,105 @@
+"""
+工具并发执行器
+同一轮模型回复中的多个工具调用并发执行，按原始调用顺序返回 ToolMessage，
+单轮耗时由所有调用之和降为最慢的一次调用
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain.messages import ToolMessage
+
+
+class ToolExecutor:
+    """
+    工具并发执行器
+
+    参数:
+        tools (list): 可调用的工具列表
+        max_workers (int): 线程池大小，即同步执行时的最大并发数
+        per_tool_limits (Dict[str, int]): 按工具名称限制的最大并发数，如 {"baidu_search": 3}
+        default_limit (int): 未在 per_tool_limits 中配置的工具的并发上限，None 表示不限制
+    """
+
+    def __init__(
+        self,
+        tools: list,
+        max_workers: int = 8,
+        per_tool_limits: Optional[Dict[str, int]] = None,
+        default_limit: Optional[int] = None,
+    ):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_workers = max_workers
+        self.per_tool_limits = dict(per_tool_limits or {})
+        self.default_limit = default_limit
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        # 线程模式的并发上限在进程内全局生效
+        self._semaphores = {
+            name: threading.BoundedSemaphore(limit)
+            for name, limit in self._limits().items()
+        }
+
+    def _limits(self) -> Dict[str, int]:
+        limits = {}
+        for name in self.tools_by_name:
+            limit = self.per_tool_limits.get(name, self.default_limit)
+            if limit is not None:
+                limits[name] = max(1, limit)
+        return limits
+
+    def _invoke_one(self, tool_call: dict) -> ToolMessage:
+        tool = self.tools_by_name[tool_call["name"]]
+        semaphore = self._semaphores.get(tool_call["name"])
+        if semaphore is None:
+            observation = tool.invoke(tool_call["args"])
+        else:
+            with semaphore:
+                observation = tool.invoke(tool_call["args"])
+        return ToolMessage(content=observation, tool_call_id=tool_call["id"])
+
+    def run(self, tool_calls: List[dict]) -> List[ToolMessage]:
+        """
+        在线程池中并发执行工具调用
+
+        参数:
+            tool_calls (List[dict]): 模型返回的工具调用列表
+
+        返回:
+            List[ToolMessage]: 与 tool_calls 顺序一致的工具结果消息
+
+        异常:
+            KeyError: 工具不存在时抛出异常
+            Exception: 任一工具执行失败时抛出该异常
+        """
+        if len(tool_calls) <= 1:
+            return [self._invoke_one(tool_call) for tool_call in tool_calls]
+        # 每个调用复制一份当前上下文，工具运行仍挂在所在节点的回调之下（追踪、统计）
+        futures = [self._pool.submit(contextvars.copy_context().run, self._invoke_one, tool_call) for tool_call in tool_calls]
+        return [future.result() for future in futures]
+
+    async def arun(self, tool_calls: List[dict]) -> List[ToolMessage]:
+        """
+        在事件循环中并发执行工具调用，同步工具由 ainvoke 自动转入线程执行
+
+        参数:
+            tool_calls (List[dict]): 模型返回的工具调用列表
+
+        返回:
+            List[ToolMessage]: 与 tool_calls 顺序一致的工具结果消息
+        """
+        # asyncio.Semaphore 绑定事件循环，因此按轮创建，并发上限在单轮内生效
+        semaphores = {name: asyncio.Semaphore(limit) for name, limit in self._limits().items()}
+
+        async def invoke_one(tool_call: dict) -> ToolMessage:
+            tool = self.tools_by_name[tool_call["name"]]
+            semaphore = semaphores.get(tool_call["name"])
+            if semaphore is None:
+                observation = await tool.ainvoke(tool_call["args"])
+            else:
+                async with semaphore:
+                    observation = await tool.ainvoke(tool_call["args"])
+            return ToolMessage(content=observation, tool_call_id=tool_call["id"])
+
+        return list(await asyncio.gather(*(invoke_one(tool_call) for tool_call in tool_calls)))
@@ -1,7 +1,14 @@
 from langchain.tools import tool
 from datetime import datetime, timezone
 from pathlib import Path
+from contextlib import contextmanager
+from typing import Optional
+import atexit
+import codecs
+import mmap
 import os
+import tempfile
+import threading
 
 @tool('current_time', description='获取最新的、当前的、现在的年月日、时分秒')
 def current_time(fmt: str = "%Y-%m-%d %H:%M:%S", tz: str = "local") -> str:
@@ -33,22 +40,227 @@ def _resolve_safe_path(filename: str) -> Path:
         raise ValueError("非法路径，必须在当前目录内")
     return p
 
-@tool('read_file', description='读取 learn 目录下的文件内容')
-def read_file(filename: str, encoding: str = "utf-8") -> str:
+# 单次读取返回的默认最大字节数，避免大文件整体进入模型上下文
+DEFAULT_MAX_BYTES = 64 * 1024
+# 超过该大小的文件使用内存映射读取，不把整个文件加载进内存
+MMAP_THRESHOLD = 1024 * 1024
+
+def _count_lines(view, size: int) -> int:
+    """分块统计总行数，内存映射时不会一次性复制整个文件。"""
+    newlines = 0
+    for pos in range(0, size, MMAP_THRESHOLD):
+        newlines += view[pos:pos + MMAP_THRESHOLD].count(b"\n")
+    return newlines + (0 if view[size - 1:size] == b"\n" else 1)
+
+def _line_start(view, line_no: int) -> int:
+    """返回第 line_no 行（从1开始）在文件中的字节偏移，超出总行数时返回文件末尾。"""
+    pos = 0
+    for _ in range(line_no - 1):
+        pos = view.find(b"\n", pos)
+        if pos == -1:
+            return len(view)
+        pos += 1
+    return pos
+
+def _read_range(view, size: int, offset: int, length: Optional[int],
+                start_line: Optional[int], end_line: Optional[int], max_bytes: int):
+    """计算读取范围，返回 (起始偏移, 结束偏移, 是否因 max_bytes 截断)。"""
+    if start_line is not None or end_line is not None:
+        start = _line_start(view, max(1, start_line or 1))
+        end = _line_start(view, end_line + 1) if end_line is not None else size
+    else:
+        start = min(max(0, offset), size)
+        end = size if length is None else min(size, start + max(0, length))
+    truncated = end - start > max_bytes
+    return start, min(end, start + max_bytes), truncated
+
+def _decode_page(view, start: int, end: int, size: int, encoding: str):
+    """解码 [start, end) 的字节，结束位置落在多字节字符中间时回退到字符边界，返回 (文本, 实际结束偏移)。"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+    text = decoder.decode(view[start:end], final=end >= size)
+    # 单页容不下一个完整字符时向后补齐该字符，避免续读偏移原地不动
+    while not text and decoder.getstate()[0] and end < size:
+        text = decoder.decode(view[end:end + 1], final=end + 1 >= size)
+        end += 1
+    return text, end - len(decoder.getstate()[0])
+
+@tool('read_file', description='读取 learn 目录下的文件内容，支持按字节偏移或行号范围分页读取，返回内容前附带文件总大小与总行数')
+def read_file(
+    filename: str,
+    encoding: str = "utf-8",
+    offset: int = 0,
+    length: Optional[int] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> str:
     """读取 BASE_DIR 下的文件内容。
     参数：
     - filename: 文件名或相对路径（相对于 BASE_DIR，即 learn 目录）
     - encoding: 文本编码，默认 utf-8
-    返回：文件内容或错误信息。
+    - offset: 起始字节偏移，默认 0
+    - length: 读取字节数，默认读到文件末尾
+    - start_line / end_line: 按行号范围读取（从1开始，包含 end_line），优先于 offset/length
+    - max_bytes: 单次最多返回的字节数，默认 65536，超出部分可通过 offset 继续读取
+    返回：首行为文件总大小、总行数与本次读取范围的说明，其后为文件内容；或错误信息。
     """
     try:
         p = _resolve_safe_path(filename)
+        # 先写出该文件已缓冲的追加内容，保证读到最新数据
+        _append_buffer.flush(p)
         if not p.exists() or not p.is_file():
             return f"文件不存在: {p.name}"
-        return p.read_text(encoding=encoding)
+        with open(p, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return f"[文件: {p.name} | 总大小: 0 字节 | 总行数: 0]\n"
+            # 大文件使用内存映射，按需分页加载；小文件直接读入
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size >= MMAP_THRESHOLD else f.read()
+            try:
+                total_lines = _count_lines(view, size)
+                start, end, truncated = _read_range(view, size, offset, length, start_line, end_line, max(1, max_bytes))
+                text, end = _decode_page(view, start, end, size, encoding)
+            finally:
+                if isinstance(view, mmap.mmap):
+                    view.close()
+        header = f"[文件: {p.name} | 总大小: {size} 字节 | 总行数: {total_lines} | 本次读取字节: {start}-{end}"
+        if truncated or (end < size and start_line is None and end_line is None and length is None):
+            header += f" | 未读完，可使用 offset={end} 继续读取"
+        header += "]\n"
+        return header + text
     except Exception as e:
         return f"读取失败: {e}"
 
+# 追加写入缓冲区达到该字节数时立即落盘
+APPEND_BUFFER_LIMIT = 64 * 1024
+
+class _AppendBuffer:
+    """
+    追加写入缓冲区
+    在 buffered_writes() 作用域内，同一文件的多次追加先合并在内存中，
+    作用域结束或缓冲超过 APPEND_BUFFER_LIMIT 时一次性写入
+    """
+
+    def __init__(self, limit: int = APPEND_BUFFER_LIMIT):
+        self.limit = limit
+        self._lock = threading.RLock()
+        self._active = 0
+        # path -> (encoding, [content...], 已缓冲字节数)
+        self._pending = {}
+
+    @property
+    def active(self) -> bool:
+        return self._active > 0
+
+    def enter(self) -> None:
+        with self._lock:
+            self._active += 1
+
+    def exit(self) -> None:
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self.flush_all()
+
+    def append(self, p: Path, content: str, encoding: str) -> bool:
+        """缓冲一次追加，返回 True 表示已缓冲，False 表示缓冲未开启。"""
+        with self._lock:
+            if not self.active:
+                return False
+            pending_encoding, parts, size = self._pending.get(p, (encoding, [], 0))
+            if pending_encoding != encoding:
+                # 编码变化时先写出已缓冲内容，保证顺序
+                self.flush(p)
+                parts, size = [], 0
+            parts.append(content)
+            size += len(content.encode(encoding))
+            self._pending[p] = (encoding, parts, size)
+            if size >= self.limit:
+                try:
+                    self.flush(p)
+                except OSError as e:
+                    # 内容仍保留在缓冲区中，下次落盘时重试
+                    print(f"追加内容落盘失败，稍后重试: {p.name}: {e}")
+            return True
+
+    def discard(self, p: Path) -> None:
+        with self._lock:
+            self._pending.pop(p, None)
+
+    def flush(self, p: Path) -> None:
+        with self._lock:
+            item = self._pending.get(p)
+            if item is None:
+                return
+            encoding, parts, _ = item
+            with open(p, 'a', encoding=encoding) as f:
+                f.write("".join(parts))
+            # 写入成功后才移出缓冲区，失败时内容保留以便重试
+            del self._pending[p]
+
+    def flush_all(self) -> None:
+        """写出所有文件的缓冲内容，单个文件失败不影响其余文件，全部尝试后抛出第一个错误。"""
+        errors = []
+        with self._lock:
+            for p in list(self._pending):
+                try:
+                    self.flush(p)
+                except OSError as e:
+                    print(f"追加内容落盘失败: {p.name}: {e}")
+                    errors.append(e)
+        if errors:
+            raise errors[0]
+
+_append_buffer = _AppendBuffer()
+atexit.register(_append_buffer.flush_all)
+
+@contextmanager
+def buffered_writes():
+    """
+    在一次图运行内开启追加写入缓冲，退出时统一落盘
+
+    用法:
+        with buffered_writes():
+            agent.invoke({...})
+    """
+    _append_buffer.enter()
+    try:
+        yield
+    finally:
+        _append_buffer.exit()
+
+def flush_writes() -> None:
+    """立即写出所有已缓冲的追加内容。"""
+    _append_buffer.flush_all()
+
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+# 进程启动时的umask，新建文件按 0666 & ~umask 设置权限，与 open() 创建的文件一致
+_UMASK = _umask()
+
+def _atomic_write(p: Path, content: str, encoding: str) -> None:
+    """先写入同目录临时文件再原子替换，读取方不会看到写了一半的文件。"""
+    # mkstemp 创建的临时文件权限为 0600，替换前改为原文件的权限（新文件按umask）
+    try:
+        file_mode = p.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        file_mode = 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(dir=p.parent, prefix=f".{p.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, file_mode)
+        os.replace(tmp_path, p)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
 @tool('write_file', description='将内容写入当前目录文件（覆盖或追加）')
 def write_file(filename: str, content: str, mode: str = "overwrite", encoding: str = "utf-8") -> str:
     """写入 BASE_DIR 下的文件内容。
@@ -63,8 +275,15 @@ def write_file(filename: str, content: str, mode: str = "overwrite", encoding: s
         p = _resolve_safe_path(filename)
         p.parent.mkdir(parents=True, exist_ok=True)
         write_mode = 'a' if str(mode).lower() == 'append' else 'w'
-        with open(p, write_mode, encoding=encoding) as f:
-            f.write(content)
+        if write_mode == 'a':
+            if _append_buffer.append(p, content, encoding):
+                return f"写入成功: {p.name}（模式: {write_mode}，已缓冲）"
+            with open(p, write_mode, encoding=encoding) as f:
+                f.write(content)
+        else:
+            # 覆盖写入前丢弃该文件尚未落盘的追加内容
+            _append_buffer.discard(p)
+            _atomic_write(p, content, encoding)
         return f"写入成功: {p.name}（模式: {write_mode}）"
     except Exception as e:
-        return f"写入失败: {e}"
\ No newline at end of file
+        return f"写入失败: {e}"
@@ -0,0 +1,691 @@
+"""
+本地文档检索索引
+对文档目录分块后建立BM25倒排索引（CSR布局，倒排表以内存映射方式读取，不整体载入内存），
+可选地为每个分块保存稠密向量（需要NumPy与Embeddings模型），向量较少时暴力检索，较多时使用IVF检索。
+
+索引由若干只追加的段组成，manifest.json 记录每个文件的内容哈希与分块哈希：
+刷新时只读取修改时间或大小变化的文件，内容未变的只更新元数据；
+内容变化的文件重新分块后按分块哈希比对，只有新分块写入一个新段（分词、向量化），
+消失的分块在所属段中标记为失效；段过多或失效比例过高时合并为一个段。
+重启后直接加载 manifest 与已有段，不会触发全量重建
+"""
+import array
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # 稠密向量检索为可选功能，未安装NumPy时只使用BM25
+    np = None
+
+INDEX_VERSION = 2
+# 参与索引的文件类型
+DOC_EXTENSIONS = (".txt", ".md", ".markdown")
+# 分块长度与相邻分块重叠（字符）
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+# BM25参数
+BM25_K1 = 1.5
+BM25_B = 0.75
+# 向量数达到该值时构建IVF，否则暴力检索
+IVF_MIN_VECTORS = 4096
+IVF_NPROBE = 8
+# 段数超过该值，或失效分块占比超过该比例时合并所有段
+MAX_SEGMENTS = 8
+COMPACT_DEAD_RATIO = 0.3
+# 分块哈希长度（字节，SHA-1）
+KEY_SIZE = 20
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CJK_RUN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]+")
+# 常见虚词与疑问词，分词前替换为分隔符，避免「架是」「是什」这类无意义的二元词稀释查询
+_STOP_RE = re.compile("\u4ec0\u4e48|\u600e\u4e48|\u5982\u4f55|\u54ea\u4e9b|\u54ea\u4e2a|\u4e3a\u4ec0\u4e48|\u8bf7\u95ee|\u4e00\u4e0b|[\u7684\u4e86\u5417\u5462\u5427\u554a\u662f\u548c\u4e0e\u53ca\u6216\u5728]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词：英文与数字按单词切分，中文去掉常见虚词后按相邻两字切分（单字成段时保留单字），无需额外分词库
+
+    参数:
+        text (str): 文本
+
+    返回:
+        List[str]: 词项列表
+    """
+    text = _STOP_RE.sub(" ", text.lower())
+    tokens = _WORD_RE.findall(text)
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def chunk_text(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    按段落把文本合并为不超过 size 个字符的分块，超长段落按固定长度切分并保留重叠
+
+    参数:
+        text (str): 文本
+        size (int): 分块最大长度
+        overlap (int): 超长段落切分时相邻分块的重叠长度
+
+    返回:
+        List[str]: 分块列表
+    """
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(current) + len(paragraph) + 1 <= size:
+            current = f"{current}\n{paragraph}" if current else paragraph
+            continue
+        if current:
+            chunks.append(current)
+        while len(paragraph) > size:
+            chunks.append(paragraph[:size])
+            paragraph = paragraph[size - overlap:]
+        current = paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _chunk_key(source: str, text: str) -> bytes:
+    # 分块哈希包含来源文件，同一段文字出现在不同文件中时各自保留来源
+    return hashlib.sha1(f"{source}\0{text}".encode("utf-8")).digest()
+
+
+def _text_key(text: str) -> bytes:
+    # 只按内容计算的哈希，用于在文件改名或内容移动时复用已有向量
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+
+class SearchHit(NamedTuple):
+    """检索结果"""
+    source: str
+    text: str
+    score: float
+
+
+def _write_array(path: str, typecode: str, values) -> None:
+    with open(path, "wb") as f:
+        array.array(typecode, values).tofile(f)
+
+
+def _map_array(path: str, typecode: str):
+    """以内存映射方式只读打开数组文件，返回零拷贝的memoryview"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(array.array(typecode))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode)
+
+
+def _build_ivf(path: str, matrix, iterations: int = 10) -> None:
+    num_lists = max(1, int(math.sqrt(len(matrix))))
+    rng = np.random.default_rng(0)
+    centroids = matrix[rng.choice(len(matrix), num_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(matrix @ centroids.T, axis=1)
+        for c in range(num_lists):
+            members = matrix[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    assign = np.argmax(matrix @ centroids.T, axis=1)
+    order = np.argsort(assign, kind="stable").astype(np.uint32)
+    offsets = np.searchsorted(assign[order], np.arange(num_lists + 1)).astype(np.uint64)
+    centroids.astype(np.float32).tofile(os.path.join(path, "ivf_centroids.f32"))
+    offsets.tofile(os.path.join(path, "ivf_offsets.bin"))
+    order.tofile(os.path.join(path, "ivf_ids.bin"))
+
+
+class _SegmentWriter:
+    """在内存中累积一个段的分块与倒排表，最后一次性写入段目录"""
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.postings: List[List[tuple]] = []
+        self.doc_lens: List[int] = []
+        self.lines: List[bytes] = []
+        self.keys = bytearray()
+        self.text_keys = bytearray()
+        self.vectors: list = []
+
+    def add_chunk(self, line: bytes, key: bytes, text_key: bytes, doc_len: int, vector=None) -> int:
+        row = len(self.doc_lens)
+        self.lines.append(line)
+        self.keys += key
+        self.text_keys += text_key
+        self.doc_lens.append(doc_len)
+        self.vectors.append(vector)
+        return row
+
+    def add_posting(self, token: str, row: int, tf: int) -> None:
+        term_id = self.vocab.setdefault(token, len(self.vocab))
+        if term_id == len(self.postings):
+            self.postings.append([])
+        self.postings[term_id].append((row, tf))
+
+    def add_text(self, source: str, text: str, key: bytes, text_key: bytes, vector=None) -> int:
+        counts = Counter(tokenize(text))
+        line = json.dumps({"source": source, "text": text}, ensure_ascii=False).encode("utf-8") + b"\n"
+        row = self.add_chunk(line, key, text_key, sum(counts.values()), vector)
+        for token, tf in counts.items():
+            self.add_posting(token, row, tf)
+        return row
+
+    def write(self, path: str) -> None:
+        os.makedirs(path)
+        term_offsets = [0]
+        for plist in self.postings:
+            term_offsets.append(term_offsets[-1] + len(plist))
+        _write_array(os.path.join(path, "term_offsets.bin"), "Q", term_offsets)
+        _write_array(os.path.join(path, "post_docs.bin"), "I", (doc for plist in self.postings for doc, _ in plist))
+        _write_array(os.path.join(path, "post_tfs.bin"), "I", (tf for plist in self.postings for _, tf in plist))
+        _write_array(os.path.join(path, "doc_lens.bin"), "I", self.doc_lens)
+        chunk_offsets = [0]
+        with open(os.path.join(path, "chunks.jsonl"), "wb") as f:
+            for line in self.lines:
+                f.write(line)
+                chunk_offsets.append(chunk_offsets[-1] + len(line))
+        _write_array(os.path.join(path, "chunk_offsets.bin"), "Q", chunk_offsets)
+        with open(os.path.join(path, "keys.bin"), "wb") as f:
+            f.write(self.keys)
+        with open(os.path.join(path, "text_keys.bin"), "wb") as f:
+            f.write(self.text_keys)
+        with open(os.path.join(path, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+
+        dim, use_ivf = None, False
+        if self.vectors and self.vectors[0] is not None:
+            matrix = np.asarray(self.vectors, dtype=np.float32)
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+            matrix.tofile(os.path.join(path, "vectors.f32"))
+            dim = int(matrix.shape[1])
+            if len(matrix) >= IVF_MIN_VECTORS:
+                _build_ivf(path, matrix)
+                use_ivf = True
+        meta = {"num_chunks": len(self.doc_lens), "total_len": sum(self.doc_lens), "dim": dim, "ivf": use_ivf}
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+
+class _Segment:
+    """一个只读的索引段，写入后内容不再变化，失效分块由索引状态另行记录"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(path, "vocab.json"), "r", encoding="utf-8") as f:
+            self.vocab: Dict[str, int] = json.load(f)
+        self.name = os.path.basename(path)
+        self.num_chunks = self.meta["num_chunks"]
+        self.total_len = self.meta["total_len"]
+        self.term_offsets = _map_array(os.path.join(path, "term_offsets.bin"), "Q")
+        self.post_docs = _map_array(os.path.join(path, "post_docs.bin"), "I")
+        self.post_tfs = _map_array(os.path.join(path, "post_tfs.bin"), "I")
+        self.doc_lens = _map_array(os.path.join(path, "doc_lens.bin"), "I")
+        self.chunk_offsets = _map_array(os.path.join(path, "chunk_offsets.bin"), "Q")
+        self._chunks = _map_array(os.path.join(path, "chunks.jsonl"), "B")
+        self._keys = _map_array(os.path.join(path, "keys.bin"), "B")
+        self._text_keys = _map_array(os.path.join(path, "text_keys.bin"), "B")
+        self.vectors = None
+        self.ivf = None
+        dim = self.meta.get("dim")
+        if dim and np is not None:
+            self.vectors = np.frombuffer(_map_array(os.path.join(path, "vectors.f32"), "f"), dtype=np.float32).reshape(-1, dim)
+            if self.meta.get("ivf"):
+                self.ivf = (
+                    np.frombuffer(_map_array(os.path.join(path, "ivf_centroids.f32"), "f"), dtype=np.float32).reshape(-1, dim),
+                    np.frombuffer(_map_array(os.path.join(path, "ivf_offsets.bin"), "Q"), dtype=np.uint64),
+                    np.frombuffer(_map_array(os.path.join(path, "ivf_ids.bin"), "I"), dtype=np.uint32),
+                )
+
+    def key(self, row: int) -> bytes:
+        return bytes(self._keys[row * KEY_SIZE:(row + 1) * KEY_SIZE])
+
+    def text_key(self, row: int) -> bytes:
+        return bytes(self._text_keys[row * KEY_SIZE:(row + 1) * KEY_SIZE])
+
+    def chunk_line(self, row: int) -> bytes:
+        return bytes(self._chunks[self.chunk_offsets[row]:self.chunk_offsets[row + 1]])
+
+    def chunk(self, row: int) -> dict:
+        return json.loads(self.chunk_line(row))
+
+    def span(self, token: str) -> Optional[tuple]:
+        """返回词项在倒排表中的 [start, end) 区间，词项不在本段时返回None"""
+        term_id = self.vocab.get(token)
+        if term_id is None:
+            return None
+        return self.term_offsets[term_id], self.term_offsets[term_id + 1]
+
+    def dense(self, query_vector, k: int) -> List[tuple]:
+        """返回 [(行号, 余弦相似度)]，向量已归一化"""
+        if self.ivf is None:
+            candidates = None
+            sims = self.vectors @ query_vector
+        else:
+            centroids, offsets, ids = self.ivf
+            lists = np.argsort(centroids @ query_vector)[::-1][:IVF_NPROBE]
+            candidates = np.concatenate([ids[offsets[c]:offsets[c + 1]] for c in lists])
+            sims = self.vectors[candidates] @ query_vector
+        top = np.argsort(sims)[::-1][:k]
+        if candidates is None:
+            return [(int(i), float(sims[i])) for i in top]
+        return [(int(candidates[i]), float(sims[i])) for i in top]
+
+
+class _IndexState:
+    """
+    某一时刻的索引视图：manifest、段列表与每个段中已失效的行
+    刷新时整体替换，检索过程中不受并发刷新影响
+    """
+
+    def __init__(self, manifest: dict, segments: List[_Segment], dead: List[frozenset]):
+        self.manifest = manifest
+        self.segments = segments
+        self.dead = dead
+        self.num_rows = sum(seg.num_chunks for seg in segments)
+        self.num_chunks = self.num_rows - sum(len(rows) for rows in dead)
+        # 失效分块仍计入文档总数与平均长度，合并段后恢复精确值
+        self.avgdl = (sum(seg.total_len for seg in segments) / self.num_rows if self.num_rows else 0.0) or 1.0
+        self.dim = manifest.get("dim")
+
+    def bm25(self, query_tokens: Sequence[str]) -> tuple:
+        """返回 ((段序号, 行号) -> BM25得分, (段序号, 行号) -> 命中的查询词数)"""
+        scores: Dict[tuple, float] = {}
+        matched: Counter = Counter()
+        n = self.num_rows
+        for token in set(query_tokens):
+            spans = [(i, seg.span(token)) for i, seg in enumerate(self.segments)]
+            spans = [(i, span) for i, span in spans if span is not None]
+            df = sum(end - start for _, (start, end) in spans)
+            if not df:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for i, (start, end) in spans:
+                seg, dead = self.segments[i], self.dead[i]
+                for p in range(start, end):
+                    row, tf = seg.post_docs[p], seg.post_tfs[p]
+                    if row in dead:
+                        continue
+                    doc = (i, row)
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * seg.doc_lens[row] / self.avgdl)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    matched[doc] += 1
+        return scores, matched
+
+    def dense(self, query_vector, k: int) -> List[tuple]:
+        """返回 [((段序号, 行号), 余弦相似度)]，按相似度降序"""
+        results = []
+        for i, seg in enumerate(self.segments):
+            if seg.vectors is None or not seg.num_chunks:
+                continue
+            dead = self.dead[i]
+            results.extend(((i, row), sim) for row, sim in seg.dense(query_vector, k + len(dead)) if row not in dead)
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:k]
+
+    def chunk(self, doc: tuple) -> dict:
+        return self.segments[doc[0]].chunk(doc[1])
+
+
+class LocalIndex:
+    """
+    本地文档检索索引
+
+    参数:
+        docs_dir (str): 文档目录
+        index_dir (str): 索引文件目录
+        embeddings: 可选的LangChain Embeddings，提供时（且已安装NumPy）同时使用稠密向量检索
+        min_coverage (float): BM25结果至少覆盖查询词的比例，低于该值视为未命中
+        min_similarity (float): 稠密检索结果的最低余弦相似度
+    """
+
+    def __init__(self, docs_dir: str, index_dir: str, embeddings=None,
+                 min_coverage: float = 0.5, min_similarity: float = 0.6):
+        self.docs_dir = os.path.abspath(docs_dir)
+        self.index_dir = os.path.abspath(index_dir)
+        self.embeddings = embeddings if np is not None else None
+        self.min_coverage = min_coverage
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._state: Optional[_IndexState] = None
+        self._loaded = False
+        # 仅在刷新时使用（持有锁）：分块哈希 -> (段序号, 行号)，内容哈希 -> 已有向量的位置
+        self._locations: Dict[bytes, tuple] = {}
+        self._text_vectors: Dict[bytes, tuple] = {}
+        self._last_check = 0.0
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+
+    # 目录扫描
+    def _scan(self) -> Dict[str, tuple]:
+        files = {}
+        for root, dirs, names in os.walk(self.docs_dir):
+            # 跳过隐藏目录（如 .cache）与索引目录本身
+            dirs[:] = [d for d in dirs if not d.startswith(".") and os.path.join(root, d) != self.index_dir]
+            for name in names:
+                if name.lower().endswith(DOC_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files[os.path.relpath(path, self.docs_dir)] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    # 加载
+    def _load(self) -> Optional[_IndexState]:
+        """从 manifest 加载索引状态，并根据 manifest 中仍存在的分块哈希推算各段的失效行"""
+        try:
+            with open(os.path.join(self.index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != INDEX_VERSION:
+                return None
+            segments = [_Segment(os.path.join(self.index_dir, name)) for name in manifest["segments"]]
+        except (OSError, ValueError, KeyError):
+            return None
+        live = {bytes.fromhex(key) for entry in manifest["files"].values() for key in entry["chunks"]}
+        dead = []
+        for i, seg in enumerate(segments):
+            rows = set()
+            for row in range(seg.num_chunks):
+                key = seg.key(row)
+                if key in live and key not in self._locations:
+                    self._locations[key] = (i, row)
+                else:
+                    rows.add(row)
+                if seg.vectors is not None:
+                    self._text_vectors.setdefault(seg.text_key(row), (i, row))
+            dead.append(frozenset(rows))
+        return _IndexState(manifest, segments, dead)
+
+    def snapshot(self) -> Optional[_IndexState]:
+        """
+        返回当前索引的只读视图，首次访问时从磁盘加载，不触发重建
+        """
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._state = self._load()
+                    self._loaded = True
+        return self._state
+
+    # 增量刷新
+    def refresh(self) -> bool:
+        """
+        扫描文档目录，按文件内容哈希与分块哈希增量更新索引：
+        只有新增的分块会被分词、向量化并写入新段，删除的分块标记为失效，工作量与变化量成正比
+
+        返回:
+            bool: 索引是否发生变化
+        """
+        self.snapshot()
+        with self._lock:
+            start = time.perf_counter()
+            # 首次构建时索引目录可能还不存在，文档目录为空时也要能写出 manifest
+            os.makedirs(self.index_dir, exist_ok=True)
+            state = self._state
+            if state is not None and state.manifest.get("embeddings") != (self.embeddings is not None):
+                # 是否使用向量发生变化，旧段无法复用，全量重建
+                state = None
+                self._locations.clear()
+                self._text_vectors.clear()
+            old_files = state.manifest["files"] if state is not None else {}
+            files = self._scan()
+            changed = [rel for rel, stat in files.items()
+                       if rel not in old_files or (old_files[rel]["mtime_ns"], old_files[rel]["size"]) != stat]
+            removed = [rel for rel in old_files if rel not in files]
+            if state is not None and not changed and not removed:
+                return False
+
+            new_files = {rel: entry for rel, entry in old_files.items() if rel in files}
+            dropped: set = set()
+            added: Dict[bytes, tuple] = {}
+            for rel in removed:
+                dropped.update(old_files[rel]["chunks"])
+            for rel in sorted(changed):
+                old = old_files.get(rel)
+                try:
+                    with open(os.path.join(self.docs_dir, rel), "rb") as f:
+                        raw = f.read()
+                except OSError:
+                    # 扫描后文件被删除，按删除处理
+                    new_files.pop(rel, None)
+                    if old is not None:
+                        dropped.update(old["chunks"])
+                    continue
+                digest = hashlib.sha1(raw).hexdigest()
+                entry = {"mtime_ns": files[rel][0], "size": files[rel][1], "sha1": digest}
+                if old is not None and old["sha1"] == digest:
+                    # 只是修改时间变化，内容相同
+                    new_files[rel] = {**old, **entry}
+                    continue
+                keys = []
+                for piece in chunk_text(raw.decode("utf-8", errors="replace")):
+                    key = _chunk_key(rel, piece)
+                    keys.append(key.hex())
+                    if key not in self._locations:
+                        added.setdefault(key, (rel, piece))
+                new_files[rel] = {**entry, "chunks": keys}
+                if old is not None:
+                    dropped.update(set(old["chunks"]) - set(keys))
+
+            segments = list(state.segments) if state is not None else []
+            dead = [set(rows) for rows in state.dead] if state is not None else []
+            for key in dropped:
+                location = self._locations.pop(bytes.fromhex(key), None)
+                if location is not None:
+                    dead[location[0]].add(location[1])
+
+            embedded = 0
+            if added:
+                embedded = self._append_segment(segments, dead, added)
+            total_rows = sum(seg.num_chunks for seg in segments)
+            dead_rows = sum(len(rows) for rows in dead)
+            compacted = len(segments) > MAX_SEGMENTS or (dead_rows and dead_rows > COMPACT_DEAD_RATIO * total_rows)
+            if compacted:
+                segments, dead = self._compact(segments, dead)
+
+            manifest = {
+                "version": INDEX_VERSION,
+                "embeddings": self.embeddings is not None,
+                "dim": self._dim(segments),
+                "segments": [seg.name for seg in segments],
+                "files": new_files,
+            }
+            self._write_manifest(manifest)
+            self._state = _IndexState(manifest, segments, [frozenset(rows) for rows in dead])
+            self._remove_orphans(manifest["segments"])
+            print(f"本地索引已增量更新: {len(changed)}个文件变化，{len(removed)}个文件删除，"
+                  f"新增{len(added)}个分块（向量化{embedded}个），失效{len(dropped)}个分块，"
+                  f"共{len(segments)}个段{'（已合并）' if compacted else ''}，耗时{time.perf_counter() - start:.3f}s")
+            return True
+
+    def refresh_if_stale(self, min_interval: float = 5.0) -> None:
+        """
+        距离上次检查超过 min_interval 秒时扫描目录并按需增量更新，供检索前低成本调用
+        """
+        now = time.monotonic()
+        if now - self._last_check >= min_interval:
+            self._last_check = now
+            self.refresh()
+
+    def _dim(self, segments: List[_Segment]) -> Optional[int]:
+        for seg in segments:
+            if seg.meta.get("dim"):
+                return seg.meta["dim"]
+        return None
+
+    def _append_segment(self, segments: List[_Segment], dead: List[set], added: Dict[bytes, tuple]) -> int:
+        """把新增分块写入一个新段，返回实际调用向量模型的分块数"""
+        items = [(key, _text_key(piece), rel, piece) for key, (rel, piece) in added.items()]
+        vectors = [None] * len(items)
+        pending = []
+        if self.embeddings is not None:
+            for n, (_, text_key, _, piece) in enumerate(items):
+                location = self._text_vectors.get(text_key)
+                if location is not None:
+                    # 相同内容已有向量（文件改名、内容移动或恢复），直接复用
+                    vectors[n] = segments[location[0]].vectors[location[1]]
+                else:
+                    pending.append(n)
+            if pending:
+                for n, vector in zip(pending, self.embeddings.embed_documents([items[n][3] for n in pending])):
+                    vectors[n] = vector
+        writer = _SegmentWriter()
+        for (key, text_key, rel, piece), vector in zip(items, vectors):
+            writer.add_text(rel, piece, key, text_key, vector)
+        segment = self._write_segment(writer)
+        i = len(segments)
+        segments.append(segment)
+        dead.append(set())
+        for row, (key, text_key, _, _) in enumerate(items):
+            self._locations[key] = (i, row)
+            if segment.vectors is not None:
+                self._text_vectors.setdefault(text_key, (i, row))
+        return len(pending)
+
+    def _compact(self, segments: List[_Segment], dead: List[set]) -> tuple:
+        """把所有段中仍有效的分块合并为一个段，直接合并倒排表，不重新分词与向量化"""
+        writer = _SegmentWriter()
+        remaps = []
+        for seg, rows in zip(segments, dead):
+            remap = {}
+            for row in range(seg.num_chunks):
+                if row not in rows:
+                    vector = seg.vectors[row] if seg.vectors is not None else None
+                    remap[row] = writer.add_chunk(seg.chunk_line(row), seg.key(row), seg.text_key(row),
+                                                  seg.doc_lens[row], vector)
+            remaps.append(remap)
+        for seg, remap in zip(segments, remaps):
+            for token, term_id in seg.vocab.items():
+                for p in range(seg.term_offsets[term_id], seg.term_offsets[term_id + 1]):
+                    row = remap.get(seg.post_docs[p])
+                    if row is not None:
+                        writer.add_posting(token, row, seg.post_tfs[p])
+        self._locations.clear()
+        self._text_vectors.clear()
+        if not writer.doc_lens:
+            return [], []
+        segment = self._write_segment(writer)
+        for row in range(segment.num_chunks):
+            self._locations[segment.key(row)] = (0, row)
+            if segment.vectors is not None:
+                self._text_vectors.setdefault(segment.text_key(row), (0, row))
+        return [segment], [set()]
+
+    def _write_segment(self, writer: _SegmentWriter) -> _Segment:
+        path = os.path.join(self.index_dir, f"seg-{time.time_ns()}")
+        writer.write(path)
+        return _Segment(path)
+
+    def _write_manifest(self, manifest: dict) -> None:
+        # 先写临时文件再原子替换，进程中途退出时旧 manifest 仍然完整
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp_path, os.path.join(self.index_dir, "manifest.json"))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _remove_orphans(self, keep: List[str]) -> None:
+        # 清理不再被 manifest 引用的段与旧版本索引文件（已映射的旧文件在Linux上仍可继续读取）
+        keep = set(keep)
+        for name in os.listdir(self.index_dir):
+            if name == "manifest.json" or name in keep:
+                continue
+            path = os.path.join(self.index_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.unlink(path)
+
+    # 目录监视
+    def _watch(self, interval: float) -> None:
+        while not self._watcher_stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"本地索引刷新失败: {e!r}")
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        """
+        开启目录监视，后台线程按间隔扫描文档目录并增量更新索引，适用于长时间运行的服务
+
+        参数:
+            interval (float): 扫描间隔（秒）
+        """
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._watcher_stop.clear()
+            self._watcher = threading.Thread(target=self._watch, args=(interval,), name="local-index-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """
+        停止目录监视
+        """
+        self._watcher_stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        self._watcher = None
+
+    # 检索
+    def search(self, query: str, k: int = 5) -> List[SearchHit]:
+        """
+        检索与查询相关的分块；同时启用稠密向量时按倒数排名融合两路结果
+
+        参数:
+            query (str): 查询文本
+            k (int): 返回的最大结果数
+
+        返回:
+            List[SearchHit]: 达到命中阈值的结果，按相关度降序；为空表示本地未命中
+        """
+        state = self.snapshot()
+        if state is None or state.num_chunks == 0:
+            return []
+        query_tokens = set(tokenize(query))
+        scores, matched = state.bm25(query_tokens)
+        need = max(1, math.ceil(len(query_tokens) * self.min_coverage))
+        lexical = sorted((doc for doc in scores if matched[doc] >= need), key=scores.get, reverse=True)[:k * 4]
+
+        semantic = []
+        if state.dim and self.embeddings is not None:
+            query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+            query_vector /= max(float(np.linalg.norm(query_vector)), 1e-12)
+            semantic = [doc for doc, sim in state.dense(query_vector, k * 4) if sim >= self.min_similarity]
+        if not semantic:
+            ranked = [(doc, scores[doc]) for doc in lexical[:k]]
+        else:
+            fused: Dict[tuple, float] = {}
+            for ranking in (lexical, semantic):
+                for rank, doc in enumerate(ranking):
+                    fused[doc] = fused.get(doc, 0.0) + 1.0 / (60 + rank)
+            ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+
+        hits = []
+        for doc, score in ranked:
+            chunk = state.chunk(doc)
+            hits.append(SearchHit(chunk["source"], chunk["text"], round(score, 4)))
+        return hits
@@ -0,0 +1,50 @@
+from langchain_core.tools import BaseTool
+from typing import Any, Optional
+import os
+
+from tools.local_index import LocalIndex
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# 默认索引 learn/files 目录下的文档，索引文件保存在 files/.cache 下
+FILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "files")
+DOCS_DIR = os.getenv("LOCAL_SEARCH_DOCS_DIR", FILES_DIR)
+INDEX_DIR = os.getenv("LOCAL_SEARCH_INDEX_DIR", os.path.join(FILES_DIR, ".cache", "local_index"))
+# 大于0时后台监视文档目录并按该间隔（秒）增量更新索引，适用于长时间运行的服务
+WATCH_INTERVAL = float(os.getenv("LOCAL_SEARCH_WATCH_INTERVAL", "0"))
+
+
+class LocalSearchTool(BaseTool):
+    """
+    本地知识库检索工具
+    在本地文档目录的检索索引中查找相关内容，毫秒级返回，未命中时提示模型改用网络搜索。
+    """
+    name: str = "local_search"
+    description: str = "在本地知识库(本地保存的文档)中检索信息，应优先于网络搜索使用。输入应为检索关键词或问题；若返回未找到，再使用网络搜索。"
+    # 返回的最大分块数
+    top_k: int = 3
+    # 检索前检查文档目录变化的最小间隔（秒）
+    refresh_interval: float = 5.0
+    index: Optional[Any] = None
+
+    def __init__(self, **kwargs):
+        if kwargs.get("index") is None:
+            kwargs["index"] = LocalIndex(DOCS_DIR, INDEX_DIR)
+        super().__init__(**kwargs)
+        if WATCH_INTERVAL > 0:
+            self.index.start_watching(WATCH_INTERVAL)
+
+    def _run(self, query: str) -> str:
+        """
+        执行本地检索
+        :param query: 检索关键词
+        :return: 检索结果
+        """
+        self.index.refresh_if_stale(self.refresh_interval)
+        hits = self.index.search(query, k=self.top_k)
+        if not hits:
+            print(f"本地知识库未命中: {query}")
+            return f'本地知识库中未找到与"{query}"相关的内容，请使用网络搜索。'
+        print(f"本地知识库命中{len(hits)}条: {query}")
+        return "\n\n".join(f"[来源: {hit.source}]\n{hit.text}" for hit in hits)
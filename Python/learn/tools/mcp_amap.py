@@ -1,27 +1,359 @@
+"""
+高德地图MCP客户端
+工具目录带TTL缓存并持久化到本地，启动时无需再走一次工具发现；
+工具调用复用长连接会话池，空闲会话在使用前做健康检查，连接异常时自动重连
+"""
+import asyncio
+import hashlib
+import json
 import os
+import tempfile
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_mcp_adapters.client import MultiServerMCPClient  
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from mcp import ClientSession
+from mcp.types import CallToolResult, Tool as MCPTool
+
+SERVER_NAME = "amap-mcp-server"
+
+# 工具目录缓存文件与有效期（秒）
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "files", ".cache", "amap_mcp_tools.json")
+CATALOG_TTL = float(os.getenv("AMAP_MCP_TOOLS_TTL", "86400"))
+# 会话池大小与空闲会话健康检查间隔（秒）
+POOL_SIZE = int(os.getenv("AMAP_MCP_POOL_SIZE", "4"))
+PING_INTERVAL = float(os.getenv("AMAP_MCP_PING_INTERVAL", "30"))
+CONNECT_TIMEOUT = float(os.getenv("AMAP_MCP_CONNECT_TIMEOUT", "10"))
+
+_client: Optional[MultiServerMCPClient] = None
+_server_url: Optional[str] = None
+# 会话绑定创建它的事件循环，因此每个事件循环各持有一个会话池
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPSessionPool]" = weakref.WeakKeyDictionary()
+# 内存中的工具目录：(获取时间, 工具定义列表)
+_catalog: Optional[tuple] = None
+_tools: Optional[List[BaseTool]] = None
+
+
+def _get_server_url() -> str:
+    # AMAP_MCP_URL 可指向本地桩服务，便于离线测试
+    url = os.getenv("AMAP_MCP_URL")
+    if url:
+        return url
+    key = os.getenv("AMAP_KEY")
+    if not key:
+        raise ValueError("AMAP_KEY environment variable not set")
+    return "https://mcp.amap.com/mcp?key=" + key
+
+
+def get_client() -> MultiServerMCPClient:
+    """
+    获取MCP客户端，首次调用时创建，不在导入时建立任何连接
+    """
+    global _client, _server_url
+    if _client is None:
+        _server_url = _get_server_url()
+        _client = MultiServerMCPClient(
+            {
+                SERVER_NAME: {
+                    "transport": "streamable_http",  # HTTP-based remote server
+                    "url": _server_url,
+                }
+            }
+        )
+    return _client
+
+
+class _PooledSession:
+    """
+    在独立任务中持有一个MCP会话
+    streamable HTTP 会话依赖anyio任务组，必须在打开它的同一个任务中关闭，
+    因此由后台任务负责进入与退出会话上下文，调用方只借用会话对象
+    """
+
+    def __init__(self, client: MultiServerMCPClient):
+        self._client = client
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.session: Optional[ClientSession] = None
+        self.last_used = time.monotonic()
+
+    async def start(self, timeout: float) -> None:
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready), name="amap-mcp-session")
+        try:
+            self.session = await asyncio.wait_for(asyncio.shield(ready), timeout)
+        except BaseException:
+            await self.close()
+            raise
+        self.last_used = time.monotonic()
+
+    async def _run(self, ready: asyncio.Future) -> None:
+        try:
+            async with self._client.session(SERVER_NAME) as session:
+                ready.set_result(session)
+                await self._closing.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not isinstance(e, asyncio.CancelledError):
+                print(f"高德MCP会话已断开: {e!r}")
+
+    @property
+    def alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, CONNECT_TIMEOUT)
+            except BaseException:
+                self._task.cancel()
+
+
+class MCPSessionPool:
+    """
+    MCP长连接会话池
+
+    参数:
+        client: MCP客户端
+        size: 同时使用的最大会话数
+        ping_interval: 会话空闲超过该时间（秒）后，借出前先ping一次确认连接可用
+        connect_timeout: 建立会话与健康检查的超时时间（秒）
+    """
+
+    def __init__(self, client: MultiServerMCPClient, size: int = POOL_SIZE,
+                 ping_interval: float = PING_INTERVAL, connect_timeout: float = CONNECT_TIMEOUT):
+        self._client = client
+        self._ping_interval = ping_interval
+        self._connect_timeout = connect_timeout
+        self._semaphore = asyncio.Semaphore(max(1, size))
+        self._idle: "deque[_PooledSession]" = deque()
+        self.stats = {"created": 0, "reused": 0, "reconnected": 0}
+
+    async def _healthy(self, pooled: _PooledSession) -> bool:
+        if not pooled.alive:
+            return False
+        if time.monotonic() - pooled.last_used < self._ping_interval:
+            return True
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), self._connect_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _checkout(self) -> _PooledSession:
+        # 后进先出，优先复用最近使用过的会话
+        while self._idle:
+            pooled = self._idle.pop()
+            if await self._healthy(pooled):
+                self.stats["reused"] += 1
+                return pooled
+            self.stats["reconnected"] += 1
+            await pooled.close()
+        pooled = _PooledSession(self._client)
+        await pooled.start(self._connect_timeout)
+        self.stats["created"] += 1
+        return pooled
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        借出一个可用会话，用完后归还；使用过程中抛出异常时会话状态未知，直接关闭
+        """
+        async with self._semaphore:
+            pooled = await self._checkout()
+            try:
+                yield pooled.session
+            except BaseException:
+                await pooled.close()
+                raise
+            pooled.last_used = time.monotonic()
+            self._idle.append(pooled)
+
+    async def close(self) -> None:
+        """
+        关闭所有空闲会话
+        """
+        while self._idle:
+            await self._idle.pop().close()
+
+
+def get_session_pool() -> MCPSessionPool:
+    """
+    获取当前事件循环的会话池
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = MCPSessionPool(get_client())
+        _pools[loop] = pool
+    return pool
+
 
-key = os.getenv("AMAP_KEY")
+async def close_session_pool() -> None:
+    """
+    关闭当前事件循环的会话池，事件循环结束前调用
+    """
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
 
-client = MultiServerMCPClient(  
-    {
-        "amap-mcp-server": {
-            "transport": "streamable_http",  # HTTP-based remote server
-            # Ensure you start your weather server on port 8000
-            "url": "https://mcp.amap.com/mcp?key=" + key,
-        }
+
+async def call_tool(name: str, arguments: dict) -> CallToolResult:
+    """
+    通过会话池调用MCP工具，会话异常时换用新会话重试一次
+
+    参数:
+        name: 工具名称
+        arguments: 工具参数
+
+    返回:
+        CallToolResult: MCP工具调用结果
+    """
+    for attempt in range(2):
+        try:
+            async with get_session_pool().acquire() as session:
+                return await session.call_tool(name, arguments)
+        except Exception as e:
+            if attempt:
+                raise
+            print(f"高德MCP调用异常，重新连接后重试: {e!r}")
+
+
+def _url_digest() -> str:
+    # 只保存地址摘要，避免把带key的URL写入磁盘
+    get_client()
+    return hashlib.sha256(_server_url.encode("utf-8")).hexdigest()
+
+
+def _load_catalog_file() -> Optional[tuple]:
+    try:
+        with open(CATALOG_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("server") != _url_digest():
+            return None
+        return data["fetched_at"], [MCPTool.model_validate(tool) for tool in data["tools"]]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _save_catalog_file(fetched_at: float, tools: List[MCPTool]) -> None:
+    data = {
+        "server": _url_digest(),
+        "fetched_at": fetched_at,
+        "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
     }
-)
+    os.makedirs(os.path.dirname(CATALOG_PATH), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(CATALOG_PATH), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, CATALOG_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+async def _discover_tools() -> List[MCPTool]:
+    async with get_session_pool().acquire() as session:
+        tools, cursor = [], None
+        while True:
+            result = await session.list_tools(cursor=cursor)
+            tools.extend(result.tools)
+            cursor = result.nextCursor
+            if not cursor:
+                return tools
+
+
+async def get_tool_catalog(refresh: bool = False) -> List[MCPTool]:
+    """
+    获取MCP工具定义，优先使用内存与本地文件中未过期的目录，过期或refresh=True时重新发现
 
+    参数:
+        refresh: 是否忽略缓存强制重新发现
+
+    返回:
+        List[MCPTool]: 工具定义列表
+    """
+    global _catalog, _tools
+    if not refresh:
+        if _catalog is None:
+            _catalog = _load_catalog_file()
+        if _catalog is not None and time.time() - _catalog[0] < CATALOG_TTL:
+            return _catalog[1]
+    try:
+        tools = await _discover_tools()
+    except Exception as e:
+        # 发现失败时退回到过期目录，工具定义通常很少变化
+        if _catalog is None:
+            raise
+        print(f"高德MCP工具发现失败，继续使用缓存目录: {e!r}")
+        return _catalog[1]
+    _catalog = (time.time(), tools)
+    _tools = None
+    _save_catalog_file(*_catalog)
+    return tools
+
+
+async def refresh_tool_catalog() -> List[MCPTool]:
+    """
+    强制重新发现工具并更新缓存
+    """
+    return await get_tool_catalog(refresh=True)
+
+
+def _result_text(result: CallToolResult) -> str:
+    text = "\n".join(content.text for content in result.content if content.type == "text")
+    if result.structuredContent and not text:
+        text = json.dumps(result.structuredContent, ensure_ascii=False)
+    if result.isError:
+        return f"高德MCP工具调用失败: {text}"
+    return text
+
+
+def _to_langchain_tool(tool: MCPTool) -> BaseTool:
+    async def _call(**arguments) -> str:
+        return _result_text(await call_tool(tool.name, arguments))
+
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description or "",
+        args_schema=tool.inputSchema,
+        coroutine=_call,
+    )
+
+
+async def get_tools(refresh: bool = False) -> List[BaseTool]:
+    """
+    获取高德地图LangChain工具，工具调用经由会话池执行
+
+    参数:
+        refresh: 是否强制重新发现工具
+
+    返回:
+        List[BaseTool]: 工具列表
+    """
+    global _tools
+    catalog = await get_tool_catalog(refresh=refresh)
+    if _tools is None or refresh:
+        _tools = [_to_langchain_tool(tool) for tool in catalog]
+    return _tools
 
-async def get_tools():
-    print("Getting tools...")
-    tools = await client.get_tools()
-    print(tools)
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(get_tools())
\ No newline at end of file
+    async def main():
+        print("Getting tools...")
+        start = time.perf_counter()
+        tools = await get_tools()
+        print(f"{len(tools)}个工具，耗时{time.perf_counter() - start:.3f}s: {[tool.name for tool in tools]}")
+        await close_session_pool()
+
+    asyncio.run(main())
@@ -8,9 +8,23 @@ from pptx.util import Inches, Pt, Cm
 from pptx.enum.text import PP_ALIGN, PP_PARAGRAPH_ALIGNMENT
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from tools.ppt_schema import DeckSpec, SlideSpec, SlideSpecError, parse_deck
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from lxml import etree
+import copy
+import io
 import json
+import multiprocessing
 import os
-from typing import Dict, List, Any
+import posixpath
+import tempfile
+import threading
+import zipfile
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Any, Optional, Union
 
 # 配色方案
 COLOR_SCHEMES = {
@@ -37,14 +51,304 @@ COLOR_SCHEMES = {
     }
 }
 
+# 幻灯片尺寸（英寸）
+SLIDE_WIDTH = 10
+SLIDE_HEIGHT = 7.5
+
+# 并行渲染进程数，0或1表示只在当前进程串行渲染；默认使用CPU核数
+RENDER_WORKERS = int(os.getenv("PPT_RENDER_WORKERS", str(os.cpu_count() or 1)))
+# 幻灯片数不少于该值时才启用进程池，页数较少时序列化开销大于并行收益
+PARALLEL_MIN_SLIDES = int(os.getenv("PPT_PARALLEL_MIN_SLIDES", "16"))
+
+# 幻灯片数不少于该值时，create_ppt_from_json 改为流式写出，逐页写入压缩包并释放内存
+STREAM_MIN_SLIDES = int(os.getenv("PPT_STREAM_MIN_SLIDES", "50"))
+# 流式写出时每个工作进程一次渲染的页数，越小内存峰值越低
+STREAM_CHUNK_SIZE = 8
+
+# 装饰层模板缓存开关，关闭时每页重新绘制装饰图形（用于基准对比）
+DECORATION_CACHE = os.getenv("PPT_DECORATION_CACHE", "1") != "0"
+
+# 幻灯片类型 -> 渲染函数，渲染函数签名为 (prs, slide_data) -> None
+SLIDE_RENDERERS: Dict[str, Callable[[Presentation, SlideSpec], None]] = {}
+
+# 进程共享的渲染进程池，首次并行渲染时按 RENDER_WORKERS 创建（至少2个进程），之后复用；
+# 各次调用的 workers 只决定切块数，不会因页数不同而重建进程池
+_pool_lock = threading.Lock()
+_render_pool: Optional[ProcessPoolExecutor] = None
+# 进程池异常退出或任务被取消时抛出的错误，遇到后回退到串行渲染
+_POOL_ERRORS = (BrokenProcessPool, CancelledError)
+
+
+def register_slide_renderer(slide_type: str):
+    """
+    注册幻灯片类型的渲染函数（装饰器）
+
+    参数:
+        slide_type (str): 幻灯片类型，对应JSON中的type字段
+
+    返回:
+        Callable: 原样返回被装饰的渲染函数
+    """
+    def decorator(func):
+        SLIDE_RENDERERS[slide_type] = func
+        return func
+    return decorator
+
+
+def _new_presentation() -> Presentation:
+    prs = Presentation()
+    prs.slide_width = Inches(SLIDE_WIDTH)
+    prs.slide_height = Inches(SLIDE_HEIGHT)
+    return prs
+
+
+def _render_slide(prs: Presentation, slide_data: SlideSpec) -> None:
+    # 未注册的类型直接跳过
+    renderer = SLIDE_RENDERERS.get(slide_data.type)
+    if renderer is not None:
+        renderer(prs, slide_data)
+
+
+def _render_slide_xml(prs: Presentation, slide_data: SlideSpec) -> Optional[bytes]:
+    """
+    渲染单页并返回完整的幻灯片XML，随后把该页从prs中移除以释放内存；未注册类型返回None
+    """
+    renderer = SLIDE_RENDERERS.get(slide_data.type)
+    if renderer is None:
+        return None
+    renderer(prs, slide_data)
+    sld_id_lst = prs.slides._sldIdLst
+    sld_id = sld_id_lst[-1]
+    xml = etree.tostring(prs.slides[-1]._element)
+    sld_id_lst.remove(sld_id)
+    prs.part.drop_rel(sld_id.rId)
+    return xml
+
+
+def _render_slide_chunk(slides: List[SlideSpec]) -> List[Optional[bytes]]:
+    """
+    在工作进程中渲染一组幻灯片，返回每页的幻灯片XML，未注册类型返回None
+    """
+    prs = _new_presentation()
+    return [_render_slide_xml(prs, slide_data) for slide_data in slides]
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is None:
+            # 使用spawn启动，避免在含后台线程的进程（HTTP连接池、检查点线程）中fork
+            _render_pool = ProcessPoolExecutor(max_workers=max(2, RENDER_WORKERS), mp_context=multiprocessing.get_context("spawn"))
+        return _render_pool
+
+
+def _discard_render_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    丢弃异常的进程池；其他线程已经换上新进程池时不做处理
+    """
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    # 不取消排队中的任务，其他线程提交到同一进程池的任务各自完成或各自回退
+    pool.shutdown(wait=False)
+
+
+def _is_pool_failure(error: BaseException) -> bool:
+    """
+    判断异常是否来自进程池本身；渲染函数抛出的异常（包括RuntimeError）不回退，原样上抛
+    """
+    if isinstance(error, _POOL_ERRORS):
+        return True
+    # 进程池已被其他线程关闭后再提交任务
+    return isinstance(error, RuntimeError) and "cannot schedule new futures" in str(error)
+
+
+def shutdown_render_pool() -> None:
+    """
+    关闭渲染进程池，进程退出前或不再生成PPT时调用
+    """
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(cancel_futures=True)
+            _render_pool = None
+
+
+def render_presentation(data: Union[DeckSpec, Dict[str, Any], str], workers: Optional[int] = None) -> Presentation:
+    """
+    根据解析后的PPT数据渲染Presentation
+    页数达到 PARALLEL_MIN_SLIDES 时，各页在进程池中独立构建形状树，再按原顺序组装到同一个Presentation中
+
+    参数:
+        data (Union[DeckSpec, Dict, str]): 校验后的PPT数据，传入字典或JSON字符串时先经过parse_deck校验
+        workers (int): 切分的块数，默认取 PPT_RENDER_WORKERS；0或1表示串行渲染，进程池大小不随该值变化
+
+    返回:
+        Presentation: 渲染完成的PPT对象
+
+    异常:
+        SlideSpecError: 数据校验失败
+    """
+    data = parse_deck(data)
+    slides = data.slides
+    workers = RENDER_WORKERS if workers is None else workers
+    prs = _new_presentation()
+    if workers <= 1 or len(slides) < max(PARALLEL_MIN_SLIDES, 2):
+        for slide_data in slides:
+            _render_slide(prs, slide_data)
+        return prs
+
+    # 按顺序切分为连续的块，每个工作进程一次渲染一块，减少进程间往返
+    size = -(-len(slides) // min(workers, len(slides)))
+    chunks = [slides[i:i + size] for i in range(0, len(slides), size)]
+    pool = _get_render_pool()
+    try:
+        rendered = list(pool.map(_render_slide_chunk, chunks))
+    except Exception as e:
+        if not _is_pool_failure(e):
+            raise
+        # 工作进程异常退出或进程池已被关闭时丢弃进程池，回退到当前进程串行渲染
+        print(f"并行渲染失败，改为串行渲染: {e}")
+        _discard_render_pool(pool)
+        return render_presentation(data, workers=1)
+    layout = prs.slide_layouts[5]
+    for parts in rendered:
+        for part in parts:
+            if part is None:
+                continue
+            # 渲染函数只生成形状与文本，不含图片等关系部件，直接替换形状树即可
+            slide = prs.slides.add_slide(layout)
+            slide._element.replace(slide._element.cSld, parse_xml(part).cSld)
+    return prs
+
+
+def _iter_slide_xml(slides: List[SlideSpec], workers: int):
+    """
+    按顺序逐页产出幻灯片XML；并行时按小块提交到进程池，进程池异常时从中断处改为串行渲染
+    """
+    done = 0
+    if workers > 1 and len(slides) >= max(PARALLEL_MIN_SLIDES, 2):
+        chunks = [slides[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(slides), STREAM_CHUNK_SIZE)]
+        pool = _get_render_pool()
+        try:
+            for parts in pool.map(_render_slide_chunk, chunks):
+                for part in parts:
+                    done += 1
+                    yield part
+            return
+        except Exception as e:
+            if not _is_pool_failure(e):
+                raise
+            print(f"并行渲染失败，改为串行渲染: {e}")
+            _discard_render_pool(pool)
+            # 已写出的页保持不变，从下一页开始串行渲染
+    prs = _new_presentation()
+    for slide_data in slides[done:]:
+        yield _render_slide_xml(prs, slide_data)
+
+
+def _base_package_parts(num_slides: int) -> Dict[str, bytes]:
+    """
+    保存不含幻灯片的空白演示文稿，并在presentation.xml、其关系文件与[Content_Types].xml中
+    预先登记 num_slides 个幻灯片部件
+    """
+    prs = _new_presentation()
+    prs.slides  # 确保presentation.xml中存在sldIdLst
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    with zipfile.ZipFile(buffer) as base_zip:
+        parts = {name: base_zip.read(name) for name in base_zip.namelist()}
+
+    rels = etree.fromstring(parts["ppt/_rels/presentation.xml.rels"])
+    presentation = etree.fromstring(parts["ppt/presentation.xml"])
+    content_types = etree.fromstring(parts["[Content_Types].xml"])
+    rels_ns = rels.nsmap[None]
+    ct_ns = content_types.nsmap[None]
+    p_ns = presentation.nsmap["p"]
+    r_ns = presentation.nsmap["r"]
+    sld_id_lst = presentation.find(f"{{{p_ns}}}sldIdLst")
+    first_rid = len(rels) + 1
+    for index in range(1, num_slides + 1):
+        rid = f"rId{first_rid + index - 1}"
+        etree.SubElement(rels, f"{{{rels_ns}}}Relationship", Id=rid, Type=RT.SLIDE, Target=f"slides/slide{index}.xml")
+        etree.SubElement(sld_id_lst, f"{{{p_ns}}}sldId", {"id": str(255 + index), f"{{{r_ns}}}id": rid})
+        etree.SubElement(content_types, f"{{{ct_ns}}}Override", PartName=f"/ppt/slides/slide{index}.xml", ContentType=CT.PML_SLIDE)
+    for name, element in (("ppt/_rels/presentation.xml.rels", rels), ("ppt/presentation.xml", presentation), ("[Content_Types].xml", content_types)):
+        parts[name] = etree.tostring(element, xml_declaration=True, encoding="UTF-8", standalone=True)
+    return parts
+
+
+@contextmanager
+def _atomic_output(path: str):
+    """
+    在目标文件同目录下的临时文件中写入，成功后原子替换目标文件；
+    写入失败时删除临时文件，目标位置不会留下缺页的半成品
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        # mkstemp 创建的文件权限为 0600，替换前改为与普通新建文件一致的权限
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def stream_presentation(data: Union[DeckSpec, Dict[str, Any], str], output, workers: Optional[int] = None) -> int:
+    """
+    流式写出PPT：先写入模板部件，再逐页渲染并立即压缩写入，写完即释放该页的XML，
+    内存占用与总页数无关；可写入任意可写的文件对象（如HTTP响应），无需临时文件
+
+    参数:
+        data (Union[DeckSpec, Dict, str]): 校验后的PPT数据，传入字典或JSON字符串时先经过parse_deck校验
+        output: 输出文件路径或可写的文件对象（无需支持seek）；传入路径时先写入同目录临时文件，
+            全部页面写完后再原子替换，渲染中途失败不会留下缺页的文件
+        workers (int): 0或1表示串行渲染，否则按 STREAM_CHUNK_SIZE 分块提交到进程池，默认取 PPT_RENDER_WORKERS
+
+    返回:
+        int: 写入的幻灯片数
+
+    异常:
+        SlideSpecError: 数据校验失败
+    """
+    if isinstance(output, (str, os.PathLike)):
+        with _atomic_output(os.fspath(output)) as tmp_path, open(tmp_path, "wb") as f:
+            return stream_presentation(data, f, workers)
+
+    # 未注册渲染函数的类型预先过滤，保证登记的幻灯片部件数与实际写入的一致
+    slides = [slide_data for slide_data in parse_deck(data).slides if slide_data.type in SLIDE_RENDERERS]
+    workers = RENDER_WORKERS if workers is None else workers
+    layout_name = posixpath.basename(_new_presentation().slide_layouts[5].part.partname)
+    slide_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'<Relationship Id="rId1" Type="{RT.SLIDE_LAYOUT}" Target="../slideLayouts/{layout_name}"/>'
+        '</Relationships>'
+    ).encode("utf-8")
+
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as package:
+        for name, blob in _base_package_parts(len(slides)).items():
+            package.writestr(name, blob)
+        for index, xml in enumerate(_iter_slide_xml(slides, workers), 1):
+            package.writestr(f"ppt/slides/slide{index}.xml", b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' + xml)
+            package.writestr(f"ppt/slides/_rels/slide{index}.xml.rels", slide_rels)
+    return len(slides)
+
 
 @tool
-def create_ppt_from_json(json_data: str, output_path: str = "output.pptx") -> str:
+def create_ppt_from_json(json_data: Union[str, Dict[str, Any]], output_path: str = "output.pptx") -> str:
     """
     根据JSON数据创建PPT文件
     
     参数:
-        json_data (str): JSON格式的PPT内容数据,包含标题、幻灯片列表等信息
+        json_data (Union[str, Dict]): PPT内容数据,可以是JSON字符串或直接传入JSON对象,包含标题、幻灯片列表等信息
             格式示例:
             {
                 "title": "PPT标题",
@@ -64,18 +368,14 @@ def create_ppt_from_json(json_data: str, output_path: str = "output.pptx") -> st
         output_path (str): 输出的PPT文件路径,默认为"output.pptx"
     
     返回:
-        str: 成功消息或错误信息
+        str: 成功消息或错误信息,校验失败时逐条列出需要修正的字段位置
     
     异常:
-        json.JSONDecodeError: JSON解析失败
         Exception: PPT创建过程中的其他异常
     """
     try:
-        # 解析JSON数据
-        if isinstance(json_data, str):
-            data = json.loads(json_data)
-        else:
-            data = json_data
+        # 一次性解析并校验全部页面，错误带有精确位置，便于模型一次修正
+        data = parse_deck(json_data)
         
         # 确保输出目录存在
         files_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'files')
@@ -85,114 +385,48 @@ def create_ppt_from_json(json_data: str, output_path: str = "output.pptx") -> st
         if not os.path.isabs(output_path):
             output_path = os.path.join(files_dir, output_path)
         
-        # 创建PPT对象
-        prs = Presentation()
-        prs.slide_width = Inches(10)
-        prs.slide_height = Inches(7.5)
+        # 页数很多时流式写出，避免整份演示文稿常驻内存
+        if len(data.slides) >= STREAM_MIN_SLIDES:
+            stream_presentation(data, output_path)
+            return f"PPT创建成功! 文件保存在: {output_path}"
         
-        # 遍历幻灯片数据
-        for slide_data in data.get("slides", []):
-            slide_type = slide_data.get("type", "content")
-            
-            if slide_type == "title":
-                # 创建标题页
-                _create_title_slide(prs, slide_data)
-            elif slide_type == "content":
-                # 创建内容页
-                _create_content_slide(prs, slide_data)
-            elif slide_type == "two_column":
-                # 创建双栏内容页
-                _create_two_column_slide(prs, slide_data)
-            elif slide_type == "catalog":
-                # 创建目录页
-                _create_catalog_slide(prs, slide_data)
-            elif slide_type == "section":
-                # 创建章节页
-                _create_section_slide(prs, slide_data)
-            elif slide_type == "card_grid":
-                # 创建卡片网格页
-                _create_card_grid_slide(prs, slide_data)
-            elif slide_type == "timeline":
-                # 创建时间线页
-                _create_timeline_slide(prs, slide_data)
-            elif slide_type == "stats":
-                # 创建数据展示页
-                _create_stats_slide(prs, slide_data)
-            elif slide_type == "image_text":
-                # 创建图文混排页
-                _create_image_text_slide(prs, slide_data)
+        # 按类型分派到已注册的渲染函数，页数较多时并行渲染
+        prs = render_presentation(data)
         
-        # 保存PPT
-        prs.save(output_path)
+        # 保存PPT，先写临时文件再替换，保存失败不会覆盖或留下损坏的文件
+        with _atomic_output(output_path) as tmp_path:
+            prs.save(tmp_path)
         return f"PPT创建成功! 文件保存在: {output_path}"
     
-    except json.JSONDecodeError as e:
-        return f"JSON解析错误: {str(e)}"
+    except SlideSpecError as e:
+        issues = "\n".join(f"- {error}" for error in e.errors)
+        return f"PPT数据校验失败,请修正以下{len(e.errors)}处问题后重新调用:\n{issues}"
     except Exception as e:
         return f"PPT创建失败: {str(e)}"
 
 
-def _create_title_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("title")
+def _create_title_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建标题幻灯片
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含title和subtitle
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含title和subtitle
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])  # 使用空白布局
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
+    colors = _get_color_scheme(slide_data.color_scheme)
     
-    # 添加背景装饰
-    bg_shape = slide.shapes.add_shape(
-        MSO_SHAPE.ROUNDED_RECTANGLE,
-        Inches(0), Inches(0),
-        Inches(10), Inches(7.5)
-    )
-    bg_shape.fill.solid()
-    bg_shape.fill.fore_color.rgb = RGBColor(255, 255, 255)
-    bg_shape.line.fill.background()
-    
-    # 大装饰圆形
-    circle1 = slide.shapes.add_shape(
-        MSO_SHAPE.OVAL,
-        Inches(6.5), Inches(-1.5),
-        Inches(5), Inches(5)
-    )
-    circle1.fill.solid()
-    circle1.fill.fore_color.rgb = colors["secondary"]
-    circle1.line.fill.background()
-    circle1.fill.transparency = 0.5
-    
-    circle2 = slide.shapes.add_shape(
-        MSO_SHAPE.OVAL,
-        Inches(-2), Inches(4.5),
-        Inches(4.5), Inches(4.5)
-    )
-    circle2.fill.solid()
-    circle2.fill.fore_color.rgb = colors["primary"]
-    circle2.line.fill.background()
-    circle2.fill.transparency = 0.5
-    
-    # 小装饰圆点
-    for pos in [(0.5, 1.5, 0.3), (8.5, 0.8, 0.25), (1.2, 6.5, 0.35)]:
-        dot = slide.shapes.add_shape(
-            MSO_SHAPE.OVAL,
-            Inches(pos[0]), Inches(pos[1]),
-            Inches(pos[2]), Inches(pos[2])
-        )
-        dot.fill.solid()
-        dot.fill.fore_color.rgb = colors["accent"]
-        dot.line.fill.background()
-        dot.fill.transparency = 0.4
+    # 添加背景与装饰图形
+    _apply_decoration(slide, "title", slide_data.color_scheme)
     
     # 主标题
     title_box = slide.shapes.add_textbox(Inches(1), Inches(2.5), Inches(8), Inches(1.5))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("title", "")
+    title_frame.text = slide_data.title
     title_frame.paragraphs[0].font.size = Pt(54)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
@@ -201,39 +435,40 @@ def _create_title_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
     # 副标题
     subtitle_box = slide.shapes.add_textbox(Inches(1), Inches(4.2), Inches(8), Inches(1))
     subtitle_frame = subtitle_box.text_frame
-    subtitle_frame.text = slide_data.get("subtitle", "")
+    subtitle_frame.text = slide_data.subtitle
     subtitle_frame.paragraphs[0].font.size = Pt(28)
     subtitle_frame.paragraphs[0].font.color.rgb = colors["primary"]
     subtitle_frame.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.LEFT
 
 
-def _create_content_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("content")
+def _create_content_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建内容幻灯片
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含title和content列表
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含title和content列表
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
+    colors = _get_color_scheme(slide_data.color_scheme)
     
     # 添加装饰元素
-    _add_decorative_shapes(slide, colors)
+    _apply_decoration(slide, "content", slide_data.color_scheme)
     
     # 标题
     title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(0.8))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("title", "")
+    title_frame.text = slide_data.title
     title_frame.paragraphs[0].font.size = Pt(36)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
     
     # 内容区域
-    content_list = slide_data.get("content", [])
+    content_list = slide_data.content
     start_top = 2
     
     for i, item in enumerate(content_list):
@@ -259,33 +494,34 @@ def _create_content_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None
         text_frame.word_wrap = True
 
 
-def _create_two_column_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("two_column")
+def _create_two_column_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建双栏内容幻灯片
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含title、left_content和right_content
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含title、left_content和right_content
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
+    colors = _get_color_scheme(slide_data.color_scheme)
     
     # 添加装饰性背景元素
-    _add_decorative_shapes(slide, colors)
+    _apply_decoration(slide, "content", slide_data.color_scheme)
     
     # 添加标题
     title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("title", "")
+    title_frame.text = slide_data.title
     title_frame.paragraphs[0].font.size = Pt(36)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
     
     # 左栏内容框
-    left_content = slide_data.get("left_content", [])
+    left_content = slide_data.left_content
     left_box = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(4.5), Inches(5))
     left_frame = left_box.text_frame
     left_frame.word_wrap = True
@@ -300,7 +536,7 @@ def _create_two_column_slide(prs: Presentation, slide_data: Dict[str, Any]) -> N
         p.space_after = Pt(12)
     
     # 右栏内容框
-    right_content = slide_data.get("right_content", [])
+    right_content = slide_data.right_content
     right_box = slide.shapes.add_textbox(Inches(5.5), Inches(2), Inches(4.5), Inches(5))
     right_frame = right_box.text_frame
     right_frame.word_wrap = True
@@ -315,34 +551,35 @@ def _create_two_column_slide(prs: Presentation, slide_data: Dict[str, Any]) -> N
         p.space_after = Pt(12)
 
 
-def _create_catalog_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("catalog")
+def _create_catalog_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建目录页
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含title和items列表
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含title和items列表
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
+    colors = _get_color_scheme(slide_data.color_scheme)
     
     # 添加装饰元素
-    _add_decorative_shapes(slide, colors)
+    _apply_decoration(slide, "content", slide_data.color_scheme)
     
     # 添加标题
     title_box = slide.shapes.add_textbox(Inches(7), Inches(0.8), Inches(2.5), Inches(0.8))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("title", "目录")
+    title_frame.text = slide_data.title
     title_frame.paragraphs[0].font.size = Pt(32)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
     title_frame.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.RIGHT
     
     # 添加目录项
-    items = slide_data.get("items", [])
+    items = slide_data.items
     start_top = 2.2
     
     for i, item in enumerate(items):
@@ -376,53 +613,26 @@ def _create_catalog_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None
         text_frame.paragraphs[0].font.color.rgb = colors["dark"]
 
 
-def _create_section_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("section")
+def _create_section_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建章节页
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含section_number和section_title
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含section_number和section_title
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
-    
-    # 添加大背景装饰
-    bg_shape = slide.shapes.add_shape(
-        MSO_SHAPE.ROUNDED_RECTANGLE,
-        Inches(0), Inches(0),
-        Inches(10), Inches(7.5)
-    )
-    bg_shape.fill.solid()
-    bg_shape.fill.fore_color.rgb = colors["light"]
-    bg_shape.line.fill.background()
+    colors = _get_color_scheme(slide_data.color_scheme)
     
-    # 添加装饰圆形
-    circle1 = slide.shapes.add_shape(
-        MSO_SHAPE.OVAL,
-        Inches(7), Inches(-1),
-        Inches(4), Inches(4)
-    )
-    circle1.fill.solid()
-    circle1.fill.fore_color.rgb = colors["secondary"]
-    circle1.line.fill.background()
-    circle1.fill.transparency = 0.5
-    
-    circle2 = slide.shapes.add_shape(
-        MSO_SHAPE.OVAL,
-        Inches(-1), Inches(5),
-        Inches(3.5), Inches(3.5)
-    )
-    circle2.fill.solid()
-    circle2.fill.fore_color.rgb = colors["primary"]
-    circle2.line.fill.background()
-    circle2.fill.transparency = 0.5
+    # 添加大背景与装饰圆形
+    _apply_decoration(slide, "section", slide_data.color_scheme)
     
     # 章节编号
-    section_num = slide_data.get("section_number", "01")
+    section_num = slide_data.section_number
     num_box = slide.shapes.add_textbox(Inches(1), Inches(2.5), Inches(8), Inches(1.5))
     num_frame = num_box.text_frame
     num_frame.text = section_num
@@ -434,40 +644,41 @@ def _create_section_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None
     # 章节标题
     title_box = slide.shapes.add_textbox(Inches(1), Inches(4.2), Inches(8), Inches(1))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("section_title", "")
+    title_frame.text = slide_data.section_title
     title_frame.paragraphs[0].font.size = Pt(44)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
     title_frame.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.CENTER
 
 
-def _create_card_grid_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("card_grid")
+def _create_card_grid_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建卡片网格页
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含title和cards列表
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含title和cards列表
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
+    colors = _get_color_scheme(slide_data.color_scheme)
     
     # 添加装饰
-    _add_decorative_shapes(slide, colors)
+    _apply_decoration(slide, "content", slide_data.color_scheme)
     
     # 标题
     title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(0.8))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("title", "")
+    title_frame.text = slide_data.title
     title_frame.paragraphs[0].font.size = Pt(36)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
     
     # 卡片
-    cards = slide_data.get("cards", [])
+    cards = slide_data.cards
     cols = 3  # 每行3个卡片
     card_width = 2.8
     card_height = 2.2
@@ -494,7 +705,7 @@ def _create_card_grid_slide(prs: Presentation, slide_data: Dict[str, Any]) -> No
         card_shape.line.width = Pt(1)
         
         # 卡片标题
-        title_text = card.get("title", "")
+        title_text = card.title
         title_box = slide.shapes.add_textbox(
             Inches(left + 0.2), Inches(top + 0.2),
             Inches(card_width - 0.4), Inches(0.6)
@@ -507,7 +718,7 @@ def _create_card_grid_slide(prs: Presentation, slide_data: Dict[str, Any]) -> No
         title_frame.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.CENTER
         
         # 卡片内容
-        content_text = card.get("content", "")
+        content_text = card.content
         content_box = slide.shapes.add_textbox(
             Inches(left + 0.2), Inches(top + 0.9),
             Inches(card_width - 0.4), Inches(card_height - 1.1)
@@ -519,27 +730,28 @@ def _create_card_grid_slide(prs: Presentation, slide_data: Dict[str, Any]) -> No
         content_frame.word_wrap = True
 
 
-def _create_timeline_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("timeline")
+def _create_timeline_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建时间线页
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含title和events列表
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含title和events列表
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
+    colors = _get_color_scheme(slide_data.color_scheme)
     
     # 添加装饰
-    _add_decorative_shapes(slide, colors)
+    _apply_decoration(slide, "content", slide_data.color_scheme)
     
     # 标题
     title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(0.8))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("title", "")
+    title_frame.text = slide_data.title
     title_frame.paragraphs[0].font.size = Pt(36)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
@@ -554,7 +766,7 @@ def _create_timeline_slide(prs: Presentation, slide_data: Dict[str, Any]) -> Non
     line.line.width = Pt(3)
     
     # 时间点
-    events = slide_data.get("events", [])
+    events = slide_data.events
     num_events = len(events)
     
     if num_events > 0:
@@ -580,7 +792,7 @@ def _create_timeline_slide(prs: Presentation, slide_data: Dict[str, Any]) -> Non
                 Inches(1), Inches(0.4)
             )
             time_frame = time_box.text_frame
-            time_frame.text = event.get("time", "")
+            time_frame.text = event.time
             time_frame.paragraphs[0].font.size = Pt(14)
             time_frame.paragraphs[0].font.bold = True
             time_frame.paragraphs[0].font.color.rgb = colors["primary"]
@@ -592,40 +804,41 @@ def _create_timeline_slide(prs: Presentation, slide_data: Dict[str, Any]) -> Non
                 Inches(1.2), Inches(1.5)
             )
             desc_frame = desc_box.text_frame
-            desc_frame.text = event.get("description", "")
+            desc_frame.text = event.description
             desc_frame.paragraphs[0].font.size = Pt(12)
             desc_frame.paragraphs[0].font.color.rgb = colors["dark"]
             desc_frame.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.CENTER
             desc_frame.word_wrap = True
 
 
-def _create_stats_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("stats")
+def _create_stats_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建数据展示页
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含title和stats列表
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含title和stats列表
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
+    colors = _get_color_scheme(slide_data.color_scheme)
     
     # 添加装饰
-    _add_decorative_shapes(slide, colors)
+    _apply_decoration(slide, "content", slide_data.color_scheme)
     
     # 标题
     title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(0.8))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("title", "")
+    title_frame.text = slide_data.title
     title_frame.paragraphs[0].font.size = Pt(36)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
     
     # 数据卡片
-    stats = slide_data.get("stats", [])
+    stats = slide_data.stats
     num_stats = len(stats)
     
     if num_stats > 0:
@@ -651,7 +864,7 @@ def _create_stats_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
                 Inches(card_width - 0.4), Inches(1.2)
             )
             value_frame = value_box.text_frame
-            value_frame.text = stat.get("value", "")
+            value_frame.text = stat.value
             value_frame.paragraphs[0].font.size = Pt(48)
             value_frame.paragraphs[0].font.bold = True
             value_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
@@ -663,34 +876,35 @@ def _create_stats_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
                 Inches(card_width - 0.4), Inches(0.8)
             )
             label_frame = label_box.text_frame
-            label_frame.text = stat.get("label", "")
+            label_frame.text = stat.label
             label_frame.paragraphs[0].font.size = Pt(16)
             label_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
             label_frame.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.CENTER
             label_frame.word_wrap = True
 
 
-def _create_image_text_slide(prs: Presentation, slide_data: Dict[str, Any]) -> None:
+@register_slide_renderer("image_text")
+def _create_image_text_slide(prs: Presentation, slide_data: SlideSpec) -> None:
     """
     创建图文混排页
     
     参数:
         prs (Presentation): PPT对象
-        slide_data (Dict): 幻灯片数据,包含title、content和image_placeholder
+        slide_data (SlideSpec): 校验后的幻灯片数据,包含title、content和image_placeholder
     
     返回:
         None
     """
     slide = prs.slides.add_slide(prs.slide_layouts[5])
-    colors = _get_color_scheme(slide_data.get("color_scheme", "blue_green"))
+    colors = _get_color_scheme(slide_data.color_scheme)
     
     # 添加装饰
-    _add_decorative_shapes(slide, colors)
+    _apply_decoration(slide, "content", slide_data.color_scheme)
     
     # 标题
     title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(0.8))
     title_frame = title_box.text_frame
-    title_frame.text = slide_data.get("title", "")
+    title_frame.text = slide_data.title
     title_frame.paragraphs[0].font.size = Pt(36)
     title_frame.paragraphs[0].font.bold = True
     title_frame.paragraphs[0].font.color.rgb = colors["dark"]
@@ -712,13 +926,13 @@ def _create_image_text_slide(prs: Presentation, slide_data: Dict[str, Any]) -> N
         Inches(3.6), Inches(1.5)
     )
     img_frame = img_text.text_frame
-    img_frame.text = "[图片占位符]\n" + slide_data.get("image_description", "此处可插入图片")
+    img_frame.text = "[图片占位符]\n" + slide_data.image_description
     img_frame.paragraphs[0].font.size = Pt(14)
     img_frame.paragraphs[0].font.color.rgb = colors["dark"]
     img_frame.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.CENTER
     
     # 文字内容
-    content = slide_data.get("content", [])
+    content = slide_data.content
     content_box = slide.shapes.add_textbox(
         Inches(0.5), Inches(2),
         Inches(4.5), Inches(4.5)
@@ -784,6 +998,156 @@ def _add_decorative_shapes(slide, colors: Dict[str, RGBColor]) -> None:
     circle2.fill.transparency = 0.6
 
 
+def _draw_title_decoration(slide, colors: Dict[str, RGBColor]) -> None:
+    """
+    绘制标题页的背景与装饰图形
+    
+    参数:
+        slide: 幻灯片对象
+        colors (Dict): 配色方案
+    
+    返回:
+        None
+    """
+    # 背景
+    bg_shape = slide.shapes.add_shape(
+        MSO_SHAPE.ROUNDED_RECTANGLE,
+        Inches(0), Inches(0),
+        Inches(10), Inches(7.5)
+    )
+    bg_shape.fill.solid()
+    bg_shape.fill.fore_color.rgb = RGBColor(255, 255, 255)
+    bg_shape.line.fill.background()
+    
+    # 大装饰圆形
+    circle1 = slide.shapes.add_shape(
+        MSO_SHAPE.OVAL,
+        Inches(6.5), Inches(-1.5),
+        Inches(5), Inches(5)
+    )
+    circle1.fill.solid()
+    circle1.fill.fore_color.rgb = colors["secondary"]
+    circle1.line.fill.background()
+    circle1.fill.transparency = 0.5
+    
+    circle2 = slide.shapes.add_shape(
+        MSO_SHAPE.OVAL,
+        Inches(-2), Inches(4.5),
+        Inches(4.5), Inches(4.5)
+    )
+    circle2.fill.solid()
+    circle2.fill.fore_color.rgb = colors["primary"]
+    circle2.line.fill.background()
+    circle2.fill.transparency = 0.5
+    
+    # 小装饰圆点
+    for pos in [(0.5, 1.5, 0.3), (8.5, 0.8, 0.25), (1.2, 6.5, 0.35)]:
+        dot = slide.shapes.add_shape(
+            MSO_SHAPE.OVAL,
+            Inches(pos[0]), Inches(pos[1]),
+            Inches(pos[2]), Inches(pos[2])
+        )
+        dot.fill.solid()
+        dot.fill.fore_color.rgb = colors["accent"]
+        dot.line.fill.background()
+        dot.fill.transparency = 0.4
+
+
+def _draw_section_decoration(slide, colors: Dict[str, RGBColor]) -> None:
+    """
+    绘制章节页的背景与装饰图形
+    
+    参数:
+        slide: 幻灯片对象
+        colors (Dict): 配色方案
+    
+    返回:
+        None
+    """
+    # 大背景
+    bg_shape = slide.shapes.add_shape(
+        MSO_SHAPE.ROUNDED_RECTANGLE,
+        Inches(0), Inches(0),
+        Inches(10), Inches(7.5)
+    )
+    bg_shape.fill.solid()
+    bg_shape.fill.fore_color.rgb = colors["light"]
+    bg_shape.line.fill.background()
+    
+    # 装饰圆形
+    circle1 = slide.shapes.add_shape(
+        MSO_SHAPE.OVAL,
+        Inches(7), Inches(-1),
+        Inches(4), Inches(4)
+    )
+    circle1.fill.solid()
+    circle1.fill.fore_color.rgb = colors["secondary"]
+    circle1.line.fill.background()
+    circle1.fill.transparency = 0.5
+    
+    circle2 = slide.shapes.add_shape(
+        MSO_SHAPE.OVAL,
+        Inches(-1), Inches(5),
+        Inches(3.5), Inches(3.5)
+    )
+    circle2.fill.solid()
+    circle2.fill.fore_color.rgb = colors["primary"]
+    circle2.line.fill.background()
+    circle2.fill.transparency = 0.5
+
+
+# 各装饰类型的绘制函数
+DECORATION_BUILDERS = {
+    "title": _draw_title_decoration,
+    "section": _draw_section_decoration,
+    "content": _add_decorative_shapes,
+}
+
+# 装饰层模板缓存：(装饰类型, 配色方案) -> 装饰形状的XML元素
+_decoration_templates: Dict[tuple, tuple] = {}
+
+
+def _build_decoration_template(kind: str, scheme_name: str) -> tuple:
+    """
+    在临时幻灯片上绘制一次装饰层，保存其形状XML作为模板
+    """
+    prs = _new_presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    before = len(slide.shapes)
+    DECORATION_BUILDERS[kind](slide, COLOR_SCHEMES[scheme_name])
+    return tuple(copy.deepcopy(shape._element) for shape in list(slide.shapes)[before:])
+
+
+def _apply_decoration(slide, kind: str, scheme_name: str) -> None:
+    """
+    为幻灯片添加装饰层，每种(装饰类型, 配色方案)只绘制一次，之后深拷贝缓存的XML，
+    跳过python-pptx逐个设置填充、透明度等属性的开销
+
+    参数:
+        slide: 幻灯片对象
+        kind (str): 装饰类型，title、section或content
+        scheme_name (str): 配色方案名称，未知名称按blue_green处理
+
+    返回:
+        None
+    """
+    if scheme_name not in COLOR_SCHEMES:
+        scheme_name = "blue_green"
+    if not DECORATION_CACHE:
+        DECORATION_BUILDERS[kind](slide, COLOR_SCHEMES[scheme_name])
+        return
+    key = (kind, scheme_name)
+    template = _decoration_templates.get(key)
+    if template is None:
+        template = _decoration_templates.setdefault(key, _build_decoration_template(kind, scheme_name))
+    shapes = slide.shapes
+    for element in template:
+        element = copy.deepcopy(element)
+        # 重新分配形状ID，保证与幻灯片中已有形状不重复
+        element.xpath("./*[1]/p:cNvPr")[0].id = shapes._next_shape_id
+        shapes._spTree.append(element)
+
+
 # 用于测试的辅助函数
 def test_ppt_creation():
     """
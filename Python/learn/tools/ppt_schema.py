@@ -0,0 +1,228 @@
+"""
+PPT幻灯片数据模型与校验
+把模型生成的JSON（字符串或字典）一次性校验并转换为基于__slots__的轻量对象，
+校验失败时返回精确到字段的错误位置（如 slides[3].cards[1].title），便于模型一次修正
+"""
+import json
+from typing import Any, Dict, List, Optional, Union
+
+# 字段类型标记：str 为字符串，[str] 为字符串数组，[Spec] 为对象数组
+_TYPE_NAMES = {
+    str: "字符串",
+    int: "数字",
+    float: "数字",
+    bool: "布尔值",
+    list: "数组",
+    dict: "对象",
+    type(None): "null",
+}
+
+
+class SlideSpecError(ValueError):
+    """
+    幻灯片数据校验失败
+
+    属性:
+        errors (List[str]): 每项为「位置: 问题」形式的错误描述
+    """
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("\n".join(errors))
+
+
+class _Spec:
+    """数据模型基类，FIELDS 为 (字段名, 类型标记, 默认值) 元组"""
+    __slots__ = ()
+    FIELDS: tuple = ()
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name, _, _ in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+
+class CardSpec(_Spec):
+    __slots__ = ("title", "content")
+    FIELDS = (("title", str, ""), ("content", str, ""))
+
+
+class StatSpec(_Spec):
+    __slots__ = ("value", "label")
+    FIELDS = (("value", str, ""), ("label", str, ""))
+
+
+class EventSpec(_Spec):
+    __slots__ = ("time", "description")
+    FIELDS = (("time", str, ""), ("description", str, ""))
+
+
+class SlideSpec(_Spec):
+    """所有幻灯片类型共有的字段"""
+    __slots__ = ("type", "color_scheme")
+    FIELDS = (("color_scheme", str, "blue_green"),)
+
+
+class TitleSlideSpec(SlideSpec):
+    __slots__ = ("title", "subtitle")
+    FIELDS = SlideSpec.FIELDS + (("title", str, ""), ("subtitle", str, ""))
+
+
+class ContentSlideSpec(SlideSpec):
+    __slots__ = ("title", "content")
+    FIELDS = SlideSpec.FIELDS + (("title", str, ""), ("content", [str], ()))
+
+
+class TwoColumnSlideSpec(SlideSpec):
+    __slots__ = ("title", "left_content", "right_content")
+    FIELDS = SlideSpec.FIELDS + (("title", str, ""), ("left_content", [str], ()), ("right_content", [str], ()))
+
+
+class CatalogSlideSpec(SlideSpec):
+    __slots__ = ("title", "items")
+    FIELDS = SlideSpec.FIELDS + (("title", str, "目录"), ("items", [str], ()))
+
+
+class SectionSlideSpec(SlideSpec):
+    __slots__ = ("section_number", "section_title")
+    FIELDS = SlideSpec.FIELDS + (("section_number", str, "01"), ("section_title", str, ""))
+
+
+class CardGridSlideSpec(SlideSpec):
+    __slots__ = ("title", "cards")
+    FIELDS = SlideSpec.FIELDS + (("title", str, ""), ("cards", [CardSpec], ()))
+
+
+class TimelineSlideSpec(SlideSpec):
+    __slots__ = ("title", "events")
+    FIELDS = SlideSpec.FIELDS + (("title", str, ""), ("events", [EventSpec], ()))
+
+
+class StatsSlideSpec(SlideSpec):
+    __slots__ = ("title", "stats")
+    FIELDS = SlideSpec.FIELDS + (("title", str, ""), ("stats", [StatSpec], ()))
+
+
+class ImageTextSlideSpec(SlideSpec):
+    __slots__ = ("title", "content", "image_description")
+    FIELDS = SlideSpec.FIELDS + (("title", str, ""), ("content", [str], ()), ("image_description", str, "此处可插入图片"))
+
+
+# 幻灯片类型 -> 数据模型
+SLIDE_SPECS: Dict[str, type] = {
+    "title": TitleSlideSpec,
+    "content": ContentSlideSpec,
+    "two_column": TwoColumnSlideSpec,
+    "catalog": CatalogSlideSpec,
+    "section": SectionSlideSpec,
+    "card_grid": CardGridSlideSpec,
+    "timeline": TimelineSlideSpec,
+    "stats": StatsSlideSpec,
+    "image_text": ImageTextSlideSpec,
+}
+
+
+class DeckSpec:
+    """校验后的PPT数据"""
+    __slots__ = ("title", "slides")
+
+    def __init__(self, title: str, slides: List[SlideSpec]):
+        self.title = title
+        self.slides = slides
+
+    def __repr__(self) -> str:
+        return f"DeckSpec(title={self.title!r}, slides={len(self.slides)})"
+
+
+def _type_name(value: Any) -> str:
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def _check_str(value: Any, path: str, errors: List[str]) -> str:
+    if isinstance(value, str):
+        return value
+    # 数字可以无歧义地转换为字符串，不必让模型重新生成
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    errors.append(f"{path}: 应为字符串，实际为{_type_name(value)}")
+    return ""
+
+
+def _check_field(kind, value: Any, path: str, errors: List[str]):
+    if kind is str:
+        return _check_str(value, path, errors)
+    item_kind = kind[0]
+    if item_kind is str and isinstance(value, str):
+        # 单个字符串视为只有一项的数组
+        return (value,)
+    if not isinstance(value, (list, tuple)):
+        errors.append(f"{path}: 应为数组，实际为{_type_name(value)}")
+        return ()
+    if item_kind is str:
+        return tuple(_check_str(item, f"{path}[{i}]", errors) for i, item in enumerate(value))
+    return tuple(_build(item_kind, item, f"{path}[{i}]", errors) for i, item in enumerate(value))
+
+
+def _build(cls, raw: Any, path: str, errors: List[str]):
+    if not isinstance(raw, dict):
+        errors.append(f"{path}: 应为对象，实际为{_type_name(raw)}")
+        return None
+    spec = cls.__new__(cls)
+    for name, kind, default in cls.FIELDS:
+        value = raw.get(name)
+        setattr(spec, name, default if value is None else _check_field(kind, value, f"{path}.{name}", errors))
+    return spec
+
+
+def _json_error(e: json.JSONDecodeError) -> str:
+    start = max(e.pos - 30, 0)
+    context = e.doc[start:e.pos + 30].replace("\n", " ")
+    return f"JSON语法错误: 第{e.lineno}行第{e.colno}列 {e.msg}，附近内容: {context!r}"
+
+
+def parse_deck(json_data: Union[str, Dict[str, Any], DeckSpec]) -> DeckSpec:
+    """
+    校验PPT数据并转换为DeckSpec，一次收集全部错误
+
+    参数:
+        json_data (Union[str, Dict, DeckSpec]): JSON字符串、已解析的字典或已校验的DeckSpec
+
+    返回:
+        DeckSpec: 校验后的PPT数据，缺省字段已填充默认值
+
+    异常:
+        SlideSpecError: JSON语法错误或字段不合法，errors中包含每个问题的位置
+    """
+    if isinstance(json_data, DeckSpec):
+        return json_data
+    if isinstance(json_data, (str, bytes)):
+        try:
+            json_data = json.loads(json_data)
+        except json.JSONDecodeError as e:
+            raise SlideSpecError([_json_error(e)]) from e
+
+    errors: List[str] = []
+    if not isinstance(json_data, dict):
+        raise SlideSpecError([f"$: 应为对象，实际为{_type_name(json_data)}"])
+    title = _check_str(json_data.get("title") or "", "title", errors)
+    raw_slides = json_data.get("slides")
+    if not isinstance(raw_slides, list) or not raw_slides:
+        errors.append(f"slides: 应为非空数组，实际为{_type_name(raw_slides)}")
+        raise SlideSpecError(errors)
+
+    slides = []
+    for i, raw in enumerate(raw_slides):
+        path = f"slides[{i}]"
+        if not isinstance(raw, dict):
+            errors.append(f"{path}: 应为对象，实际为{_type_name(raw)}")
+            continue
+        slide_type = raw.get("type") or "content"
+        cls: Optional[type] = SLIDE_SPECS.get(slide_type) if isinstance(slide_type, str) else None
+        if cls is None:
+            errors.append(f"{path}.type: 不支持的类型 {slide_type!r}，可选值: {', '.join(SLIDE_SPECS)}")
+            continue
+        spec = _build(cls, raw, path, errors)
+        spec.type = slide_type
+        slides.append(spec)
+    if errors:
+        raise SlideSpecError(errors)
+    return DeckSpec(title, slides)
@@ -0,0 +1,223 @@
+"""
+搜索结果缓存
+按归一化后的查询词与搜索参数缓存搜索结果，支持内存LRU与SQLite磁盘两种后端，
+可配置TTL、容量上限，并统计命中/未命中次数
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def normalize_query(query: str) -> str:
+    """
+    归一化查询词：全角转半角、去除首尾空白、合并连续空白、英文小写
+
+    参数:
+        query (str): 原始查询词
+
+    返回:
+        str: 归一化后的查询词
+    """
+    query = unicodedata.normalize("NFKC", query)
+    return " ".join(query.split()).lower()
+
+
+def make_cache_key(query: str, params: Any = None) -> str:
+    """
+    由归一化查询词与搜索参数生成缓存键
+
+    参数:
+        query (str): 原始查询词
+        params: 影响搜索结果的其他参数，如 resource_type_filter
+
+    返回:
+        str: sha256 缓存键
+    """
+    raw = json.dumps({"q": normalize_query(query), "params": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchCache(ABC):
+    """
+    搜索缓存基类，后端需实现 get、set、clear 与 __len__
+
+    参数:
+        ttl (float): 缓存有效期（秒），None 表示永不过期
+        max_size (int): 最大缓存条数，超出后淘汰最久未使用的条目
+    """
+
+    def __init__(self, ttl: Optional[float] = 600, max_size: int = 256):
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回缓存统计信息
+
+        返回:
+            Dict[str, Any]: 命中、未命中、淘汰次数、当前条数与命中率
+        """
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self),
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class MemoryLRUCache(SearchCache):
+    """进程内LRU缓存"""
+
+    def __init__(self, ttl: Optional[float] = 600, max_size: int = 256):
+        super().__init__(ttl=ttl, max_size=max_size)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or self._expired(item[1]):
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache(SearchCache):
+    """
+    SQLite磁盘缓存，进程重启后仍可命中
+
+    参数:
+        path (str): 数据库文件路径
+        ttl (float): 缓存有效期（秒）
+        max_size (int): 最大缓存条数
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = 600, max_size: int = 1024):
+        super().__init__(ttl=ttl, max_size=max_size)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache(accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1]):
+                if row is not None:
+                    self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE search_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] - self.max_size
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM search_cache WHERE key IN "
+                    "(SELECT key FROM search_cache ORDER BY accessed ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+
+
+def cache_from_env(prefix: str = "BAIDU_SEARCH_CACHE") -> Optional[SearchCache]:
+    """
+    根据环境变量创建缓存后端
+
+    环境变量:
+        {prefix}: memory（默认）、sqlite 或 off
+        {prefix}_TTL: 有效期秒数，默认 600
+        {prefix}_SIZE: 最大条数，默认 256
+        {prefix}_PATH: SQLite文件路径，默认 learn/files/.cache/search_cache.db
+
+    返回:
+        Optional[SearchCache]: 缓存实例，off 时返回 None
+    """
+    backend = os.getenv(prefix, "memory").lower()
+    ttl = float(os.getenv(f"{prefix}_TTL", "600"))
+    max_size = int(os.getenv(f"{prefix}_SIZE", "256"))
+    if backend == "off":
+        return None
+    if backend == "sqlite":
+        default_path = Path(__file__).resolve().parent.parent / "files" / ".cache" / "search_cache.db"
+        return SQLiteCache(os.getenv(f"{prefix}_PATH", str(default_path)), ttl=ttl, max_size=max_size)
+    return MemoryLRUCache(ttl=ttl, max_size=max_size)